@@ -4,18 +4,24 @@ layout(location = 0) in vec3 vert_position;
 layout(location = 1) in vec2 vert_texcoord;
 layout(location = 2) in vec3 vert_normal;
 
+layout(std140) uniform Camera {
+    mat4 view_mat4;
+    mat4 proj_mat4;
+    vec3 cam_vec3;
+};
+
 uniform mat4 model_mat4;
-uniform mat4 view_mat4;
-uniform mat4 proj_mat4;
-uniform vec3 cam_vec3;
+uniform mat3 normal_mat3;
 
 out vec3 frag_position;
 out vec3 frag_normal;
 out vec3 frag_light;
 
 void main() {
-    gl_Position = proj_mat4 * view_mat4 * model_mat4 * vec4(vert_position, 1);
-    frag_position = vec3(view_mat4 * model_mat4 * vec4(vert_position, 1));
-    frag_normal = mat3(transpose(inverse(view_mat4 * model_mat4))) * vert_normal;
+    vec4 view_position = view_mat4 * model_mat4 * vec4(vert_position, 1);
+    gl_Position = proj_mat4 * view_position;
+    frag_position = vec3(view_position);
+    // view is a rotation + translation, so its mat3 keeps normals perpendicular
+    frag_normal = mat3(view_mat4) * (normal_mat3 * vert_normal);
     frag_light = vec3(view_mat4 * vec4(cam_vec3, 1));
 }
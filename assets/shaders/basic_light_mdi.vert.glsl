@@ -0,0 +1,38 @@
+#version 430 core
+
+layout(location = 0) in vec3 vert_position;
+layout(location = 1) in vec2 vert_texcoord;
+layout(location = 2) in vec3 vert_normal;
+layout(location = 3) in uint vert_object;
+
+layout(std140) uniform Camera {
+    mat4 view_mat4;
+    mat4 proj_mat4;
+    vec3 cam_vec3;
+};
+
+struct Object {
+    mat4 model_mat4;
+    mat4 normal_mat4;
+    vec4 color_vec4;
+    vec4 bound_vec4;
+};
+
+layout(std430, binding = 1) readonly buffer Objects {
+    Object objects[];
+};
+
+out vec3 frag_position;
+out vec3 frag_normal;
+out vec3 frag_light;
+out vec3 frag_color;
+
+void main() {
+    Object object = objects[vert_object];
+    vec4 view_position = view_mat4 * object.model_mat4 * vec4(vert_position, 1);
+    gl_Position = proj_mat4 * view_position;
+    frag_position = vec3(view_position);
+    frag_normal = mat3(view_mat4) * (mat3(object.normal_mat4) * vert_normal);
+    frag_light = vec3(view_mat4 * vec4(cam_vec3, 1));
+    frag_color = object.color_vec4.rgb;
+}
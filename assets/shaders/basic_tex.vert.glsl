@@ -4,9 +4,13 @@ layout(location = 0) in vec3 vert_position;
 layout(location = 1) in vec2 vert_texcoord;
 layout(location = 2) in vec3 vert_normal;
 
+layout(std140) uniform Camera {
+    mat4 view_mat4;
+    mat4 proj_mat4;
+    vec3 cam_vec3;
+};
+
 uniform mat4 model_mat4;
-uniform mat4 view_mat4;
-uniform mat4 proj_mat4;
 
 out vec2 frag_texcoord;
 
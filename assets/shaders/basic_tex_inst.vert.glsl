@@ -0,0 +1,21 @@
+#version 330 core
+
+layout(location = 0) in vec3 vert_position;
+layout(location = 1) in vec2 vert_texcoord;
+layout(location = 2) in vec3 vert_normal;
+layout(location = 3) in mat4 inst_model_mat4;
+layout(location = 7) in mat3 inst_normal_mat3;
+layout(location = 10) in vec3 inst_color_vec3;
+
+layout(std140) uniform Camera {
+    mat4 view_mat4;
+    mat4 proj_mat4;
+    vec3 cam_vec3;
+};
+
+out vec2 frag_texcoord;
+
+void main() {
+    gl_Position = proj_mat4 * view_mat4 * inst_model_mat4 * vec4(vert_position, 1);
+    frag_texcoord = vert_texcoord;
+}
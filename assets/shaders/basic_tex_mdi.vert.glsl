@@ -0,0 +1,31 @@
+#version 430 core
+
+layout(location = 0) in vec3 vert_position;
+layout(location = 1) in vec2 vert_texcoord;
+layout(location = 2) in vec3 vert_normal;
+layout(location = 3) in uint vert_object;
+
+layout(std140) uniform Camera {
+    mat4 view_mat4;
+    mat4 proj_mat4;
+    vec3 cam_vec3;
+};
+
+struct Object {
+    mat4 model_mat4;
+    mat4 normal_mat4;
+    vec4 color_vec4;
+    vec4 bound_vec4;
+};
+
+layout(std430, binding = 1) readonly buffer Objects {
+    Object objects[];
+};
+
+out vec2 frag_texcoord;
+
+void main() {
+    Object object = objects[vert_object];
+    gl_Position = proj_mat4 * view_mat4 * object.model_mat4 * vec4(vert_position, 1);
+    frag_texcoord = vert_texcoord;
+}
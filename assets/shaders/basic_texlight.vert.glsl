@@ -4,10 +4,14 @@ layout(location = 0) in vec3 vert_position;
 layout(location = 1) in vec2 vert_texcoord;
 layout(location = 2) in vec3 vert_normal;
 
+layout(std140) uniform Camera {
+    mat4 view_mat4;
+    mat4 proj_mat4;
+    vec3 cam_vec3;
+};
+
 uniform mat4 model_mat4;
-uniform mat4 view_mat4;
-uniform mat4 proj_mat4;
-uniform vec3 cam_vec3;
+uniform mat3 normal_mat3;
 
 out vec3 frag_position;
 out vec3 frag_normal;
@@ -15,9 +19,10 @@ out vec3 frag_light;
 out vec2 frag_texcoord;
 
 void main() {
-    gl_Position = proj_mat4 * view_mat4 * model_mat4 * vec4(vert_position, 1);
-    frag_position = vec3(view_mat4 * model_mat4 * vec4(vert_position, 1));
-    frag_normal = mat3(transpose(inverse(view_mat4 * model_mat4))) * vert_normal;
+    vec4 view_position = view_mat4 * model_mat4 * vec4(vert_position, 1);
+    gl_Position = proj_mat4 * view_position;
+    frag_position = vec3(view_position);
+    frag_normal = mat3(view_mat4) * (normal_mat3 * vert_normal);
     frag_light = vec3(view_mat4 * vec4(cam_vec3, 1));
     frag_texcoord = vert_texcoord;
 }
@@ -0,0 +1,28 @@
+#version 330 core
+
+layout(location = 0) in vec3 vert_position;
+layout(location = 1) in vec2 vert_texcoord;
+layout(location = 2) in vec3 vert_normal;
+layout(location = 3) in mat4 inst_model_mat4;
+layout(location = 7) in mat3 inst_normal_mat3;
+layout(location = 10) in vec3 inst_color_vec3;
+
+layout(std140) uniform Camera {
+    mat4 view_mat4;
+    mat4 proj_mat4;
+    vec3 cam_vec3;
+};
+
+out vec3 frag_position;
+out vec3 frag_normal;
+out vec3 frag_light;
+out vec2 frag_texcoord;
+
+void main() {
+    vec4 view_position = view_mat4 * inst_model_mat4 * vec4(vert_position, 1);
+    gl_Position = proj_mat4 * view_position;
+    frag_position = vec3(view_position);
+    frag_normal = mat3(view_mat4) * (inst_normal_mat3 * vert_normal);
+    frag_light = vec3(view_mat4 * vec4(cam_vec3, 1));
+    frag_texcoord = vert_texcoord;
+}
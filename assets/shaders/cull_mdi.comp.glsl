@@ -0,0 +1,74 @@
+#version 430 core
+
+layout(local_size_x = 64) in;
+
+struct Object {
+    mat4 model_mat4;
+    mat4 normal_mat4;
+    vec4 color_vec4;
+    vec4 bound_vec4;
+};
+
+struct Command {
+    uint count;
+    uint instance_count;
+    uint first_index;
+    int base_vertex;
+    uint base_instance;
+};
+
+layout(std430, binding = 1) readonly buffer Objects {
+    Object objects[];
+};
+
+layout(std430, binding = 2) readonly buffer Commands {
+    Command commands[];
+};
+
+layout(std430, binding = 3) writeonly buffer Visible {
+    Command visible[];
+};
+
+layout(std430, binding = 4) buffer Counts {
+    uint counts[];
+};
+
+// group of each command (x) and index of the first command of that group (y)
+layout(std430, binding = 5) readonly buffer Groups {
+    uvec2 groups[];
+};
+
+uniform vec4 planes_vec4[6];
+uniform uint commands_uint;
+uniform bool compact_bool;
+
+void main() {
+    uint index = gl_GlobalInvocationID.x;
+    if (index >= commands_uint) {
+        return;
+    }
+
+    Command command = commands[index];
+    vec4 bound = objects[command.base_instance].bound_vec4;
+
+    bool inside = true;
+    if (bound.w >= 0) {
+        for (int i = 0; i < 6; i++) {
+            if (dot(planes_vec4[i].xyz, bound.xyz) + planes_vec4[i].w < -bound.w) {
+                inside = false;
+                break;
+            }
+        }
+    }
+
+    if (compact_bool) {
+        // draw count is read from `counts` by glMultiDrawElementsIndirectCount
+        if (inside) {
+            uvec2 group = groups[index];
+            visible[group.y + atomicAdd(counts[group.x], 1)] = command;
+        }
+    } else {
+        command.instance_count = inside ? 1 : 0;
+        visible[index] = command;
+    }
+}
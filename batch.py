@@ -0,0 +1,314 @@
+"""
+batch module
+============
+
+Module that renders stills of a scene offline, split across worker processes each owning a headless context.
+
+The scene description is a JSON file:
+- `width`, `height` (optional): size of the images.
+- `shapes`: list of shapes of `src.shapes.basics`, e.g. `{"type": "Cube", "pos": [0, 1, 0], "rot": [0, 0.5, 0],
+  "size": [1, 1, 1], "color": [0.4, 0.9, 0.8], "texture_name": "diamond", "has_light": true}`.
+- `cameras`: list of poses `{"pos": [x, y, z], "target": [x, y, z], "fov": radians}`,
+  and/or `turntable`: `{"frames": 360, "radius": 8.0, "height": 2.0, "target": [0, 0, 0]}`.
+
+Functions
+---------
+- `loadPoses`
+- `buildScene`
+- `encodeWork`
+- `initWorker`
+- `cleanWorker`
+- `renderFrames`
+- `main`
+Globals
+-------
+- `ENCODER_BUFFERS`: Number of frames a worker can have waiting for the encoder before rendering blocks.
+"""
+
+
+# built-in imports
+import os
+import json
+import math
+import time
+import queue
+import typing
+import argparse
+import threading
+import multiprocessing
+import multiprocessing.util
+# must be set before OpenGL is imported, workers are spawned so they import this module first too
+os.environ.setdefault("PYOPENGL_PLATFORM", "egl")
+# pip imports
+import numpy as np  # noqa: E402
+import pyglm.glm as glm  # noqa: E402
+import PIL.Image  # noqa: E402
+import OpenGL.GL as GL  # type: ignore # noqa: E402
+# local imports
+import src  # noqa: E402
+
+
+src.utils.ABS_PATH.root = os.path.dirname(os.path.abspath(__file__))
+src.utils.ABS_PATH.updatePath()
+
+ENCODER_BUFFERS: int = 4
+
+# state of a worker process, set by `initWorker`
+_renderer: src.Renderer | None = None
+_frames: queue.Queue[tuple[str, np.ndarray]] = queue.Queue()
+_buffers: queue.Queue[np.ndarray] = queue.Queue()
+_out_dir: str = ""
+_image_format: str = "png"
+_error: Exception | None = None
+# extensions of the formats that can't store an alpha channel
+_opaque_extensions: set[str] = {".jpg", ".jpeg", ".jpe", ".jfif", ".ppm", ".pgm", ".pbm", ".pnm", ".eps", ".pcx", ".xbm"}
+
+
+def loadPoses(
+        description: dict[str, typing.Any],
+        /
+        ) -> list[dict[str, typing.Any]]:
+    """
+    Function that lists the camera poses of a scene description, turntable frames after explicit cameras.
+
+    Args:
+        description (`dict[str,typing.Any]`): The scene description.
+    Returns:
+        `list[dict[str,typing.Any]]`: poses with `pos`, `target` and optionally `fov`.
+    Raises:
+        `Exception`: if the description has no camera.
+    """
+    poses: list[dict[str, typing.Any]] = list(description.get("cameras", []))
+
+    turntable: dict[str, typing.Any] | None = description.get("turntable")
+    if turntable is not None:
+        frames: int = int(turntable.get("frames", 360))
+        radius: float = float(turntable.get("radius", 8.0))
+        height: float = float(turntable.get("height", 2.0))
+        target: list[float] = list(turntable.get("target", [0.0, 0.0, 0.0]))
+
+        for i in range(frames):
+            angle: float = src.utils.TWO_PI * i / frames
+            poses.append({
+                "pos": [target[0] + radius * math.cos(angle), target[1] + height, target[2] + radius * math.sin(angle)],
+                "target": target,
+                "fov": turntable.get("fov")
+            })
+
+    if not poses:
+        raise Exception("Scene description has no 'cameras' nor 'turntable'")
+
+    return poses
+
+
+def buildScene(
+        renderer: src.Renderer,
+        description: dict[str, typing.Any],
+        /
+        ) -> None:
+    """
+    Function that adds the shapes of a scene description to the scene of the renderer.
+
+    Args:
+        renderer (`src.Renderer`): The renderer.
+        description (`dict[str,typing.Any]`): The scene description.
+    Raises:
+        `Exception`: if a shape type is not in `src.shapes.basics`.
+    """
+    elements: dict[str, src.shapes.Shape] = {}
+
+    for i, entry in enumerate(description.get("shapes", [])):
+        shape_type: typing.Any = getattr(src.shapes.basics, entry.get("type", ""), None)
+        if not (isinstance(shape_type, type) and issubclass(shape_type, src.shapes.Shape)):
+            raise Exception(f"Unknown shape type '{entry.get("type")}'")
+
+        shape: src.shapes.Shape = shape_type(
+            color=glm.vec3(*entry["color"]) if "color" in entry else None,
+            texture_name=entry.get("texture_name", ""),
+            has_light=entry.get("has_light", False)
+        )
+        shape.setCoord(
+            pos=glm.vec3(*entry["pos"]) if "pos" in entry else None,
+            rot=glm.vec3(*entry["rot"]) if "rot" in entry else None,
+            size=glm.vec3(*entry["size"]) if "size" in entry else None
+        )
+        elements[entry.get("name", f"shape_{i}")] = shape
+
+    renderer.scene.addElements(**elements)
+
+
+def encodeWork(
+        ) -> None:
+    """
+    Function run by the encoder thread of a worker: writes the images read by the render thread.
+
+    Image compression runs here, so the render thread only waits when every buffer is queued.
+    """
+    while True:
+        path, pixels = _frames.get()
+        try:
+            # rows are read bottom to top
+            image: PIL.Image.Image = PIL.Image.fromarray(pixels[::-1])
+            if os.path.splitext(path)[1].lower() in _opaque_extensions:
+                image = image.convert("RGB")
+            image.save(path)
+        except Exception as e:
+            # the render thread waits for every frame, the encoder must go on
+            print(f"Error writing '{path}': {e}")
+        finally:
+            _buffers.put(pixels)
+            _frames.task_done()
+
+
+def initWorker(
+        description: dict[str, typing.Any],
+        out_dir: str,
+        image_format: str,
+        /
+        ) -> None:
+    """
+    Function run once by each worker process: creates its headless renderer, builds and loads the scene, starts its encoder.
+
+    Args:
+        description (`dict[str,typing.Any]`): The scene description.
+        out_dir (`str`): Folder where images are written.
+        image_format (`str`): Extension of the images (e.g. `png`).
+    """
+    global _renderer, _out_dir, _image_format, _error
+
+    src.utils.SCREEN_WIDTH = int(description.get("width", src.utils.SCREEN_WIDTH))
+    src.utils.SCREEN_HEIGHT = int(description.get("height", src.utils.SCREEN_HEIGHT))
+    src.utils.HEADLESS = True
+    _out_dir = out_dir
+    _image_format = image_format
+
+    # an initializer raising makes the pool respawn workers forever, the error is raised by the first job instead
+    try:
+        _renderer = src.Renderer()
+        buildScene(_renderer, description)
+        src.ressources.LOADER.wait()
+    except Exception as e:
+        _error = e
+        return
+
+    for _ in range(ENCODER_BUFFERS):
+        _buffers.put(np.empty((src.utils.SCREEN_HEIGHT, src.utils.SCREEN_WIDTH, 4), np.uint8))
+    threading.Thread(target=encodeWork, name="encoder", daemon=True).start()
+
+    # run when the worker exits after the pool is closed
+    multiprocessing.util.Finalize(None, cleanWorker, exitpriority=10)
+
+
+def cleanWorker(
+        ) -> None:
+    """
+    Function run by each worker process when it exits: deletes the GPU ressources of its renderer and its context.
+    """
+    global _renderer
+
+    if _renderer is None:
+        return
+
+    _renderer.quit()
+    _renderer.clean()
+    _renderer.window.terminate()
+    _renderer = None
+
+
+def renderFrames(
+        job: list[tuple[int, dict[str, typing.Any]]],
+        /
+        ) -> tuple[int, int, float]:
+    """
+    Function run by a worker for a chunk of frames: renders each pose and queues its pixels for the encoder.
+
+    Args:
+        job (`list[tuple[int,dict[str,typing.Any]]]`): Frame indices and their pose.
+    Returns:
+        `tuple[int,int,float]`: pid of the worker, number of frames written and seconds spent (encoding included).
+    Raises:
+        `Exception`: if the worker failed to initialize.
+    """
+    if _error is not None:
+        raise _error
+
+    renderer: src.Renderer = typing.cast(src.Renderer, _renderer)
+    start: float = time.perf_counter()
+
+    for index, pose in job:
+        src.profiler.PROFILER.beginFrame()
+        if pose.get("fov") is not None:
+            renderer.camera.fov = float(pose["fov"])
+            renderer.camera.proj_to_update = True
+        renderer.camera.lookAt(glm.vec3(*pose["pos"]), glm.vec3(*pose.get("target", [0.0, 0.0, 0.0])))
+        renderer.updateMatrices()
+
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)  # type: ignore
+        renderer.render()
+
+        pixels: np.ndarray = _buffers.get()
+        renderer.window.readPixels(pixels)
+        renderer.window.swapBuffers()
+        _frames.put((os.path.join(_out_dir, f"frame_{index:05d}.{_image_format}"), pixels))
+        src.profiler.PROFILER.endFrame()
+
+    # the chunk is done once its images are on disk
+    _frames.join()
+
+    return os.getpid(), len(job), time.perf_counter() - start
+
+
+def main() -> None:
+    """
+    Function that parses the command line, renders every pose across the workers and reports the throughput.
+
+    Raises:
+        `Exception`: if the description is invalid.
+    """
+    parser: argparse.ArgumentParser = argparse.ArgumentParser(description="Render stills of a scene offline.")
+    parser.add_argument("description", help="JSON scene description")
+    parser.add_argument("-o", "--out", default="renders", help="folder where images are written")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count() or 1, help="number of worker processes")
+    parser.add_argument("-c", "--chunk", type=int, default=16, help="number of frames sent to a worker at once")
+    parser.add_argument("-f", "--format", default="png", help="image extension")
+    args: argparse.Namespace = parser.parse_args()
+
+    extensions: set[str] = {extension.lstrip(".").lower() for extension in PIL.Image.registered_extensions()}
+    if args.format.lower() not in extensions:
+        parser.error(f"unknown image format '{args.format}', expected one of: {', '.join(sorted(extensions))}")
+
+    with open(args.description, "r") as file:
+        description: dict[str, typing.Any] = json.load(file)
+
+    poses: list[dict[str, typing.Any]] = loadPoses(description)
+    frames: list[tuple[int, dict[str, typing.Any]]] = list(enumerate(poses))
+    jobs: list[list[tuple[int, dict[str, typing.Any]]]] = [frames[i:i + args.chunk] for i in range(0, len(frames), args.chunk)]
+    workers: int = max(1, min(args.workers, len(jobs)))
+
+    os.makedirs(args.out, exist_ok=True)
+    print(f"Rendering {len(poses)} frames with {workers} workers.")
+
+    per_worker: dict[int, list[float]] = {}
+    start: float = time.perf_counter()
+
+    context: typing.Any = multiprocessing.get_context("spawn")
+    with context.Pool(workers, initializer=initWorker, initargs=(description, args.out, args.format)) as pool:
+        for pid, nb_frames, seconds in pool.imap_unordered(renderFrames, jobs):
+            stats: list[float] = per_worker.setdefault(pid, [0, 0.0])
+            stats[0] += nb_frames
+            stats[1] += seconds
+
+        # lets the workers exit on their own, so they clean their renderer
+        pool.close()
+        pool.join()
+
+    elapsed: float = time.perf_counter() - start
+
+    for i, (pid, (nb_frames, seconds)) in enumerate(sorted(per_worker.items())):
+        print(f"Worker {i} (pid {pid}): {int(nb_frames)} frames, {nb_frames / seconds:.1f} frames/s")
+    print(f"Total: {len(poses)} frames in {elapsed:.2f}s, {len(poses) / elapsed:.1f} frames/s (startup included),",
+          f"{sum(nb_frames / seconds for nb_frames, seconds in per_worker.values()):.1f} frames/s summed over workers")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,7 +18,6 @@ import os
 import time
 # pip imports
 import pyglm.glm as glm
-import glfw  # type: ignore
 import OpenGL.GL as GL  # type: ignore
 # local imports
 import src
@@ -108,7 +107,7 @@ def loopWork(
 
     Args:
         renderer (`src.Renderer`): The renderer.
-        delta_time (`float`): the time elapsed since last frame in seconds.
+        delta_time (`float`): the time simulated by the step in seconds (see `src.Renderer.simulate`).
     Raises:
         # TODO: set exceptions
     """
@@ -127,44 +126,47 @@ def main() -> None:
         # TODO: set exceptions
     """
     initUser()
-    renderer: src.Renderer = src.Renderer()
+    renderer: src.Renderer = src.Renderer(game_tick=loopWork)
     initWork(renderer)
 
-    current_frame: int = time.perf_counter_ns()
-    last_frame: int = current_frame
+    scheduler: src.FrameScheduler = src.FrameScheduler(
+        renderer.window,
+        on_stats=lambda stats: renderer.window.setTitle(f"{src.utils.WINDOW_NAME} - {stats.summary()}")
+    )
     delta_time: float = 0.0
-    nb_frames: int = 0
-    last_reset: float = 0.0
-    fps: float = 1.0
-
-    while not glfw.window_should_close(renderer.window):
-        current_frame = time.perf_counter_ns()
-        delta_time = (current_frame - last_frame) / 1e9
-        last_frame = current_frame
 
-        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)  # type: ignore
+    while not renderer.window.shouldClose():
+        src.profiler.PROFILER.beginFrame()
+        delta_time = scheduler.beginFrame()
 
-        renderer.keyCallback(delta_time)
+        renderer.simulate(delta_time)
+        renderer.updateMatrices()
 
-        loopWork(renderer, delta_time)
+        if not renderer.needsRender():
+            # nothing changed: sleep until an event instead of drawing the same frame
+            renderer.window.waitEvents(src.utils.IDLE_TIMEOUT)
+            scheduler.resync()
+            renderer.resync()
+            src.profiler.PROFILER.discardFrame()
+            continue
 
-        renderer.updateMatrices()
+        GL.glClear(GL.GL_COLOR_BUFFER_BIT | GL.GL_DEPTH_BUFFER_BIT)  # type: ignore
         renderer.render()
 
-        if last_reset > 0.5:
-            fps = nb_frames / last_reset
-            glfw.set_window_title(renderer.window, f"{src.utils.WINDOW_NAME} - Running at {fps:.1f} FPS")
-            nb_frames = 0
-            last_reset = 0.0
-        else:
-            nb_frames += 1
-            last_reset += delta_time
+        with src.profiler.PROFILER.zone("frame.wait"):
+            scheduler.endFrame()
+        with src.profiler.PROFILER.zone("frame.swap"):
+            renderer.window.swapBuffers()
+        with src.profiler.PROFILER.zone("frame.events"):
+            renderer.window.pollEvents()
+        src.profiler.PROFILER.endFrame()
 
-        glfw.swap_buffers(renderer.window)
-        glfw.poll_events()
+    if src.profiler.PROFILER.enabled:
+        print(src.profiler.PROFILER.summary())
+        src.profiler.PROFILER.exportChromeTrace(os.path.join(src.utils.ABS_PATH.root, "profile.json"))
 
-    renderer.scene.cleanRessources()
-    glfw.terminate()
+    renderer.clean()
+    renderer.window.terminate()
 
 
 if __name__ == "__main__":
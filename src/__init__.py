@@ -11,20 +11,41 @@ Sub-packages
 Modules
 -------
 - `utils`
+- `glstate`
+- `profiler`
 Classes
 -------
+- `Window`
+- `GlfwWindow`
+- `HeadlessWindow`
 - `Scene`
 - `Camera`
 - `FPSCamera`
 - `FreeCamera`
 - `OrbitCamera`
 - `TPSCamera`
+- `CullingStats`
+- `Culler`
+- `Instancer`
+- `RenderStats`
+- `RenderQueue`
+- `IndirectRenderer`
+- `Capture`
+- `FrameStats`
+- `FrameScheduler`
 - `Renderer`
 """
 
 
-from . import utils, ressources  # type: ignore # noqa: F401
+from . import utils, glstate, profiler, ressources  # type: ignore # noqa: F401
+from .window import Window, GlfwWindow, HeadlessWindow  # type: ignore # noqa: F401
 from .camera import Camera, FPSCamera, FreeCamera, OrbitCamera, TPSCamera  # type: ignore # noqa: F401
 from . import shapes  # type: ignore # noqa: F401
 from .scene import Scene  # type: ignore # noqa: F401
+from .culling import CullingStats, Culler  # type: ignore # noqa: F401
+from .instancing import Instancer  # type: ignore # noqa: F401
+from .render_queue import RenderStats, RenderQueue  # type: ignore # noqa: F401
+from .indirect import IndirectRenderer  # type: ignore # noqa: F401
+from .capture import Capture  # type: ignore # noqa: F401
+from .scheduler import FrameStats, FrameScheduler  # type: ignore # noqa: F401
 from .renderer import Renderer  # type: ignore # noqa: F401
@@ -19,10 +19,12 @@ Classes
 import typing
 import math
 # pip imports
+import numpy as np
 import pyglm.glm as glm
 import glfw  # type: ignore
+import OpenGL.GL as GL  # type: ignore
 # local imports
-from . import utils
+from . import utils, glstate, Window
 
 
 class Camera:
@@ -33,11 +35,17 @@ class Camera:
     Class to/that # TODO: set docstring
 
     Attributes:
-        # TODO: set attributes
+        ubo (`typing.Any`): std140 uniform buffer of the `Camera` block read by every shader (view, proj, position).
+        frustum (`np.ndarray`): The 6 normalized planes (a, b, c, d) of the view frustum, as `float32` rows, in world space.
     Methods
     -------
+    - `extractPlanes` (staticmethod)
     - `updateVectors`
+    - `lookAt`
     - `updateMatrices`
+    - `classifySphere`
+    - `classifySpheres`
+    - `clean`
     - `handleKeyboard`
     - `handleMouse`
     - `handleScroll`
@@ -60,6 +68,11 @@ class Camera:
         math.pi,
         None,
     ]
+    # std140 layout of the `Camera` uniform block
+    __UBO_VIEW_OFFSET: int = 0
+    __UBO_PROJ_OFFSET: int = 64
+    __UBO_POS_OFFSET: int = 128
+    __UBO_SIZE: int = 144
 
     def __init__(
             self: typing.Self,
@@ -70,11 +83,11 @@ class Camera:
         Method to/that # TODO: set docstring
 
         Args:
-            window (`typing.Any`): the GLFW window where we are.
+            window (`Window`): the window where we are.
         Raises:
             # TODO: set exceptions
         """
-        self.window: typing.Any = window
+        self.window: Window = window
 
         self.pos: glm.vec3 = glm.vec3(0, utils.PLAYER_SIZE * 0.95, 0)
         self.yaw: float = 0.0
@@ -88,16 +101,49 @@ class Camera:
 
         self.view: glm.mat4x4 = glm.mat4x4()
         self.proj: glm.mat4x4 = glm.mat4x4()
+        self.frustum: np.ndarray = np.zeros((6, 4), np.float32)
+        self.__planes: list[list[float]] = self.frustum.tolist()
 
-        self.mouse_last_x, self.mouse_last_y = glfw.get_cursor_pos(self.window)
+        self.mouse_last_x, self.mouse_last_y = self.window.getCursorPos()
 
         self.view_to_update: bool = True
         self.proj_to_update: bool = True
         self.to_render: bool = True
 
+        self.ubo: typing.Any = GL.glGenBuffers(1)
+        glstate.STATE.bindBuffer(GL.GL_UNIFORM_BUFFER, self.ubo)
+        GL.glBufferData(GL.GL_UNIFORM_BUFFER, Camera.__UBO_SIZE, None, GL.GL_DYNAMIC_DRAW)
+        glstate.STATE.bindBufferBase(GL.GL_UNIFORM_BUFFER, utils.CAMERA_UBO_BINDING, self.ubo)
+
         self.updateVectors()
         self.updateMatrices()
 
+    @staticmethod
+    def extractPlanes(
+            view_proj: glm.mat4x4,
+            /
+            ) -> np.ndarray:
+        """
+        Method that extracts the planes of the frustum of a view projection matrix (Gribb-Hartmann).
+
+        Args:
+            view_proj (`glm.mat4x4`): `proj * view`.
+        Returns:
+            `np.ndarray`: (6, 4) `float32` planes left, right, bottom, top, near, far, normals pointing inside.
+        """
+        rows: np.ndarray = np.array(view_proj.to_list(), np.float64).T  # glm is column major
+        planes: np.ndarray = np.array((
+            rows[3] + rows[0],
+            rows[3] - rows[0],
+            rows[3] + rows[1],
+            rows[3] - rows[1],
+            rows[3] + rows[2],
+            rows[3] - rows[2]
+        ))
+        planes /= np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+
+        return planes.astype(np.float32)
+
     def updateVectors(
             self: typing.Self,
             /
@@ -118,6 +164,27 @@ class Camera:
         self.right = glm.normalize(glm.cross(self.front, self.world_up))
         self.up = glm.normalize(glm.cross(self.right, self.front))
 
+    def lookAt(
+            self: typing.Self,
+            pos: glm.vec3,
+            target: glm.vec3,
+            /
+            ) -> None:
+        """
+        Method that places the camera at `pos` and turns it (yaw and pitch) to face `target`.
+
+        Args:
+            pos (`glm.vec3`): New position of the camera.
+            target (`glm.vec3`): Point to look at, must differ from `pos`.
+        """
+        direction: glm.vec3 = glm.normalize(target - pos)
+
+        self.pos = glm.vec3(pos)
+        self.yaw = math.atan2(direction.z, direction.x) % utils.TWO_PI
+        self.pitch = max(utils.MIN_CAM_PITCH, min(utils.MAX_CAM_PITCH, math.asin(direction.y)))
+        self.updateVectors()
+        self.view_to_update = True
+
     def updateMatrices(
             self: typing.Self,
             forced: bool = False,
@@ -131,25 +198,84 @@ class Camera:
         Raises:
             # TODO: set exceptions
         """
+        if not (self.view_to_update or self.proj_to_update or forced):
+            return
+
+        glstate.STATE.bindBuffer(GL.GL_UNIFORM_BUFFER, self.ubo)
+
         if self.view_to_update or forced:
             self.view = glm.lookAt(
                 self.pos,
                 self.pos + self.front,
                 self.up
             )
+            GL.glBufferSubData(GL.GL_UNIFORM_BUFFER, Camera.__UBO_VIEW_OFFSET, glm.sizeof(glm.mat4x4), glm.value_ptr(self.view))
+            GL.glBufferSubData(GL.GL_UNIFORM_BUFFER, Camera.__UBO_POS_OFFSET, glm.sizeof(glm.vec3), glm.value_ptr(self.pos))
             self.view_to_update = False
             self.to_render = True
 
         if self.proj_to_update or forced:
             self.proj = glm.perspective(
                 self.fov,
-                utils.SCREEN_WIDTH / utils.SCREEN_HEIGHT,
+                self.window.width / self.window.height,
                 utils.NEAR,
                 utils.FAR
             )
+            GL.glBufferSubData(GL.GL_UNIFORM_BUFFER, Camera.__UBO_PROJ_OFFSET, glm.sizeof(glm.mat4x4), glm.value_ptr(self.proj))
             self.proj_to_update = False
             self.to_render = True
 
+        self.frustum = Camera.extractPlanes(self.proj * self.view)
+        self.__planes = self.frustum.tolist()
+
+    def classifySphere(
+            self: typing.Self,
+            bound: glm.vec4,
+            /
+            ) -> int:
+        """
+        Method that tests a bounding sphere against the frustum.
+
+        Args:
+            bound (`glm.vec4`): Sphere center (xyz) and radius (w) in world space, a negative radius is unknown.
+        Returns:
+            `int`: -1 if fully outside, 1 if fully inside, 0 if intersecting or unknown.
+        """
+        if bound.w < 0:
+            return 0
+
+        side: int = 1
+        for a, b, c, d in self.__planes:
+            distance: float = a * bound.x + b * bound.y + c * bound.z + d
+            if distance < -bound.w:
+                return -1
+            if distance < bound.w:
+                side = 0
+
+        return side
+
+    def classifySpheres(
+            self: typing.Self,
+            bounds: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that tests many bounding spheres against the frustum at once.
+
+        Args:
+            bounds (`np.ndarray`): (N, 4) `float32` sphere centers (xyz) and radii (w), a negative radius is unknown.
+        Returns:
+            `np.ndarray`: (N,) `int8`, -1 if fully outside, 1 if fully inside, 0 if intersecting or unknown.
+        """
+        distances: np.ndarray = bounds[:, :3] @ self.frustum[:, :3].T + self.frustum[:, 3]
+        radii: np.ndarray = bounds[:, 3:4]
+
+        sides: np.ndarray = np.where((distances >= radii).all(axis=1), 1, 0).astype(np.int8)
+        sides[(distances < -radii).any(axis=1)] = -1
+        sides[bounds[:, 3] < 0] = 0
+
+        return sides
+
     def handleKeyboard(
             self: typing.Self,
             delta_time: float,
@@ -164,15 +290,16 @@ class Camera:
             # TODO: set exceptions
         """
         velocity: float = utils.MOVE_SPEED * delta_time
+        last_pos: glm.vec3 = glm.vec3(self.pos)
 
         combo: int = 0
-        if glfw.get_key(self.window, utils.KEY_BINDS.move_forward) == glfw.PRESS:
+        if self.window.getKey(utils.KEY_BINDS.move_forward) == glfw.PRESS:
             combo += 1
-        if glfw.get_key(self.window, utils.KEY_BINDS.move_backward) == glfw.PRESS:
+        if self.window.getKey(utils.KEY_BINDS.move_backward) == glfw.PRESS:
             combo += 2
-        if glfw.get_key(self.window, utils.KEY_BINDS.move_left) == glfw.PRESS:
+        if self.window.getKey(utils.KEY_BINDS.move_left) == glfw.PRESS:
             combo += 4
-        if glfw.get_key(self.window, utils.KEY_BINDS.move_right) == glfw.PRESS:
+        if self.window.getKey(utils.KEY_BINDS.move_right) == glfw.PRESS:
             combo += 8
 
         move_rot: float | None = Camera.__angles[combo]
@@ -185,15 +312,16 @@ class Camera:
             )
             self.pos += move_pos
 
-        if glfw.get_key(self.window, utils.KEY_BINDS.jump) == glfw.PRESS and glfw.get_key(self.window, utils.KEY_BINDS.sneak) == glfw.PRESS:
+        if self.window.getKey(utils.KEY_BINDS.jump) == glfw.PRESS and self.window.getKey(utils.KEY_BINDS.sneak) == glfw.PRESS:
             pass
-        elif glfw.get_key(self.window, utils.KEY_BINDS.jump) == glfw.PRESS:
+        elif self.window.getKey(utils.KEY_BINDS.jump) == glfw.PRESS:
             self.pos += self.world_up * utils.FLY_JUMP_HEIGHT * delta_time
-        elif glfw.get_key(self.window, utils.KEY_BINDS.sneak) == glfw.PRESS:
+        elif self.window.getKey(utils.KEY_BINDS.sneak) == glfw.PRESS:
             self.pos -= self.world_up * utils.FLY_SNEAK_HEIGHT * delta_time
 
         self.pos = glm.clamp(self.pos, -utils.BORDER, utils.BORDER)
-        self.view_to_update = True
+        if self.pos != last_pos:
+            self.view_to_update = True
 
     def handleMouse(
             self: typing.Self,
@@ -238,6 +366,17 @@ class Camera:
         self.fov = max(utils.MIN_ZOOM, min(utils.MAX_ZOOM, self.fov))
         self.proj_to_update = True
 
+    def clean(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that deletes the uniform buffer of the camera.
+        """
+        if self.ubo is not None:
+            glstate.STATE.deleteBuffers(self.ubo)
+            self.ubo = None
+
 
 class FPSCamera(Camera):
     """
@@ -260,7 +399,7 @@ class FPSCamera(Camera):
         Method to/that # TODO: set docstring
 
         Args:
-            window (`typing.Any`): the GLFW window where we are.
+            window (`Window`): the window where we are.
         Raises:
             # TODO: set exceptions
         """
@@ -289,7 +428,7 @@ class FreeCamera(Camera):
         Method to/that # TODO: set docstring
 
         Args:
-            window (`typing.Any`): the GLFW window where we are.
+            window (`Window`): the window where we are.
         Raises:
             # TODO: set exceptions
         """
@@ -318,7 +457,7 @@ class OrbitCamera(Camera):
         Method to/that # TODO: set docstring
 
         Args:
-            window (`typing.Any`): the GLFW window where we are.
+            window (`Window`): the window where we are.
         Raises:
             # TODO: set exceptions
         """
@@ -347,7 +486,7 @@ class TPSCamera(Camera):
         Method to/that # TODO: set docstring
 
         Args:
-            window (`typing.Any`): the GLFW window where we are.
+            window (`Window`): the window where we are.
         Raises:
             # TODO: set exceptions
         """
@@ -0,0 +1,233 @@
+"""
+capture module
+==============
+Package: `src`
+
+Module that records the frames drawn without stalling the render thread, through a ring of pixel buffer objects.
+
+Classes
+-------
+- `Capture`
+"""
+
+
+# built-in imports
+import os
+import typing
+import ctypes
+import threading
+import queue
+import subprocess
+import time
+# pip imports
+import numpy as np
+import PIL.Image
+import OpenGL.GL as GL  # type: ignore
+# local imports
+from . import glstate, profiler, Window
+
+
+class Capture:
+    """
+    Capture class
+    =============
+
+    Class that reads every frame in a pixel buffer object of a ring: `glReadPixels` only queues the copy,
+    the buffer is mapped `len(ring) - 1` frames later when the GPU is done with it, its pixels are copied in a buffer
+    of a pool and it is unmapped at once. The copy is handed to a writer thread that saves an image sequence
+    or pipes raw RGBA frames (bottom to top) to an encoder process, and goes back to the pool once written.
+
+    The render thread pays for the map and the copy, and only waits for the writer when every buffer
+    of the pool is queued, i.e. when the writer is `ring` frames behind.
+
+    Attributes:
+        window (`Window`): The window whose framebuffer is captured.
+        pattern (`str | None`): Path of the images with a `{}` replaced by the frame index (e.g. `captures/{:05d}.png`).
+        process (`subprocess.Popen | None`): Encoder process reading raw frames on its standard input.
+        frames (`int`): Number of frames captured.
+        written (`int`): Number of frames written by the writer thread.
+        cost (`float`): Mean time in seconds spent by `capture` on the render thread.
+    Methods
+    -------
+    - `ffmpegCommand` (staticmethod)
+    - `capture`
+    - `stop`
+    """
+    @staticmethod
+    def ffmpegCommand(
+            path: str,
+            width: int,
+            height: int,
+            fps: float,
+            /
+            ) -> list[str]:
+        """
+        Method that gives the command of an `ffmpeg` process encoding the raw frames in a H.264 video.
+
+        Args:
+            path (`str`): Path of the video.
+            width (`int`): Width of the frames.
+            height (`int`): Height of the frames.
+            fps (`float`): Frame rate of the video.
+        Returns:
+            `list[str]`: the command, to give to `Capture`.
+        """
+        return [
+            "ffmpeg", "-y", "-loglevel", "error",
+            "-f", "rawvideo", "-pix_fmt", "rgba", "-s", f"{width}x{height}", "-r", str(fps), "-i", "-",
+            "-vf", "vflip", "-c:v", "libx264", "-pix_fmt", "yuv420p", path
+        ]
+
+    def __init__(
+            self: typing.Self,
+            window: Window,
+            /,
+            *,
+            pattern: str | None = None,
+            command: list[str] | None = None,
+            ring: int = 3
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            window (`Window`): The window whose framebuffer is captured.
+            pattern (`str | None`): Path of the images with a `{}` replaced by the frame index.
+            command (`list[str] | None`): Command of an encoder process reading raw frames on its standard input, used instead of `pattern`.
+            ring (`int`): Number of pixel buffer objects (and of pooled copies), frames are written `ring - 1` frames after being drawn.
+        Raises:
+            `Exception`: if neither `pattern` nor `command` is given.
+        """
+        if pattern is None and command is None:
+            raise Exception("Capture needs an image pattern or an encoder command")
+
+        self.window: Window = window
+        self.pattern: str | None = pattern if command is None else None
+        self.process: subprocess.Popen | None = None
+        self.frames: int = 0
+        self.written: int = 0
+        self.cost: float = 0.0
+
+        self.__size: int = window.width * window.height * 4
+        self.__pbos: list[typing.Any] = list(GL.glGenBuffers(max(2, ring)))
+        self.__fences: list[typing.Any] = [None] * len(self.__pbos)
+        self.__indices: list[int] = [0] * len(self.__pbos)
+        self.__queue: queue.Queue[tuple[int, np.ndarray] | None] = queue.Queue()
+        # copies not queued to the writer
+        self.__pool: queue.Queue[np.ndarray] = queue.Queue()
+        for _ in self.__pbos:
+            self.__pool.put(np.empty((window.height, window.width, 4), np.uint8))
+
+        for pbo in self.__pbos:
+            glstate.STATE.bindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+            GL.glBufferData(GL.GL_PIXEL_PACK_BUFFER, self.__size, None, GL.GL_STREAM_READ)
+        glstate.STATE.bindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+        if command is not None:
+            self.process = subprocess.Popen(command, stdin=subprocess.PIPE)
+        elif os.path.dirname(pattern or ""):
+            os.makedirs(os.path.dirname(pattern or ""), exist_ok=True)
+
+        self.__writer: threading.Thread = threading.Thread(target=self.__writeWork, name="capture-writer", daemon=True)
+        self.__writer.start()
+
+    def __writeWork(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method run by the writer thread: writes each copied frame then gives its buffer back to the pool.
+        """
+        while True:
+            item: tuple[int, np.ndarray] | None = self.__queue.get()
+            if item is None:
+                break
+
+            index, pixels = item
+            try:
+                if self.process is not None:
+                    typing.cast(typing.IO[bytes], self.process.stdin).write(pixels.data)
+                else:
+                    # rows are read bottom to top
+                    PIL.Image.fromarray(pixels[::-1]).save(typing.cast(str, self.pattern).format(index))
+                self.written += 1
+            except (OSError, ValueError) as e:
+                print(f"Error writing captured frame {index}: {e}")
+            finally:
+                self.__pool.put(pixels)
+
+    def __handOff(
+            self: typing.Self,
+            slot: int,
+            /
+            ) -> None:
+        """
+        Method that maps a buffer whose copy was queued, copies its pixels in a buffer of the pool for the writer and unmaps it.
+
+        Args:
+            slot (`int`): Index of the buffer in the ring.
+        """
+        fence: typing.Any = self.__fences[slot]
+        if fence is None:
+            return
+
+        GL.glClientWaitSync(fence, GL.GL_SYNC_FLUSH_COMMANDS_BIT, GL.GL_TIMEOUT_IGNORED)
+        GL.glDeleteSync(fence)
+        self.__fences[slot] = None
+
+        # waits only if the writer holds every buffer of the pool
+        pixels: np.ndarray = self.__pool.get()
+
+        glstate.STATE.bindBuffer(GL.GL_PIXEL_PACK_BUFFER, self.__pbos[slot])
+        address: int = GL.glMapBufferRange(GL.GL_PIXEL_PACK_BUFFER, 0, self.__size, GL.GL_MAP_READ_BIT)
+        ctypes.memmove(pixels.ctypes.data, address, self.__size)
+        GL.glUnmapBuffer(GL.GL_PIXEL_PACK_BUFFER)
+
+        self.__queue.put((self.__indices[slot], pixels))
+
+    @profiler.PROFILER.profiled("capture.readback")
+    def capture(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that queues the copy of the frame drawn in the next buffer of the ring,
+        and hands the oldest copy to the writer. Must be called after drawing and before swapping buffers.
+        """
+        start: float = time.perf_counter()
+        # handed off and unmapped by the previous call
+        slot: int = self.frames % len(self.__pbos)
+
+        glstate.STATE.bindBuffer(GL.GL_PIXEL_PACK_BUFFER, self.__pbos[slot])
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self.window.framebuffer)
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        GL.glReadPixels(0, 0, self.window.width, self.window.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, ctypes.c_void_p(0))
+        self.__fences[slot] = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+        self.__indices[slot] = self.frames
+
+        self.frames += 1
+        self.__handOff(self.frames % len(self.__pbos))
+        glstate.STATE.bindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+        self.cost += (time.perf_counter() - start - self.cost) / self.frames
+
+    def stop(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that writes the frames still in the ring, stops the writer, deletes the buffers and waits for the encoder process.
+        """
+        for i in range(1, len(self.__pbos) + 1):
+            self.__handOff((self.frames + i) % len(self.__pbos))
+
+        self.__queue.put(None)
+        self.__writer.join()
+
+        glstate.STATE.bindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        glstate.STATE.deleteBuffers(*self.__pbos)
+        self.__pbos = []
+
+        if self.process is not None:
+            typing.cast(typing.IO[bytes], self.process.stdin).close()
+            self.process.wait()
@@ -0,0 +1,156 @@
+"""
+culling module
+==============
+Package: `src`
+
+Module that removes the shapes outside the view frustum before they are drawn.
+
+Classes
+-------
+- `CullingStats`
+- `Culler`
+"""
+
+
+# built-in imports
+import typing
+import dataclasses
+# pip imports
+import numpy as np
+import pyglm.glm as glm
+# local imports
+from . import utils, profiler, shapes, Camera
+
+
+@dataclasses.dataclass
+class CullingStats:
+    """
+    CullingStats class
+    ==================
+
+    Class that counts the work done by the last culling pass.
+
+    Attributes:
+        tested (`int`): Number of bounds tested against the frustum.
+        culled (`int`): Number of bounds rejected (a whole subtree for a node).
+        drawn (`int`): Number of shapes kept to be drawn.
+    Methods
+    -------
+    - `reset`
+    """
+    tested: int = 0
+    culled: int = 0
+    drawn: int = 0
+
+    def reset(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that sets every counter back to 0.
+        """
+        self.tested = 0
+        self.culled = 0
+        self.drawn = 0
+
+
+class Culler:
+    """
+    Culler class
+    ============
+
+    Class that walks the scene graph and keeps the shapes whose bounding sphere intersects the frustum of a camera.
+
+    Each node is tested with the aggregate bound of its subtree (see `shapes.Node.getTreeBound`):
+    a subtree fully outside is rejected at once, a subtree fully inside is collected without more tests.
+    Children of an intersecting node are tested with one NumPy batch from `utils.CULLING_BATCH` children.
+
+    Attributes:
+        enabled (`bool`): If False, every shape is kept.
+        stats (`CullingStats`): Counters of the last `collect`.
+    Methods
+    -------
+    - `collect`
+    """
+    def __init__(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+        """
+        self.enabled: bool = True
+        self.stats: CullingStats = CullingStats()
+
+    @profiler.PROFILER.profiled("scene.cull")
+    def collect(
+            self: typing.Self,
+            root: shapes.Shape,
+            cam: Camera,
+            /
+            ) -> list[shapes.Shape]:
+        """
+        Method that gives the drawable shapes of `root` (and its children) not outside the frustum of `cam`.
+
+        `tested` and `culled` count bounds (a rejected subtree counts once), `drawn` counts shapes.
+
+        Args:
+            root (`shapes.Shape`): The shape or node (e.g. the scene) to walk.
+            cam (`Camera`): The camera whose frustum is used.
+        Returns:
+            `list[shapes.Shape]`: the visible shapes.
+        """
+        self.stats.reset()
+        visible: list[shapes.Shape] = []
+
+        if not self.enabled:
+            root.collect(visible)
+            self.stats.drawn = len(visible)
+            return visible
+
+        stack: list[tuple[shapes.Shape, int | None]] = [(root, None)]
+
+        while stack:
+            element, side = stack.pop()
+
+            if side is None:
+                bound: glm.vec4 | None = element.getTreeBound()
+                if bound is None:
+                    continue
+                side = cam.classifySphere(bound)
+                self.stats.tested += 1
+
+            if side < 0:
+                self.stats.culled += 1
+                continue
+
+            if side > 0 or not isinstance(element, shapes.Node):
+                element.collect(visible)
+                continue
+
+            # intersecting node: its own mesh, then its children
+            if element.mesh is not None:
+                self.stats.tested += 1
+                if cam.classifySphere(element.bound) >= 0:
+                    shapes.Shape.collect(element, visible)
+                else:
+                    self.stats.culled += 1
+
+            children: list[shapes.Shape] = list(element.children.values())
+
+            if len(children) < utils.CULLING_BATCH:
+                stack.extend((child, None) for child in reversed(children))
+                continue
+
+            bounds: list[glm.vec4 | None] = [child.getTreeBound() for child in children]
+            tested: list[tuple[shapes.Shape, glm.vec4]] = [(child, child_bound) for child, child_bound in zip(children, bounds) if child_bound is not None]
+            if not tested:
+                continue
+
+            sides: np.ndarray = cam.classifySpheres(np.frombuffer(b"".join(child_bound.to_bytes() for _, child_bound in tested), np.float32).reshape(-1, 4))
+            self.stats.tested += len(tested)
+            stack.extend((child, child_side) for (child, _), child_side in zip(reversed(tested), reversed(sides.tolist())))
+
+        self.stats.drawn = len(visible)
+
+        return visible
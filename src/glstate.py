@@ -0,0 +1,492 @@
+"""
+glstate module
+==============
+Package: `src`
+
+Module that mirrors the OpenGL state of the current context and drops calls that would not change it.
+
+Classes
+-------
+- `GLState`
+Globals
+-------
+- `STATE`: State of the context current in the calling thread.
+"""
+
+
+# built-in imports
+import typing
+import threading
+import weakref
+# pip imports
+import OpenGL.GL as GL  # type: ignore
+# local imports
+from . import utils
+
+
+class GLState(threading.local):
+    """
+    GLState class
+    =============
+
+    Class that keeps a copy of the bound program, VAO, texture units, buffers and capabilities,
+    so binding what is already bound costs a dict lookup instead of a GL call.
+
+    It is thread local: every thread owning a context (render thread, upload worker) gets its own mirror.
+    Buffers and textures are shared by the contexts, so deleting them also makes their bindings unknown
+    in the mirrors of the other threads (a recycled name is then bound again for real).
+    Uniform values are mirrored per program by `ressources.Shader`.
+
+    Unknown values are `None`, the next call always goes to OpenGL and fills them.
+
+    Attributes:
+        debug (`bool`): If every skipped call is checked against `glGet*` first (slow).
+        calls (`int`): Number of calls sent to OpenGL.
+        skipped (`int`): Number of calls dropped because nothing would change.
+    Methods
+    -------
+    - `invalidate`
+    - `useProgram`
+    - `bindVertexArray`
+    - `activeTexture`
+    - `bindTexture`
+    - `bindBuffer`
+    - `bindBufferBase`
+    - `setCapability`
+    - `depthMask`
+    - `blendFunc`
+    - `deleteProgram`
+    - `deleteVertexArray`
+    - `deleteBuffers`
+    - `deleteTexture`
+    - `validate`
+    """
+    __BUFFER_QUERIES: dict[int, int] = {
+        GL.GL_ARRAY_BUFFER: GL.GL_ARRAY_BUFFER_BINDING,
+        GL.GL_ELEMENT_ARRAY_BUFFER: GL.GL_ELEMENT_ARRAY_BUFFER_BINDING,
+        GL.GL_UNIFORM_BUFFER: GL.GL_UNIFORM_BUFFER_BINDING,
+        GL.GL_PIXEL_PACK_BUFFER: GL.GL_PIXEL_PACK_BUFFER_BINDING,
+        GL.GL_PIXEL_UNPACK_BUFFER: GL.GL_PIXEL_UNPACK_BUFFER_BINDING,
+        GL.GL_DRAW_INDIRECT_BUFFER: GL.GL_DRAW_INDIRECT_BUFFER_BINDING,
+        GL.GL_SHADER_STORAGE_BUFFER: GL.GL_SHADER_STORAGE_BUFFER_BINDING,
+    }
+    __TEXTURE_QUERIES: dict[int, int] = {
+        GL.GL_TEXTURE_2D: GL.GL_TEXTURE_BINDING_2D,
+    }
+    # buffer and texture names deleted by another thread, per thread, not yet forgotten by its mirror
+    __deleted: weakref.WeakKeyDictionary[threading.Thread, set[typing.Any]] = weakref.WeakKeyDictionary()
+    __deleted_lock: threading.Lock = threading.Lock()
+
+    def __init__(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+        """
+        self.debug: bool = utils.GL_STATE_DEBUG
+        self.calls: int = 0
+        self.skipped: int = 0
+
+        self.__inbox: set[typing.Any] = set()
+        with GLState.__deleted_lock:
+            GLState.__deleted[threading.current_thread()] = self.__inbox
+
+        self.invalidate()
+
+    def invalidate(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that forgets the whole mirror, to call after OpenGL was used without this module (or a new context).
+        """
+        self.__program: typing.Any = None
+        self.__vao: typing.Any = None
+        self.__unit: int | None = None
+        self.__textures: dict[tuple[int, int], typing.Any] = {}
+        self.__buffers: dict[int, typing.Any] = {}
+        self.__bases: dict[tuple[int, int], typing.Any] = {}
+        self.__capabilities: dict[int, bool] = {}
+        self.__depth_mask: bool | None = None
+        self.__blend_func: tuple[int, int] | None = None
+
+    def __check(
+            self: typing.Self,
+            what: str,
+            mirrored: typing.Any,
+            actual: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that raises if a mirrored value is not the real one.
+
+        Args:
+            what (`str`): Name of the state, for the message.
+            mirrored (`typing.Any`): Value in the mirror.
+            actual (`typing.Any`): Value from `glGet*`.
+        Raises:
+            `Exception`: if both values are different.
+        """
+        if int(mirrored or 0) != int(actual or 0):
+            raise Exception(f"GL state mismatch on {what}: mirrored {mirrored}, actual {actual}")
+
+    def __shareDeleted(
+            self: typing.Self,
+            names: typing.Iterable[typing.Any],
+            /
+            ) -> None:
+        """
+        Method that tells the mirrors of the other threads that buffers or textures were deleted.
+
+        Args:
+            names (`typing.Iterable[typing.Any]`): Deleted names.
+        """
+        current: threading.Thread = threading.current_thread()
+        with GLState.__deleted_lock:
+            for thread, inbox in GLState.__deleted.items():
+                if thread is not current:
+                    inbox.update(names)
+
+    def __forgetDeleted(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that makes unknown the bindings of the buffers and textures deleted by other threads.
+        """
+        with GLState.__deleted_lock:
+            deleted: set[typing.Any] = set(self.__inbox)
+            self.__inbox.clear()
+
+        for mirror in (self.__textures, self.__buffers, self.__bases):
+            for key, bound in list(mirror.items()):
+                if bound in deleted:
+                    mirror[key] = None
+
+    def useProgram(
+            self: typing.Self,
+            program: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that makes `program` the program in use.
+
+        Args:
+            program (`typing.Any`): Program name, 0 for none.
+        """
+        if program == self.__program and program is not None:
+            if self.debug:
+                self.__check("program", program, GL.glGetIntegerv(GL.GL_CURRENT_PROGRAM))
+            self.skipped += 1
+            return
+
+        GL.glUseProgram(program)
+        self.__program = program
+        self.calls += 1
+
+    def bindVertexArray(
+            self: typing.Self,
+            vao: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that binds `vao`, the element array buffer binding is part of the VAO so it is forgotten.
+
+        Args:
+            vao (`typing.Any`): VAO name, 0 for none.
+        """
+        if vao == self.__vao and vao is not None:
+            if self.debug:
+                self.__check("vertex array", vao, GL.glGetIntegerv(GL.GL_VERTEX_ARRAY_BINDING))
+            self.skipped += 1
+            return
+
+        GL.glBindVertexArray(vao)
+        self.__vao = vao
+        self.__buffers.pop(GL.GL_ELEMENT_ARRAY_BUFFER, None)
+        self.calls += 1
+
+    def activeTexture(
+            self: typing.Self,
+            unit: int,
+            /
+            ) -> None:
+        """
+        Method that selects the active texture unit.
+
+        Args:
+            unit (`int`): Unit index (0 for `GL_TEXTURE0`).
+        """
+        if unit == self.__unit:
+            if self.debug:
+                self.__check("active texture", GL.GL_TEXTURE0 + unit, GL.glGetIntegerv(GL.GL_ACTIVE_TEXTURE))
+            self.skipped += 1
+            return
+
+        GL.glActiveTexture(GL.GL_TEXTURE0 + unit)
+        self.__unit = unit
+        self.calls += 1
+
+    def bindTexture(
+            self: typing.Self,
+            target: int,
+            texture: typing.Any,
+            unit: int = 0,
+            /
+            ) -> None:
+        """
+        Method that binds `texture` to `target` of a texture unit, switching the active unit only if needed.
+
+        Args:
+            target (`int`): Texture target (e.g. `GL_TEXTURE_2D`).
+            texture (`typing.Any`): Texture name, 0 for none.
+            unit (`int`): Unit index (0 for `GL_TEXTURE0`).
+        """
+        if self.__inbox:
+            self.__forgetDeleted()
+
+        if texture == self.__textures.get((unit, target)) and texture is not None:
+            if self.debug and target in GLState.__TEXTURE_QUERIES:
+                self.activeTexture(unit)
+                self.__check(f"texture unit {unit}", texture, GL.glGetIntegerv(GLState.__TEXTURE_QUERIES[target]))
+            self.skipped += 1
+            return
+
+        self.activeTexture(unit)
+        GL.glBindTexture(target, texture)
+        self.__textures[(unit, target)] = texture
+        self.calls += 1
+
+    def bindBuffer(
+            self: typing.Self,
+            target: int,
+            buffer: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that binds `buffer` to `target`.
+
+        Args:
+            target (`int`): Buffer target (e.g. `GL_ARRAY_BUFFER`).
+            buffer (`typing.Any`): Buffer name, 0 for none.
+        """
+        if self.__inbox:
+            self.__forgetDeleted()
+
+        if buffer == self.__buffers.get(target) and buffer is not None:
+            if self.debug and target in GLState.__BUFFER_QUERIES:
+                self.__check(f"buffer {target}", buffer, GL.glGetIntegerv(GLState.__BUFFER_QUERIES[target]))
+            self.skipped += 1
+            return
+
+        GL.glBindBuffer(target, buffer)
+        self.__buffers[target] = buffer
+        self.calls += 1
+
+    def bindBufferBase(
+            self: typing.Self,
+            target: int,
+            index: int,
+            buffer: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that binds `buffer` to an indexed binding point, it is also bound to the generic `target`.
+
+        Args:
+            target (`int`): Indexed buffer target (e.g. `GL_UNIFORM_BUFFER`).
+            index (`int`): Binding point.
+            buffer (`typing.Any`): Buffer name, 0 for none.
+        """
+        if self.__inbox:
+            self.__forgetDeleted()
+
+        if buffer == self.__bases.get((target, index)) and buffer is not None:
+            self.skipped += 1
+            return
+
+        GL.glBindBufferBase(target, index, buffer)
+        self.__bases[(target, index)] = buffer
+        self.__buffers[target] = buffer
+        self.calls += 1
+
+    def setCapability(
+            self: typing.Self,
+            capability: int,
+            enabled: bool,
+            /
+            ) -> None:
+        """
+        Method that enables or disables a capability (e.g. `GL_DEPTH_TEST`, `GL_BLEND`).
+
+        Args:
+            capability (`int`): The capability.
+            enabled (`bool`): If it is enabled.
+        """
+        if self.__capabilities.get(capability) == enabled:
+            if self.debug:
+                self.__check(f"capability {capability}", enabled, GL.glIsEnabled(capability))
+            self.skipped += 1
+            return
+
+        if enabled:
+            GL.glEnable(capability)
+        else:
+            GL.glDisable(capability)
+        self.__capabilities[capability] = enabled
+        self.calls += 1
+
+    def depthMask(
+            self: typing.Self,
+            enabled: bool,
+            /
+            ) -> None:
+        """
+        Method that enables or disables writes to the depth buffer.
+
+        Args:
+            enabled (`bool`): If depth is written.
+        """
+        if self.__depth_mask == enabled:
+            if self.debug:
+                self.__check("depth mask", enabled, GL.glGetBooleanv(GL.GL_DEPTH_WRITEMASK))
+            self.skipped += 1
+            return
+
+        GL.glDepthMask(GL.GL_TRUE if enabled else GL.GL_FALSE)
+        self.__depth_mask = enabled
+        self.calls += 1
+
+    def blendFunc(
+            self: typing.Self,
+            source: int,
+            destination: int,
+            /
+            ) -> None:
+        """
+        Method that sets the blend factors.
+
+        Args:
+            source (`int`): Source factor (e.g. `GL_SRC_ALPHA`).
+            destination (`int`): Destination factor (e.g. `GL_ONE_MINUS_SRC_ALPHA`).
+        """
+        if self.__blend_func == (source, destination):
+            if self.debug:
+                self.__check("blend source", source, GL.glGetIntegerv(GL.GL_BLEND_SRC_RGB))
+                self.__check("blend destination", destination, GL.glGetIntegerv(GL.GL_BLEND_DST_RGB))
+            self.skipped += 1
+            return
+
+        GL.glBlendFunc(source, destination)
+        self.__blend_func = (source, destination)
+        self.calls += 1
+
+    def deleteProgram(
+            self: typing.Self,
+            program: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that deletes a program, unbinding it first if it is in use.
+
+        Args:
+            program (`typing.Any`): Program name.
+        """
+        if program == self.__program:
+            self.useProgram(0)
+        GL.glDeleteProgram(program)
+
+    def deleteVertexArray(
+            self: typing.Self,
+            vao: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that deletes a VAO (deleting the bound VAO binds 0).
+
+        Args:
+            vao (`typing.Any`): VAO name.
+        """
+        GL.glDeleteVertexArrays(1, (vao,))
+        if vao == self.__vao:
+            self.__vao = 0
+            self.__buffers.pop(GL.GL_ELEMENT_ARRAY_BUFFER, None)
+
+    def deleteBuffers(
+            self: typing.Self,
+            /,
+            *buffers: typing.Any
+            ) -> None:
+        """
+        Method that deletes buffers (deleting a bound buffer binds 0 to its targets),
+        their bindings in the mirrors of the other threads become unknown.
+
+        Args:
+            *buffers (`typing.Any`): Buffer names.
+        """
+        GL.glDeleteBuffers(len(buffers), buffers)
+        for target, bound in list(self.__buffers.items()):
+            if bound in buffers:
+                self.__buffers[target] = 0
+        for key, bound in list(self.__bases.items()):
+            if bound in buffers:
+                self.__bases[key] = 0
+        self.__shareDeleted(buffers)
+
+    def deleteTexture(
+            self: typing.Self,
+            texture: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that deletes a texture (deleting a bound texture binds 0 to its units),
+        its bindings in the mirrors of the other threads become unknown.
+
+        Args:
+            texture (`typing.Any`): Texture name.
+        """
+        GL.glDeleteTextures(1, (texture,))
+        for key, bound in list(self.__textures.items()):
+            if bound == texture:
+                self.__textures[key] = 0
+        self.__shareDeleted((texture,))
+
+    def validate(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that compares every known mirrored value with `glGet*` queries.
+
+        Raises:
+            `Exception`: on the first mismatch.
+        """
+        if self.__program is not None:
+            self.__check("program", self.__program, GL.glGetIntegerv(GL.GL_CURRENT_PROGRAM))
+        if self.__vao is not None:
+            self.__check("vertex array", self.__vao, GL.glGetIntegerv(GL.GL_VERTEX_ARRAY_BINDING))
+
+        for target, buffer in self.__buffers.items():
+            if target in GLState.__BUFFER_QUERIES:
+                self.__check(f"buffer {target}", buffer, GL.glGetIntegerv(GLState.__BUFFER_QUERIES[target]))
+
+        for capability, enabled in self.__capabilities.items():
+            self.__check(f"capability {capability}", enabled, GL.glIsEnabled(capability))
+
+        if self.__depth_mask is not None:
+            self.__check("depth mask", self.__depth_mask, GL.glGetBooleanv(GL.GL_DEPTH_WRITEMASK))
+
+        if self.__unit is not None:
+            self.__check("active texture", GL.GL_TEXTURE0 + self.__unit, GL.glGetIntegerv(GL.GL_ACTIVE_TEXTURE))
+
+        unit: int | None = self.__unit
+        for (texture_unit, target), texture in self.__textures.items():
+            if target in GLState.__TEXTURE_QUERIES:
+                self.activeTexture(texture_unit)
+                self.__check(f"texture unit {texture_unit}", texture, GL.glGetIntegerv(GLState.__TEXTURE_QUERIES[target]))
+        if unit is not None:
+            self.activeTexture(unit)
+
+
+STATE: GLState = GLState()
@@ -0,0 +1,463 @@
+"""
+indirect module
+===============
+Package: `src`
+
+Module that draws a static scene with a few `glMultiDrawElementsIndirect` calls (OpenGL 4.3).
+
+Classes
+-------
+- `IndirectRenderer`
+"""
+
+
+# built-in imports
+import os
+import typing
+# pip imports
+import numpy as np
+import pyglm.glm as glm
+import OpenGL.GL as GL  # type: ignore
+from OpenGL.GL.ARB.indirect_parameters import glMultiDrawElementsIndirectCountARB, GL_PARAMETER_BUFFER_ARB  # type: ignore
+# local imports
+from . import utils, glstate, profiler, ressources, shapes, Window, Camera
+
+
+class IndirectRenderer:
+    """
+    IndirectRenderer class
+    ======================
+
+    Class that writes the per-object data (model, normal matrix, color, bound) of a scene in a shader storage buffer
+    and draws, from the shared buffers of `ressources.GEOMETRY`, each group of shapes
+    sharing (shader, texture, light flag) with one `glMultiDrawElementsIndirect`.
+
+    The command array is a NumPy structured array uploaded as is. Culling is done either
+    on the GPU by a compute shader (compacting the commands when `GL_ARB_indirect_parameters` is available,
+    otherwise zeroing their instance count), or on the CPU with one NumPy batch.
+
+    Shapes moving or changing color (marked to render in `shapes.TRANSFORMS`) have their rows rebuilt in batch
+    and only the ranges holding them are uploaded. The buffers are rebuilt when shapes are added, removed
+    or moved in the hierarchy (`shapes.TRANSFORMS.structure` changed) and when the geometry pool grows;
+    `invalidate` must be called when the shader, mesh or texture of a shape changes.
+
+    Attributes:
+        gpu_culling (`bool`): If culling is done by a compute shader.
+        compact (`bool`): If the compute shader compacts the commands (needs indirect count).
+        built (`bool`): If the buffers match the scene.
+        objects (`int`): Number of shapes in the buffers.
+        draws (`int`): Number of multi draw calls issued by the last `render`.
+        drawn (`int | None`): Number of shapes not culled by the last `render`, None when culled on the GPU.
+    Methods
+    -------
+    - `isSupported` (staticmethod)
+    - `invalidate`
+    - `getShader`
+    - `build`
+    - `render`
+    - `clean`
+    """
+    __COMMAND: np.dtype = np.dtype([
+        ("count", np.uint32),
+        ("instance_count", np.uint32),
+        ("first_index", np.uint32),
+        ("base_vertex", np.int32),
+        ("base_instance", np.uint32)
+    ])
+    # model mat4, normal mat4 (mat3 padded), color vec4, bound vec4
+    __OBJECT_FLOATS: int = 40
+    __BOUND_OFFSET: int = 36
+    # number of ranges of changed objects uploaded one by one, above it the span covering them is uploaded
+    __MAX_RANGES: int = 16
+    __WORK_GROUP_SIZE: int = 64
+
+    @staticmethod
+    def isSupported(
+            ) -> bool:
+        """
+        Method that tells if the current context can draw indirect from shader storage buffers.
+
+        Returns:
+            `bool`: True for OpenGL 4.3 or later.
+        """
+        try:
+            version: tuple[int, int] = (int(GL.glGetIntegerv(GL.GL_MAJOR_VERSION)), int(GL.glGetIntegerv(GL.GL_MINOR_VERSION)))
+        except GL.GLError:
+            return False
+
+        return version >= (4, 3)
+
+    def __init__(
+            self: typing.Self,
+            gpu_culling: bool = True,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            gpu_culling (`bool`): If culling is done by a compute shader.
+        """
+        self.gpu_culling: bool = gpu_culling
+        self.compact: bool = Window.extensionSupported("GL_ARB_indirect_parameters")
+        self.built: bool = False
+        self.objects: int = 0
+        self.draws: int = 0
+        self.drawn: int | None = None
+
+        self.__shaders: dict[str, ressources.Shader] = {}
+        self.__cull_program: typing.Any = None
+        self.__cull_uniforms: dict[str, int] = {}
+
+        self.__vao: typing.Any = GL.glGenVertexArrays(1)
+        self.__generation: int = -1
+        self.__structure: int = -1
+        self.__ids, self.__objects_ssbo, self.__commands_ssbo, self.__visible_buffer, self.__counts_buffer, self.__groups_ssbo = GL.glGenBuffers(6)
+
+        self.__elements: list[shapes.Shape] = []
+        self.__rows: np.ndarray = np.zeros(0, np.int64)
+        self.__groups: list[tuple[ressources.Shader, ressources.Texture | None, bool, int, int]] = []
+        self.__objects: np.ndarray = np.zeros((0, IndirectRenderer.__OBJECT_FLOATS), np.float32)
+        self.__commands: np.ndarray = np.zeros(0, IndirectRenderer.__COMMAND)
+        self.__command_groups: np.ndarray = np.zeros(0, np.uint32)
+        self.__draw_firsts: np.ndarray = np.zeros(0, np.int64)
+        self.__draw_counts: np.ndarray = np.zeros(0, np.int64)
+
+    def invalidate(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that asks to rebuild the buffers at the next `render`, to call when the shader, mesh or texture of a shape changed.
+        """
+        self.built = False
+
+    def getShader(
+            self: typing.Self,
+            shader: ressources.Shader,
+            /
+            ) -> ressources.Shader | None:
+        """
+        Method that gives the indirect variant of a shader (same name with `utils.INDIRECT_SUFFIX`).
+
+        Args:
+            shader (`ressources.Shader`): The shader used by shapes when drawn one by one.
+        Returns:
+            `ressources.Shader | None`: the variant if it is ready to be used.
+        """
+        variant: ressources.Shader | None = self.__shaders.get(shader.name)
+
+        if variant is None:
+            variant = ressources.Shader(shader.name + utils.INDIRECT_SUFFIX)
+            self.__shaders[shader.name] = variant
+
+        return variant if variant.ready else None
+
+    def __compileCulling(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that builds the compute program culling the commands, disables GPU culling on failure.
+        """
+        try:
+            with open(os.path.join(utils.ABS_PATH.shaders, "cull_mdi" + utils.EXTENSIONS.shader_comp), "r") as file:
+                compute: typing.Any = ressources.Shader.compileShader(file.read(), GL.GL_COMPUTE_SHADER)
+
+            program: typing.Any = GL.glCreateProgram()
+            GL.glAttachShader(program, compute)
+            GL.glLinkProgram(program)
+            GL.glDeleteShader(compute)
+
+            if not GL.glGetProgramiv(program, GL.GL_LINK_STATUS):
+                error: typing.Any = GL.glGetProgramInfoLog(program)
+                GL.glDeleteProgram(program)
+                raise Exception(error)
+        except Exception as e:
+            print(f"Warning: failed to build the culling compute shader, culling on the CPU: {e}")
+            self.gpu_culling = False
+            return
+
+        self.__cull_program = program
+        self.__cull_uniforms = {name: GL.glGetUniformLocation(program, name) for name in ("planes_vec4", "commands_uint", "compact_bool")}
+
+    def build(
+            self: typing.Self,
+            root: shapes.Shape,
+            /
+            ) -> bool:
+        """
+        Method that fills every buffer from the drawable shapes of `root`.
+
+        Nothing is built while ressources are loading or while an indirect shader variant is not ready.
+
+        Args:
+            root (`shapes.Shape`): The shape or node (e.g. the scene) to draw.
+        Returns:
+            `bool`: if the buffers are built.
+        """
+        if ressources.LOADER.pending:
+            return False
+
+        elements: list[shapes.Shape] = []
+        root.collect(elements)
+        if not elements:
+            return False
+
+        groups: dict[tuple[typing.Any, ...], list[shapes.Shape]] = {}
+        for element in elements:
+            variant: ressources.Shader | None = self.getShader(element.shader)  # type: ignore
+            if variant is None:
+                return False
+            groups.setdefault((variant, element.texture, element.has_light), []).append(element)
+
+        if self.gpu_culling and self.__cull_program is None:
+            self.__compileCulling()
+
+        self.__elements = [element for members in groups.values() for element in members]
+        self.__rows = np.fromiter((element.transform for element in self.__elements), np.int64, len(self.__elements))
+        self.__groups = []
+        self.objects = len(self.__elements)
+
+        commands: np.ndarray = np.zeros(self.objects, IndirectRenderer.__COMMAND)
+        command_groups: np.ndarray = np.zeros((self.objects, 2), np.uint32)
+        first: int = 0
+
+        for group, ((variant, texture, has_light), members) in enumerate(groups.items()):
+            self.__groups.append((variant, texture, has_light, first, len(members)))
+            command_groups[first:first + len(members)] = (group, first)
+            first += len(members)
+
+        for i, element in enumerate(self.__elements):
+            mesh: ressources.Mesh = element.mesh  # type: ignore
+            commands[i] = (len(mesh.indices), 1, mesh.first_index, mesh.base_vertex, i)
+
+        self.__commands = commands
+        self.__command_groups = command_groups[:, 0].copy()
+        self.__objects = np.zeros((self.objects, IndirectRenderer.__OBJECT_FLOATS), np.float32)
+        self.__writeObjects(np.arange(self.objects))
+
+        # same vertex format as the shared VAO of the geometry pool, plus the object index
+        glstate.STATE.bindVertexArray(self.__vao)
+
+        glstate.STATE.bindBuffer(GL.GL_ARRAY_BUFFER, ressources.GEOMETRY.vbo)
+        stride: int = ressources.GeometryPool.VERTEX_BYTES
+        GL.glVertexAttribPointer(0, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(0))
+        GL.glEnableVertexAttribArray(0)
+        GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(12))
+        GL.glEnableVertexAttribArray(1)
+        GL.glVertexAttribPointer(2, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(20))
+        GL.glEnableVertexAttribArray(2)
+
+        # object index read by the shaders, equal to the base instance of the command
+        glstate.STATE.bindBuffer(GL.GL_ARRAY_BUFFER, self.__ids)
+        GL.glBufferData(GL.GL_ARRAY_BUFFER, self.objects * 4, np.arange(self.objects, dtype=np.uint32), GL.GL_STATIC_DRAW)
+        GL.glVertexAttribIPointer(3, 1, GL.GL_UNSIGNED_INT, 0, None)
+        GL.glVertexAttribDivisor(3, 1)
+        GL.glEnableVertexAttribArray(3)
+
+        glstate.STATE.bindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, ressources.GEOMETRY.ibo)
+
+        glstate.STATE.bindBuffer(GL.GL_SHADER_STORAGE_BUFFER, self.__objects_ssbo)
+        GL.glBufferData(GL.GL_SHADER_STORAGE_BUFFER, self.__objects.nbytes, self.__objects, GL.GL_DYNAMIC_DRAW)
+        glstate.STATE.bindBuffer(GL.GL_SHADER_STORAGE_BUFFER, self.__commands_ssbo)
+        GL.glBufferData(GL.GL_SHADER_STORAGE_BUFFER, commands.nbytes, commands, GL.GL_STATIC_DRAW)
+        glstate.STATE.bindBuffer(GL.GL_SHADER_STORAGE_BUFFER, self.__groups_ssbo)
+        GL.glBufferData(GL.GL_SHADER_STORAGE_BUFFER, command_groups.nbytes, command_groups, GL.GL_STATIC_DRAW)
+        glstate.STATE.bindBuffer(GL.GL_SHADER_STORAGE_BUFFER, self.__counts_buffer)
+        GL.glBufferData(GL.GL_SHADER_STORAGE_BUFFER, len(self.__groups) * 4, None, GL.GL_DYNAMIC_DRAW)
+        glstate.STATE.bindBuffer(GL.GL_DRAW_INDIRECT_BUFFER, self.__visible_buffer)
+        GL.glBufferData(GL.GL_DRAW_INDIRECT_BUFFER, commands.nbytes, commands, GL.GL_DYNAMIC_DRAW)
+
+        self.__generation = ressources.GEOMETRY.generation
+        self.__structure = shapes.TRANSFORMS.structure
+        self.built = True
+
+        return True
+
+    def __writeObjects(
+            self: typing.Self,
+            indices: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that writes the rows of the object array of some shapes from their rows in `shapes.TRANSFORMS`, in one batch.
+
+        Args:
+            indices (`np.ndarray`): Indices of the shapes in the object array.
+        """
+        rows: np.ndarray = self.__rows[indices]
+        objects: np.ndarray = np.zeros((len(rows), IndirectRenderer.__OBJECT_FLOATS), np.float32)
+        normals: np.ndarray = objects[:, 16:32].reshape(-1, 4, 4)
+
+        objects[:, :16] = shapes.TRANSFORMS.world[rows].reshape(-1, 16)
+        normals[:, :3, :3] = shapes.TRANSFORMS.normal[rows]
+        normals[:, 3, 3] = 1
+        objects[:, 32:35] = shapes.TRANSFORMS.color[rows]
+        objects[:, 35] = 1
+        objects[:, IndirectRenderer.__BOUND_OFFSET:] = shapes.TRANSFORMS.bound[rows]
+
+        self.__objects[indices] = objects
+        shapes.TRANSFORMS.render[rows] = False
+
+    def __uploadObjects(
+            self: typing.Self,
+            indices: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that uploads the ranges of the object array holding some shapes (sorted),
+        or the span covering them when they are scattered in too many ranges.
+
+        Args:
+            indices (`np.ndarray`): Sorted indices of the shapes in the object array.
+        """
+        breaks: np.ndarray = np.flatnonzero(np.diff(indices) != 1) + 1
+        firsts: np.ndarray = indices[np.concatenate(([0], breaks))]
+        lasts: np.ndarray = indices[np.concatenate((breaks - 1, [len(indices) - 1]))]
+        if len(firsts) > IndirectRenderer.__MAX_RANGES:
+            firsts, lasts = firsts[:1], lasts[-1:]
+
+        row_bytes: int = self.__objects.itemsize * IndirectRenderer.__OBJECT_FLOATS
+        glstate.STATE.bindBuffer(GL.GL_SHADER_STORAGE_BUFFER, self.__objects_ssbo)
+        for first, last in zip(firsts.tolist(), lasts.tolist()):
+            GL.glBufferSubData(GL.GL_SHADER_STORAGE_BUFFER, first * row_bytes, (last + 1 - first) * row_bytes, self.__objects[first:last + 1])
+
+    def __cullCpu(
+            self: typing.Self,
+            cam: Camera,
+            /
+            ) -> None:
+        """
+        Method that writes the commands of the shapes not outside the frustum, compacted per group.
+
+        Args:
+            cam (`Camera`): The camera whose frustum is used.
+        """
+        visible: np.ndarray = cam.classifySpheres(self.__objects[:, IndirectRenderer.__BOUND_OFFSET:]) >= 0
+        commands: np.ndarray = self.__commands[visible]
+
+        self.__draw_counts = np.bincount(self.__command_groups[visible], minlength=len(self.__groups))
+        self.__draw_firsts = np.cumsum(self.__draw_counts) - self.__draw_counts
+        self.drawn = len(commands)
+
+        if len(commands):
+            glstate.STATE.bindBuffer(GL.GL_DRAW_INDIRECT_BUFFER, self.__visible_buffer)
+            GL.glBufferSubData(GL.GL_DRAW_INDIRECT_BUFFER, 0, commands.nbytes, commands)
+
+    def __cullGpu(
+            self: typing.Self,
+            cam: Camera,
+            /
+            ) -> None:
+        """
+        Method that dispatches the compute shader writing the commands of the shapes not outside the frustum.
+
+        Args:
+            cam (`Camera`): The camera whose frustum is used.
+        """
+        glstate.STATE.bindBuffer(GL.GL_SHADER_STORAGE_BUFFER, self.__counts_buffer)
+        GL.glBufferSubData(GL.GL_SHADER_STORAGE_BUFFER, 0, len(self.__groups) * 4, np.zeros(len(self.__groups), np.uint32))
+
+        glstate.STATE.useProgram(self.__cull_program)
+        GL.glUniform4fv(self.__cull_uniforms["planes_vec4"], 6, cam.frustum)
+        GL.glUniform1ui(self.__cull_uniforms["commands_uint"], self.objects)
+        GL.glUniform1i(self.__cull_uniforms["compact_bool"], int(self.compact))
+
+        glstate.STATE.bindBufferBase(GL.GL_SHADER_STORAGE_BUFFER, 2, self.__commands_ssbo)
+        glstate.STATE.bindBufferBase(GL.GL_SHADER_STORAGE_BUFFER, 3, self.__visible_buffer)
+        glstate.STATE.bindBufferBase(GL.GL_SHADER_STORAGE_BUFFER, 4, self.__counts_buffer)
+        glstate.STATE.bindBufferBase(GL.GL_SHADER_STORAGE_BUFFER, 5, self.__groups_ssbo)
+
+        GL.glDispatchCompute((self.objects + IndirectRenderer.__WORK_GROUP_SIZE - 1) // IndirectRenderer.__WORK_GROUP_SIZE, 1, 1)
+        GL.glMemoryBarrier(GL.GL_COMMAND_BARRIER_BIT | GL.GL_SHADER_STORAGE_BARRIER_BIT)
+
+        self.__draw_firsts = np.array([first for _, _, _, first, _ in self.__groups], np.int64)
+        self.__draw_counts = np.array([count for _, _, _, _, count in self.__groups], np.int64)
+        self.drawn = None
+
+    @profiler.PROFILER.profiled("renderer.indirect")
+    def render(
+            self: typing.Self,
+            root: shapes.Shape,
+            cam: Camera,
+            /
+            ) -> bool:
+        """
+        Method that culls and draws the shapes of `root`, building the buffers first if needed.
+
+        Args:
+            root (`shapes.Shape`): The shape or node (e.g. the scene) to draw.
+            cam (`Camera`): The camera to render with.
+        Returns:
+            `bool`: False if nothing was drawn because the buffers can't be built yet.
+        """
+        if self.__generation != ressources.GEOMETRY.generation or self.__structure != shapes.TRANSFORMS.structure:
+            self.built = False
+
+        if not self.built and not self.build(root):
+            return False
+
+        changed: np.ndarray = np.flatnonzero(shapes.TRANSFORMS.render[self.__rows])
+        if len(changed):
+            self.__writeObjects(changed)
+            self.__uploadObjects(changed)
+        glstate.STATE.bindBufferBase(GL.GL_SHADER_STORAGE_BUFFER, utils.INDIRECT_OBJECTS_BINDING, self.__objects_ssbo)
+
+        if self.gpu_culling:
+            self.__cullGpu(cam)
+        else:
+            self.__cullCpu(cam)
+
+        glstate.STATE.bindVertexArray(self.__vao)
+        glstate.STATE.bindBuffer(GL.GL_DRAW_INDIRECT_BUFFER, self.__visible_buffer)
+        if self.gpu_culling and self.compact:
+            glstate.STATE.bindBuffer(GL_PARAMETER_BUFFER_ARB, self.__counts_buffer)
+
+        self.draws = 0
+        command_bytes: int = IndirectRenderer.__COMMAND.itemsize
+
+        for group, ((shader, texture, has_light, first, count), draw_first, draw_count) in enumerate(zip(self.__groups, self.__draw_firsts.tolist(), self.__draw_counts.tolist())):
+            if not draw_count:
+                continue
+
+            glstate.STATE.useProgram(shader.program)
+
+            if texture is not None:
+                glstate.STATE.bindTexture(GL.GL_TEXTURE_2D, texture.id, 0)
+                shader.setInt("texture_2D", 0)
+
+            if has_light:
+                shader.setVec3("light_vec3", glm.vec3(1.0, 1.0, 1.0))
+
+            if self.gpu_culling and self.compact:
+                glMultiDrawElementsIndirectCountARB(GL.GL_TRIANGLES, GL.GL_UNSIGNED_INT, GL.ctypes.c_void_p(draw_first * command_bytes), group * 4, draw_count, 0)
+            else:
+                GL.glMultiDrawElementsIndirect(GL.GL_TRIANGLES, GL.GL_UNSIGNED_INT, GL.ctypes.c_void_p(draw_first * command_bytes), draw_count, 0)
+            self.draws += 1
+
+        return True
+
+    def clean(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that deletes the buffers and programs and releases the indirect shaders.
+        """
+        for shader in self.__shaders.values():
+            shader.clean()
+        self.__shaders.clear()
+
+        if self.__cull_program is not None:
+            glstate.STATE.deleteProgram(self.__cull_program)
+            self.__cull_program = None
+
+        if self.__vao is not None:
+            glstate.STATE.deleteVertexArray(self.__vao)
+            glstate.STATE.deleteBuffers(self.__ids, self.__objects_ssbo, self.__commands_ssbo, self.__visible_buffer, self.__counts_buffer, self.__groups_ssbo)
+            self.__vao = None
+
+        self.__elements = []
+        self.__rows = np.zeros(0, np.int64)
+        self.built = False
@@ -0,0 +1,193 @@
+"""
+instancing module
+=================
+Package: `src`
+
+Module that draws shapes sharing the same shader, mesh, texture and light flag with one instanced draw call.
+
+Classes
+-------
+- `Instancer`
+"""
+
+
+# built-in imports
+import typing
+# pip imports
+import numpy as np
+import pyglm.glm as glm
+import OpenGL.GL as GL  # type: ignore
+# local imports
+from . import utils, glstate, ressources, shapes
+
+
+class Instancer:
+    """
+    Instancer class
+    ===============
+
+    Class that writes the model matrices, normal matrices and colors of runs of shapes sharing
+    (shader, mesh, texture, light flag) in a per-instance vertex buffer and issues one `glDrawElementsInstancedBaseVertex` per run.
+    The per-instance data is gathered from the rows of `shapes.TRANSFORMS` in one batch.
+
+    The runs are found by `RenderQueue`, runs smaller than `utils.INSTANCING_THRESHOLD`,
+    or whose instanced shader variant is not ready, are drawn one by one.
+
+    Attributes:
+        vbo (`typing.Any`): Per-instance vertex buffer, refilled every frame.
+    Methods
+    -------
+    - `getShader`
+    - `upload`
+    - `draw`
+    - `clean`
+    """
+    # model mat4 (locations 3 to 6), normal mat3 (locations 7 to 9), color vec3 (location 10)
+    __STRIDE: int = glm.sizeof(glm.mat4x4) + glm.sizeof(glm.mat3x3) + glm.sizeof(glm.vec3)
+    __MODEL_LOCATION: int = 3
+    __NORMAL_LOCATION: int = 7
+    __COLOR_LOCATION: int = 10
+    __INSTANCE: np.dtype = np.dtype([("model", np.float32, (4, 4)), ("normal", np.float32, (3, 3)), ("color", np.float32, 3)])
+
+    def __init__(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+        """
+        self.vbo: typing.Any = GL.glGenBuffers(1)
+
+        self.__shaders: dict[str, ressources.Shader] = {}
+
+    def getShader(
+            self: typing.Self,
+            shader: ressources.Shader,
+            /
+            ) -> ressources.Shader | None:
+        """
+        Method that gives the instanced variant of a shader (same name with `utils.INSTANCED_SUFFIX`).
+
+        Args:
+            shader (`ressources.Shader`): The shader used by shapes when drawn one by one.
+        Returns:
+            `ressources.Shader | None`: the variant if it is ready to be used.
+        """
+        variant: ressources.Shader | None = self.__shaders.get(shader.name)
+
+        if variant is None:
+            variant = ressources.Shader(shader.name + utils.INSTANCED_SUFFIX)
+            self.__shaders[shader.name] = variant
+
+        return variant if variant.ready else None
+
+    def __setAttributes(
+            self: typing.Self,
+            offset: int,
+            /
+            ) -> None:
+        """
+        Method that points the per-instance attributes of the bound VAO at `offset` in `vbo`.
+
+        Args:
+            offset (`int`): Byte offset of the first instance of the group.
+        """
+        stride: int = Instancer.__STRIDE
+        vec4_bytes: int = glm.sizeof(glm.vec4)
+        vec3_bytes: int = glm.sizeof(glm.vec3)
+
+        glstate.STATE.bindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+
+        for i in range(4):
+            location: int = Instancer.__MODEL_LOCATION + i
+            GL.glVertexAttribPointer(location, 4, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(offset + i * vec4_bytes))
+            GL.glVertexAttribDivisor(location, 1)
+            GL.glEnableVertexAttribArray(location)
+
+        normal_offset: int = offset + glm.sizeof(glm.mat4x4)
+        for i in range(3):
+            location = Instancer.__NORMAL_LOCATION + i
+            GL.glVertexAttribPointer(location, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(normal_offset + i * vec3_bytes))
+            GL.glVertexAttribDivisor(location, 1)
+            GL.glEnableVertexAttribArray(location)
+
+        color_offset: int = normal_offset + glm.sizeof(glm.mat3x3)
+        GL.glVertexAttribPointer(Instancer.__COLOR_LOCATION, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(color_offset))
+        GL.glVertexAttribDivisor(Instancer.__COLOR_LOCATION, 1)
+        GL.glEnableVertexAttribArray(Instancer.__COLOR_LOCATION)
+
+    def upload(
+            self: typing.Self,
+            runs: list[list[shapes.Shape]],
+            /
+            ) -> list[int]:
+        """
+        Method that writes the per-instance data of every run in `vbo`, once per frame.
+
+        Args:
+            runs (`list[list[shapes.Shape]]`): Groups of shapes drawn with one instanced draw call each.
+        Returns:
+            `list[int]`: byte offset of each run in `vbo`.
+        """
+        counts: np.ndarray = np.fromiter((len(run) for run in runs), np.int64, len(runs))
+        offsets: np.ndarray = (np.cumsum(counts) - counts) * Instancer.__STRIDE
+        rows: np.ndarray = np.fromiter((member.transform for run in runs for member in run), np.int64, int(counts.sum()))
+
+        if len(rows):
+            data: np.ndarray = np.empty(len(rows), Instancer.__INSTANCE)
+            data["model"] = shapes.TRANSFORMS.world[rows]
+            data["normal"] = shapes.TRANSFORMS.normal[rows]
+            data["color"] = shapes.TRANSFORMS.color[rows]
+
+            glstate.STATE.bindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+            GL.glBufferData(GL.GL_ARRAY_BUFFER, data.nbytes, data, GL.GL_STREAM_DRAW)
+
+        return offsets.tolist()
+
+    def draw(
+            self: typing.Self,
+            shader: ressources.Shader,
+            mesh: ressources.Mesh,
+            textured: bool,
+            has_light: bool,
+            offset: int,
+            count: int,
+            /
+            ) -> None:
+        """
+        Method that draws `count` instances uploaded at `offset`.
+
+        The instanced shader program, the mesh VAO and the texture (on unit 0) must already be bound.
+
+        Args:
+            shader (`ressources.Shader`): The instanced shader variant in use.
+            mesh (`ressources.Mesh`): The mesh whose VAO is bound.
+            textured (`bool`): If the shapes use a texture.
+            has_light (`bool`): If the shapes use lights.
+            offset (`int`): Byte offset given by `upload` for this run.
+            count (`int`): Number of shapes in the run.
+        """
+        self.__setAttributes(offset)
+
+        if textured:
+            shader.setInt("texture_2D", 0)
+
+        if has_light:
+            shader.setVec3("light_vec3", glm.vec3(1.0, 1.0, 1.0))
+
+        GL.glDrawElementsInstancedBaseVertex(GL.GL_TRIANGLES, len(mesh.indices), GL.GL_UNSIGNED_INT, GL.ctypes.c_void_p(mesh.first_index * 4), count, mesh.base_vertex)
+
+    def clean(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that deletes the per-instance buffer and releases the instanced shaders.
+        """
+        for shader in self.__shaders.values():
+            shader.clean()
+        self.__shaders.clear()
+
+        if self.vbo is not None:
+            glstate.STATE.deleteBuffers(self.vbo)
+            self.vbo = None
@@ -0,0 +1,350 @@
+"""
+profiler module
+===============
+Package: `src`
+
+Module that measures where CPU time goes with named zones, kept per frame and exported as a Chrome trace or a table.
+
+Classes
+-------
+- `Zone`
+- `Profiler`
+Globals
+-------
+- `PROFILER`: Profiler used by the renderer, the scene, the loader and the shaders.
+"""
+
+
+# built-in imports
+import os
+import typing
+import collections
+import collections.abc
+import contextlib
+import functools
+import json
+import threading
+import time
+# local imports
+from . import utils
+
+
+class Zone:
+    """
+    Zone class
+    ==========
+
+    Class that measures one run of a named zone, given by `Profiler.zone` when the profiler is enabled.
+
+    Attributes:
+        name (`str`): Name of the zone, subsystems are prefixes (e.g. `render.cull`).
+    """
+    __slots__ = ("name", "__profiler", "__start")
+
+    def __init__(
+            self: typing.Self,
+            profiler: "Profiler",
+            name: str,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            profiler (`Profiler`): The profiler recording the zone.
+            name (`str`): Name of the zone.
+        """
+        self.name: str = name
+        self.__profiler: Profiler = profiler
+        self.__start: int = 0
+
+    def __enter__(
+            self: typing.Self,
+            /
+            ) -> typing.Self:
+        """
+        Method that starts measuring.
+
+        Returns:
+            `Zone`: this zone.
+        """
+        self.__start = time.perf_counter_ns()
+
+        return self
+
+    def __exit__(
+            self: typing.Self,
+            /,
+            *args: typing.Any
+            ) -> None:
+        """
+        Method that stops measuring and records the zone.
+
+        Args:
+            *args (`typing.Any`): Exception raised in the zone, if any (not handled).
+        """
+        self.__profiler.record(self.name, self.__start, time.perf_counter_ns())
+
+
+class Profiler:
+    """
+    Profiler class
+    ==============
+
+    Class that records zones (name, thread, start and end) from any thread in the current frame,
+    and keeps the last `frames` frames in a ring. A frame holds at most `max_zones` zones, the next ones are dropped
+    (e.g. when frames are never ended).
+
+    When disabled, `zone` gives a shared context manager doing nothing and `profiled` functions
+    only check `enabled`, so instrumented code costs about an attribute lookup.
+
+    Attributes:
+        enabled (`bool`): If zones are recorded.
+        frames (`collections.deque[tuple[int, int, list[tuple[str, int, int, int]]]]`): Last frames (start and end
+            in nanoseconds, zones as name, thread id, start and end), oldest first.
+        max_zones (`int`): Maximum number of zones recorded in a frame.
+        dropped (`int`): Number of zones dropped because a frame was full.
+    Methods
+    -------
+    - `zone`
+    - `profiled`
+    - `record`
+    - `beginFrame`
+    - `endFrame`
+    - `discardFrame`
+    - `clear`
+    - `summary`
+    - `exportChromeTrace`
+    """
+    def __init__(
+            self: typing.Self,
+            enabled: bool = False,
+            frames: int = 240,
+            max_zones: int = 1 << 16,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            enabled (`bool`): If zones are recorded.
+            frames (`int`): Number of frames kept.
+            max_zones (`int`): Maximum number of zones recorded in a frame.
+        """
+        self.enabled: bool = enabled
+        self.frames: collections.deque[tuple[int, int, list[tuple[str, int, int, int]]]] = collections.deque(maxlen=max(1, frames))
+        self.max_zones: int = max_zones
+        self.dropped: int = 0
+
+        self.__null: contextlib.nullcontext[None] = contextlib.nullcontext()
+        self.__origin: int = time.perf_counter_ns()
+        self.__frame_start: int = self.__origin
+        self.__zones: list[tuple[str, int, int, int]] = []
+        self.__threads: dict[int, str] = {}
+
+    def zone(
+            self: typing.Self,
+            name: str,
+            /
+            ) -> typing.ContextManager[typing.Any]:
+        """
+        Method that gives a context manager measuring the code it runs, to use with `with`.
+
+        Args:
+            name (`str`): Name of the zone, subsystems are prefixes (e.g. `render.cull`).
+        Returns:
+            `typing.ContextManager[typing.Any]`: a `Zone`, or a shared context manager doing nothing if disabled.
+        """
+        if not self.enabled:
+            return self.__null
+
+        return Zone(self, name)
+
+    def profiled(
+            self: typing.Self,
+            name: str | None = None,
+            /
+            ) -> collections.abc.Callable[[collections.abc.Callable[..., typing.Any]], collections.abc.Callable[..., typing.Any]]:
+        """
+        Method that gives a decorator measuring each call of a function as a zone.
+
+        Args:
+            name (`str | None`): Name of the zone, if None, the qualified name of the function.
+        Returns:
+            `collections.abc.Callable[[collections.abc.Callable[...,typing.Any]],collections.abc.Callable[...,typing.Any]]`: the decorator.
+        """
+        def decorate(function: collections.abc.Callable[..., typing.Any], /) -> collections.abc.Callable[..., typing.Any]:
+            label: str = name if name is not None else function.__qualname__
+
+            @functools.wraps(function)
+            def wrapper(*args: typing.Any, **kwargs: typing.Any) -> typing.Any:
+                if not self.enabled:
+                    return function(*args, **kwargs)
+
+                start: int = time.perf_counter_ns()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.record(label, start, time.perf_counter_ns())
+
+            return wrapper
+
+        return decorate
+
+    def record(
+            self: typing.Self,
+            name: str,
+            start: int,
+            end: int,
+            /
+            ) -> None:
+        """
+        Method that adds a zone measured by the calling thread to the current frame, unless it is full.
+
+        Args:
+            name (`str`): Name of the zone.
+            start (`int`): Start in nanoseconds (`time.perf_counter_ns`).
+            end (`int`): End in nanoseconds (`time.perf_counter_ns`).
+        """
+        if len(self.__zones) >= self.max_zones:
+            self.dropped += 1
+            return
+
+        thread: int = threading.get_ident()
+        if thread not in self.__threads:
+            self.__threads[thread] = threading.current_thread().name
+
+        self.__zones.append((name, thread, start, end))
+
+    def beginFrame(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that starts a frame, zones recorded before belong to the previous one.
+        """
+        if self.enabled:
+            self.__frame_start = time.perf_counter_ns()
+
+    def endFrame(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that ends the frame and puts its zones in the ring.
+        """
+        if not self.enabled:
+            return
+
+        # zones recorded by other threads while swapping land in this frame or the next one
+        zones, self.__zones = self.__zones, []
+        self.frames.append((self.__frame_start, time.perf_counter_ns(), zones))
+
+    def discardFrame(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that ends the frame without keeping it (e.g. a loop iteration that drew nothing and waited for events),
+        so its zones don't count in the next one.
+        """
+        self.__zones = []
+
+    def clear(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that forgets every frame and zone recorded.
+        """
+        self.frames.clear()
+        self.__zones = []
+        self.dropped = 0
+
+    def summary(
+            self: typing.Self,
+            frames: int | None = None,
+            /
+            ) -> str:
+        """
+        Method that gives a table of the time spent per zone over the last frames,
+        zones are sorted by name so subsystems are grouped (times include the nested zones).
+
+        Args:
+            frames (`int | None`): Number of frames to summarize, if None, every frame kept.
+        Returns:
+            `str`: the table, one zone per line with calls, mean and max time per frame and mean share of the frame.
+        """
+        kept: list[tuple[int, int, list[tuple[str, int, int, int]]]] = list(self.frames)
+        if frames is not None:
+            kept = kept[-frames:] if frames > 0 else []
+        if not kept:
+            return "No frame recorded."
+
+        calls: dict[str, int] = {}
+        totals: dict[str, float] = {}
+        worst: dict[str, float] = {}
+        frame_time: float = 0.0
+
+        for start, end, zones in kept:
+            frame_time += end - start
+            current: dict[str, float] = {}
+            for name, _, zone_start, zone_end in zones:
+                calls[name] = calls.get(name, 0) + 1
+                current[name] = current.get(name, 0.0) + zone_end - zone_start
+            for name, duration in current.items():
+                totals[name] = totals.get(name, 0.0) + duration
+                worst[name] = max(worst.get(name, 0.0), duration)
+
+        count: int = len(kept)
+        width: int = max([len("zone")] + [len(name) for name in totals])
+        lines: list[str] = [
+            f"{count} frames, {frame_time / count / 1e6:.3f} ms per frame" + (f", {self.dropped} zones dropped" if self.dropped else ""),
+            f"{'zone':<{width}}  {'calls':>8}  {'mean ms':>9}  {'max ms':>9}  {'frame':>6}"
+        ]
+        for name in sorted(totals):
+            lines.append(
+                f"{name:<{width}}  {calls[name] / count:>8.2f}  {totals[name] / count / 1e6:>9.3f}"
+                f"  {worst[name] / 1e6:>9.3f}  {100 * totals[name] / frame_time if frame_time > 0 else 0.0:>5.1f}%"
+            )
+
+        return "\n".join(lines)
+
+    def exportChromeTrace(
+            self: typing.Self,
+            path: str,
+            /
+            ) -> None:
+        """
+        Method that writes the frames kept in the Chrome Trace Event format (`chrome://tracing`, Perfetto).
+
+        Args:
+            path (`str`): Path of the JSON file.
+        Raises:
+            `OSError`: if the file can't be written.
+        """
+        pid: int = os.getpid()
+        render_thread: int = threading.main_thread().ident or 0
+        events: list[dict[str, typing.Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": thread, "args": {"name": name}}
+            for thread, name in self.__threads.items()
+        ]
+
+        for index, (start, end, zones) in enumerate(self.frames):
+            events.append({
+                "name": "frame", "cat": "frame", "ph": "X", "pid": pid, "tid": render_thread,
+                "ts": (start - self.__origin) / 1e3, "dur": (end - start) / 1e3, "args": {"index": index}
+            })
+            events.extend(
+                {
+                    "name": name, "cat": name.split(".")[0], "ph": "X", "pid": pid, "tid": thread,
+                    "ts": (zone_start - self.__origin) / 1e3, "dur": (zone_end - zone_start) / 1e3
+                }
+                for name, thread, zone_start, zone_end in zones
+            )
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+PROFILER: Profiler = Profiler(utils.PROFILING, utils.PROFILER_FRAMES, utils.PROFILER_ZONES)
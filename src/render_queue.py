@@ -0,0 +1,253 @@
+"""
+render_queue module
+===================
+Package: `src`
+
+Module that sorts the shapes to draw by render state and submits them binding only the state that changes.
+
+Classes
+-------
+- `RenderStats`
+- `RenderQueue`
+"""
+
+
+# built-in imports
+import typing
+import dataclasses
+# pip imports
+import numpy as np
+import OpenGL.GL as GL  # type: ignore
+# local imports
+from . import utils, glstate, profiler, shapes, Camera, Instancer
+
+
+@dataclasses.dataclass
+class RenderStats:
+    """
+    RenderStats class
+    =================
+
+    Class that counts the work done by the last submitted frame.
+
+    Attributes:
+        items (`int`): Number of shapes submitted.
+        draws (`int`): Number of draw calls issued.
+        instanced (`int`): Number of shapes drawn by instanced draw calls.
+        program_changes (`int`): Number of `glUseProgram` calls.
+        vao_changes (`int`): Number of `glBindVertexArray` calls.
+        texture_changes (`int`): Number of `glBindTexture` calls.
+        changes_avoided (`int`): State changes saved compared to binding everything for every shape.
+    Methods
+    -------
+    - `reset`
+    """
+    items: int = 0
+    draws: int = 0
+    instanced: int = 0
+    program_changes: int = 0
+    vao_changes: int = 0
+    texture_changes: int = 0
+    changes_avoided: int = 0
+
+    def reset(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that sets every counter back to 0.
+        """
+        self.items = 0
+        self.draws = 0
+        self.instanced = 0
+        self.program_changes = 0
+        self.vao_changes = 0
+        self.texture_changes = 0
+        self.changes_avoided = 0
+
+
+class RenderQueue:
+    """
+    RenderQueue class
+    =================
+
+    Class that gathers the shapes of a frame as draw items with a 64 bits sort key, sorts them
+    and submits them in order, binding only the program, VAO and texture that differ from the previous item.
+
+    Key layout, from the most significant bit:
+    pass (2 bits), shader (12), texture (12), mesh (12), light (1), depth front to back (25).
+
+    Consecutive items sharing (shader, mesh, texture, light flag) are drawn with one instanced draw call
+    when an `Instancer` is given.
+
+    Attributes:
+        instancer (`Instancer | None`): Instancer used for runs of identical items, if None, every item has its own draw call.
+        stats (`RenderStats`): Counters of the last `submit`.
+    Methods
+    -------
+    - `clear`
+    - `push`
+    - `sort`
+    - `submit`
+    """
+    PASS_OPAQUE: int = 0
+    PASS_BACKGROUND: int = 1
+
+    __DEPTH_BITS: int = 25
+
+    def __init__(
+            self: typing.Self,
+            instancer: Instancer | None = None,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            instancer (`Instancer | None`): Instancer used for runs of identical items.
+        """
+        self.instancer: Instancer | None = instancer
+        self.stats: RenderStats = RenderStats()
+
+        self.__items: list[shapes.Shape] = []
+        self.__keys: list[np.ndarray] = []
+
+    def clear(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that empties the queue for a new frame.
+        """
+        self.__items.clear()
+        self.__keys.clear()
+
+    @profiler.PROFILER.profiled("renderer.queue")
+    def push(
+            self: typing.Self,
+            elements: list[shapes.Shape],
+            cam: Camera,
+            render_pass: int = PASS_OPAQUE,
+            /
+            ) -> None:
+        """
+        Method that adds drawable shapes (shader and mesh ready) to the queue.
+
+        Args:
+            elements (`list[shapes.Shape]`): Shapes to draw, e.g. from `Culler.collect`.
+            cam (`Camera`): The camera used to sort by depth.
+            render_pass (`int`): Pass of the shapes, passes are drawn in increasing order.
+        """
+        if not elements:
+            return
+
+        states: np.ndarray = np.fromiter((
+            (element.shader.sort_id << 38)  # type: ignore
+            | ((element.texture.sort_id if element.texture is not None else 0) << 26)
+            | (element.mesh.sort_id << 14)  # type: ignore
+            | (element.has_light << 13)
+            for element in elements
+        ), np.uint64, len(elements))
+
+        bounds: np.ndarray = np.frombuffer(b"".join(element.bound.to_bytes() for element in elements), np.float32).reshape(-1, 4)
+        front: np.ndarray = np.array(cam.front.to_tuple(), np.float32)
+        depths: np.ndarray = (bounds[:, :3] - np.array(cam.pos.to_tuple(), np.float32)) @ front
+        max_depth: int = (1 << RenderQueue.__DEPTH_BITS) - 1
+        depths = np.clip(depths / utils.FAR * max_depth, 0, max_depth).astype(np.uint64)
+
+        self.__keys.append((np.uint64(render_pass) << np.uint64(62)) | (states << np.uint64(12)) | depths)
+        self.__items.extend(elements)
+
+    def sort(
+            self: typing.Self,
+            /
+            ) -> list[shapes.Shape]:
+        """
+        Method that gives the queued shapes sorted by key.
+
+        Returns:
+            `list[shapes.Shape]`: the shapes in submission order.
+        """
+        if not self.__items:
+            return []
+
+        order: np.ndarray = np.argsort(np.concatenate(self.__keys), kind="stable")
+
+        return [self.__items[i] for i in order.tolist()]
+
+    @profiler.PROFILER.profiled("renderer.submit")
+    def submit(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that sorts and draws the queued shapes, then empties the queue.
+        """
+        self.stats.reset()
+        items: list[shapes.Shape] = self.sort()
+        self.clear()
+
+        # split in runs of shapes sharing (shader, mesh, texture, light flag), ids in keys can collide so compare objects
+        runs: list[tuple[int, int, typing.Any]] = []
+        instanced: list[list[shapes.Shape]] = []
+        start: int = 0
+
+        while start < len(items):
+            first: shapes.Shape = items[start]
+            end: int = start + 1
+            while end < len(items) and items[end].shader is first.shader and items[end].mesh is first.mesh and items[end].texture is first.texture and items[end].has_light == first.has_light:
+                end += 1
+
+            variant: typing.Any = None
+            if self.instancer is not None and end - start >= utils.INSTANCING_THRESHOLD:
+                variant = self.instancer.getShader(first.shader)  # type: ignore
+            if variant is not None:
+                instanced.append(items[start:end])
+
+            runs.append((start, end, variant))
+            start = end
+
+        offsets: list[int] = self.instancer.upload(instanced) if self.instancer is not None and instanced else []
+
+        program: typing.Any = None
+        vao: typing.Any = None
+        texture: typing.Any = None
+        textured: int = 0
+        instanced_index: int = 0
+
+        for start, end, variant in runs:
+            first = items[start]
+            run_program: typing.Any = (variant if variant is not None else first.shader).program  # type: ignore
+
+            if run_program != program:
+                program = run_program
+                glstate.STATE.useProgram(program)
+                self.stats.program_changes += 1
+
+            if first.mesh.vao != vao:  # type: ignore
+                vao = first.mesh.vao  # type: ignore
+                glstate.STATE.bindVertexArray(vao)
+                self.stats.vao_changes += 1
+
+            if first.texture is not None:
+                textured += end - start
+                if first.texture.id != texture:
+                    texture = first.texture.id
+                    glstate.STATE.bindTexture(GL.GL_TEXTURE_2D, texture, 0)
+                    self.stats.texture_changes += 1
+
+            if variant is not None:
+                self.instancer.draw(variant, first.mesh, first.texture is not None, first.has_light, offsets[instanced_index], end - start)  # type: ignore
+                instanced_index += 1
+                self.stats.draws += 1
+                self.stats.instanced += end - start
+                for element in items[start:end]:
+                    element.to_render = False
+                continue
+
+            for element in items[start:end]:
+                element.draw()
+            self.stats.draws += end - start
+
+        self.stats.items = len(items)
+        self.stats.changes_avoided = 2 * len(items) + textured - self.stats.program_changes - self.stats.vao_changes - self.stats.texture_changes
@@ -19,7 +19,7 @@ import pyglm.glm as glm
 import glfw  # type: ignore
 import OpenGL.GL as GL  # type: ignore
 # local imports
-from . import utils, shapes, Scene, Camera, FPSCamera
+from . import utils, glstate, profiler, ressources, Window, GlfwWindow, HeadlessWindow, shapes, Scene, Camera, FPSCamera, Culler, Instancer, RenderQueue, IndirectRenderer, Capture
 
 
 class Renderer:
@@ -33,39 +33,60 @@ class Renderer:
         # TODO: set attributes
     Methods
     -------
+    - `initWindow` (staticmethod)
     - `keyCallback`
     - `mouseCallback`
     - `scrollCallback`
+    - `simulate`
+    - `resync`
     - `updateMatrices`
+    - `requestRender`
+    - `needsRender`
     - `render`
+    - `startCapture`
+    - `stopCapture`
     - `quit`
+    - `clean`
     """
     @staticmethod
-    def initGlfw() -> typing.Any:
+    def initWindow(
+            upload_context: bool = False,
+            /
+            ) -> tuple[Window, Window | None]:
         """
-        Method to/that # TODO: set docstring
+        Method that creates the window (a headless framebuffer if `utils.HEADLESS`) and sets the initial OpenGL state.
 
+        Args:
+            upload_context (`bool`): If we also create a hidden window whose context is shared with the main one, for the upload worker.
         Returns:
-            `typing.Any`: # TODO: set return
+            `tuple[Window,Window | None]`: the main window and the hidden upload window (None if not asked or not created).
         Raises:
-            # TODO: set exceptions
+            `Exception`: if the window or its context can't be created.
         """
-        if not glfw.init():
-            raise Exception("Failed to initialize GLFW")
+        window: Window
+        if utils.HEADLESS:
+            window = HeadlessWindow(utils.SCREEN_WIDTH, utils.SCREEN_HEIGHT)
+        else:
+            window = GlfwWindow(utils.SCREEN_WIDTH, utils.SCREEN_HEIGHT, utils.WINDOW_NAME)
 
-        window: typing.Any = glfw.create_window(utils.SCREEN_WIDTH, utils.SCREEN_HEIGHT, utils.WINDOW_NAME, None, None)
+        upload_window: Window | None = None
+        if upload_context:
+            upload_window = window.createUploadWindow()
 
-        if not window:
-            glfw.terminate()
-            raise Exception("Failed to create GLFW window")
+            if upload_window is None:
+                print("Warning: failed to create the shared upload context, uploading from the render thread.")
 
-        glfw.make_context_current(window)
-        glfw.set_input_mode(window, glfw.CURSOR, glfw.CURSOR_DISABLED)
-        glfw.set_cursor_pos(window, utils.SCREEN_WIDTH / 2, utils.SCREEN_HEIGHT / 2)
+        window.makeCurrent()
+        window.captureCursor()
 
-        GL.glEnable(GL.GL_DEPTH_TEST)
+        glstate.STATE.invalidate()
+        glstate.STATE.setCapability(GL.GL_DEPTH_TEST, True)
         GL.glClearColor(*(utils.BACK_COLOR[:4]))
 
+        if utils.TEXTURE_COMPRESSION and not Window.extensionSupported("GL_EXT_texture_compression_s3tc"):
+            print("Warning: S3TC texture compression not supported, textures are cooked uncompressed.")
+            utils.TEXTURE_COMPRESSION = False
+
         print(
             f"OpenGL: {GL.glGetString(GL.GL_VERSION)},",
             f"GLSL: {GL.glGetString(GL.GL_SHADING_LANGUAGE_VERSION)},",
@@ -73,7 +94,7 @@ class Renderer:
             f"Vendor: {GL.glGetString(GL.GL_VENDOR)}"
         )
 
-        return window
+        return window, upload_window
 
     def __init__(
             self: typing.Self,
@@ -82,7 +103,14 @@ class Renderer:
             *,
             game_handleKeyboard: collections.abc.Callable[[typing.Self, float], int] = lambda x, y: 0,
             game_handleMouse: collections.abc.Callable[[typing.Self, float, float], int] = lambda x, y, z: 0,
-            game_handleScroll: collections.abc.Callable[[typing.Self, float, float], int] = lambda x, y, z: 0
+            game_handleScroll: collections.abc.Callable[[typing.Self, float, float], int] = lambda x, y, z: 0,
+            game_tick: collections.abc.Callable[[typing.Self, float], None] = lambda x, y: None,
+            tick_rate: float = utils.TICK_RATE,
+            interpolate: bool = True,
+            upload_thread: bool = False,
+            instancing: bool = True,
+            indirect: bool = False,
+            on_demand: bool = False
             ) -> None:
         """
         Method to/that # TODO: set docstring
@@ -92,15 +120,43 @@ class Renderer:
             game_handleKeyboard (`collections.abc.Callable[[typing.Self, float], int]`): the function to call when a key is pressed.
             game_handleMouse (`collections.abc.Callable[[typing.Self, float, float], int]`): the function to call when the mouse is moved.
             game_handleScroll (`collections.abc.Callable[[typing.Self, float, float], int]`): the function to call when the scroll wheel is used.
+            game_tick (`collections.abc.Callable[[typing.Self, float], None]`): the function advancing the game by a step of simulation.
+            tick_rate (`float`): Number of simulation steps per second, 0 to make one step of the frame time per frame.
+            interpolate (`bool`): If shapes and camera moved by the last step are drawn interpolated from the step before.
+            upload_thread (`bool`): If ressources are uploaded by a worker thread owning a shared context instead of the render thread.
+            instancing (`bool`): If shapes sharing shader, mesh, texture and light are drawn with one instanced draw call.
+            indirect (`bool`): If the scene is drawn with multi-draw indirect calls (static scenes, needs OpenGL 4.3).
+            on_demand (`bool`): If frames are only drawn when something changed, see `needsRender`.
         Raises:
             # TODO: set exceptions
         """
-        self.window: typing.Any = Renderer.initGlfw()
+        self.window, self.upload_window = Renderer.initWindow(upload_thread)
+        if self.upload_window is not None:
+            ressources.LOADER.startUploadWorker(self.upload_window)
         self.camera: Camera = camera(self.window)
         self.scene: Scene = Scene()
         self.skybox: shapes.Shape = shapes.Shape(shader_name="basic_tex", mesh_name="skybox", texture_name="skybox")
         self.skybox.setCoord(size=glm.vec3(utils.FAR - 0.000001))
+        self.culler: Culler = Culler()
+        self.queue: RenderQueue = RenderQueue(Instancer() if instancing else None)
+        self.indirect: IndirectRenderer | None = None
+        if indirect:
+            if IndirectRenderer.isSupported():
+                self.indirect = IndirectRenderer()
+            else:
+                print("Warning: multi-draw indirect needs OpenGL 4.3, drawing with the render queue.")
+        self.capture: Capture | None = None
+        self.on_demand: bool = on_demand
         self.start: int = 0
+        self.__redraw: bool = True
+
+        self.tick_rate: float = tick_rate
+        self.interpolate: bool = interpolate and tick_rate > 0
+        self.ticks: int = 0
+        self.dropped: int = 0
+        self.alpha: float = 1.0
+        self.__accumulator: float = 0.0
+        self.__camera_from: glm.vec3 = glm.vec3(self.camera.pos)
 
         self.mouse_last_x: float = 0.0
         self.mouse_last_y: float = 0.0
@@ -108,8 +164,12 @@ class Renderer:
         self.game_handleKeyboard: collections.abc.Callable[[typing.Self, float], int] = game_handleKeyboard
         self.game_handleMouse: collections.abc.Callable[[typing.Self, float, float], int] = game_handleMouse
         self.game_handleScroll: collections.abc.Callable[[typing.Self, float, float], int] = game_handleScroll
-        glfw.set_cursor_pos_callback(self.window, self.mouseCallback)
-        glfw.set_scroll_callback(self.window, self.scrollCallback)
+        self.game_tick: collections.abc.Callable[[typing.Self, float], None] = game_tick
+        self.window.setCursorPosCallback(self.mouseCallback)
+        self.window.setScrollCallback(self.scrollCallback)
+        self.window.setRefreshCallback(lambda win: self.requestRender())
+        if on_demand:
+            ressources.LOADER.on_ready = self.window.postEmptyEvent
 
     def keyCallback(
             self: typing.Self,
@@ -124,7 +184,7 @@ class Renderer:
         Raises:
             # TODO: set exceptions
         """
-        if glfw.get_key(self.window, utils.KEY_BINDS.escape) == glfw.PRESS:
+        if self.window.getKey(utils.KEY_BINDS.escape) == glfw.PRESS:
             self.quit()
             return
 
@@ -144,7 +204,7 @@ class Renderer:
         Method to/that # TODO: set docstring
 
         Args:
-            win (`typing.Any`): The GLFW window from wich the callback was called.
+            win (`typing.Any`): The `Window` from wich the callback was called.
             mouse_x (`float`): The position of the mouse on x axis in the window.
             mouse_y (`float`): The position of the mouse on y axis in the window.
         Raises:
@@ -171,7 +231,7 @@ class Renderer:
         Method to/that # TODO: set docstring
 
         Args:
-            win (`typing.Any`): The GLFW window from wich the callback was called.
+            win (`typing.Any`): The `Window` from wich the callback was called.
             delta_x (`float`): The delta of the wheel on x axis in the window.
             delta_y (`float`): The delta of the wheel on y axis in the window.
         Raises:
@@ -182,6 +242,85 @@ class Renderer:
 
         self.camera.handleScroll(delta_x, delta_y)
 
+    @profiler.PROFILER.profiled("renderer.simulate")
+    def simulate(
+            self: typing.Self,
+            delta_time: float,
+            /
+            ) -> int:
+        """
+        Method that advances the simulation by `delta_time`, in fixed steps of `1 / tick_rate` seconds:
+        each step handles the keyboard then calls `game_tick`. The time left is kept for the next frames
+        and gives `alpha`, where interpolated shapes and camera are drawn between the last two steps.
+
+        At most `utils.MAX_TICKS` steps are made per frame: if the steps are slower than the time they simulate,
+        the time late is dropped (counted in `dropped`) instead of asking more steps from each following frame.
+
+        Args:
+            delta_time (`float`): the time elapsed since last frame in seconds.
+        Returns:
+            `int`: the number of steps made.
+        """
+        if self.tick_rate <= 0:
+            self.__tick(delta_time)
+            return 1
+
+        step: float = 1 / self.tick_rate
+        self.__accumulator += delta_time
+
+        ticks: int = 0
+        while self.__accumulator >= step and not self.window.shouldClose():
+            if ticks == utils.MAX_TICKS:
+                self.dropped += int(self.__accumulator / step)
+                self.__accumulator %= step
+                break
+
+            self.__tick(step)
+            self.__accumulator -= step
+            ticks += 1
+
+        self.alpha = min(self.__accumulator / step, 1.0) if self.interpolate else 1.0
+
+        return ticks
+
+    def __tick(
+            self: typing.Self,
+            step: float,
+            /
+            ) -> None:
+        """
+        Method that makes one step of simulation, recording what moved to interpolate it.
+
+        Args:
+            step (`float`): the time simulated in seconds.
+        """
+        if self.interpolate:
+            if self.__camera_from != self.camera.pos:
+                # drawn interpolated until now, drawn again at its position
+                self.camera.view_to_update = True
+            self.__camera_from = glm.vec3(self.camera.pos)
+            shapes.TRANSFORMS.beginTick()
+
+        self.keyCallback(step)
+        if not self.window.shouldClose():
+            with profiler.PROFILER.zone("game.tick"):
+                self.game_tick(self, step)
+
+        if self.interpolate:
+            shapes.TRANSFORMS.endTick()
+        self.ticks += 1
+
+    def resync(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that restarts the simulation clock after the loop paused (e.g. waiting for events),
+        so the next `simulate` makes a step at once for the input that woke the loop up.
+        """
+        self.__accumulator = 1 / self.tick_rate if self.tick_rate > 0 else 0.0
+
+    @profiler.PROFILER.profiled("renderer.update")
     def updateMatrices(
             self: typing.Self,
             forced: bool = False,
@@ -195,11 +334,54 @@ class Renderer:
         Raises:
             # TODO: set exceptions
         """
+        position: glm.vec3 = self.camera.pos
+        if self.interpolate and self.__camera_from != position:
+            self.camera.pos = glm.mix(self.__camera_from, position, self.alpha)
+            self.camera.view_to_update = True
+
+        if self.camera.view_to_update or forced:
+            self.skybox.setCoord(pos=self.camera.pos)
         self.camera.updateMatrices(forced)
+        self.camera.pos = position
+
+        if self.interpolate:
+            shapes.TRANSFORMS.interpolate(self.alpha)
         self.scene.updateModelMatrix(forced)
-        self.skybox.setCoord(pos=self.camera.pos)
         self.skybox.updateModelMatrix(forced)
 
+    def requestRender(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that asks for a new frame in on demand mode, for changes the dirty flags don't see, and wakes up the loop.
+        """
+        self.__redraw = True
+        self.window.postEmptyEvent()
+
+    def needsRender(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        Method that tells if a frame must be drawn, to call after `updateMatrices`.
+
+        Always True if not `on_demand`, else only when the camera matrices were recomputed, a shape was
+        moved, added, removed or changed, a loaded ressource waits to be uploaded, or `requestRender` was called.
+        The loop should wait for events (`Window.waitEvents`) instead of drawing when it is False.
+
+        Returns:
+            `bool`: If `render` must be called.
+        """
+        return (
+            not self.on_demand
+            or self.__redraw
+            or self.camera.to_render
+            or shapes.TRANSFORMS.changed
+            or ressources.LOADER.hasUploads()
+        )
+
+    @profiler.PROFILER.profiled("renderer.render")
     def render(
             self: typing.Self,
             /
@@ -210,19 +392,87 @@ class Renderer:
         Raises:
             # TODO: set exceptions
         """
-        self.scene.render(self.camera, self.camera.to_render)
-        self.skybox.render(self.camera, self.camera.to_render)
+        ressources.LOADER.processUploads(utils.UPLOAD_BUDGET)
+
+        background: list[shapes.Shape] = []
+        self.skybox.collect(background)
+
+        if self.indirect is None or not self.indirect.render(self.scene, self.camera):
+            self.queue.push(self.culler.collect(self.scene, self.camera), self.camera)
+        self.queue.push(background, self.camera, RenderQueue.PASS_BACKGROUND)
+        self.queue.submit()
         self.camera.to_render = False
+        shapes.TRANSFORMS.changed = False
+        self.__redraw = False
+
+        if self.capture is not None:
+            self.capture.capture()
+
+        if glstate.STATE.debug:
+            glstate.STATE.validate()
+
+    def startCapture(
+            self: typing.Self,
+            pattern: str | None = None,
+            /,
+            *,
+            command: list[str] | None = None,
+            ring: int = 3
+            ) -> Capture:
+        """
+        Method that starts capturing every rendered frame, stopping the previous capture if any.
+
+        Args:
+            pattern (`str | None`): Path of the images with a `{}` replaced by the frame index (e.g. `captures/{:05d}.png`).
+            command (`list[str] | None`): Command of an encoder process reading raw frames on its standard input
+                (e.g. `Capture.ffmpegCommand(...)`), used instead of `pattern`.
+            ring (`int`): Number of pixel buffer objects used.
+        Returns:
+            `Capture`: the capture, for its statistics.
+        """
+        self.stopCapture()
+        self.capture = Capture(self.window, pattern=pattern, command=command, ring=ring)
+
+        return self.capture
+
+    def stopCapture(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that writes the last captured frames and stops the capture.
+        """
+        if self.capture is not None:
+            self.capture.stop()
+            self.capture = None
 
     def quit(
             self: typing.Self,
             /
             ) -> None:
         """
-        Method to/that # TODO: set docstring
+        Method that asks the main loop to stop: stops the capture and the loader and closes the window.
 
-        Raises:
-            # TODO: set exceptions
+        The frame in progress can still be drawn, GPU ressources are deleted by `clean` once the loop ended.
+        """
+        self.stopCapture()
+        ressources.LOADER.shutdown()
+        self.window.setShouldClose(True)
+
+    def clean(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that deletes the GPU ressources of the renderer and its scene, to call after the main loop ended.
         """
+        self.stopCapture()
+        ressources.LOADER.shutdown()
         self.scene.cleanRessources()
-        glfw.set_window_should_close(self.window, True)
+        self.skybox.cleanRessources()
+        if self.queue.instancer is not None:
+            self.queue.instancer.clean()
+        if self.indirect is not None:
+            self.indirect.clean()
+        ressources.GEOMETRY.clean()
+        self.camera.clean()
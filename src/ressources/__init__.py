@@ -8,17 +8,29 @@ Package to/that # TODO: set docstring
 Modules
 -------
 - `utils` (from parent package)
+- `glstate` (from parent package)
+- `profiler` (from parent package)
 Classes
 -------
 - `Ressource`
+- `Loader`
+- `GeometryPool`
 - `Shader`
 - `Mesh`
+- `TextureCook`
 - `Texture`
+Globals
+-------
+- `LOADER`: Loader shared by every ressource.
+- `GEOMETRY`: Geometry pool shared by every mesh.
 """
 
 
-from .. import utils  # type: ignore # noqa: F401
+from .. import utils, glstate, profiler  # type: ignore # noqa: F401
 from .ressource import Ressource  # type: ignore # noqa: F401
+from .loader import Loader, LOADER  # type: ignore # noqa: F401
+from .geometry import GeometryPool, GEOMETRY  # type: ignore # noqa: F401
 from .shader import Shader  # type: ignore # noqa: F401
 from .mesh import Mesh  # type: ignore # noqa: F401
+from .texture_cook import TextureCook  # type: ignore # noqa: F401
 from .texture import Texture  # type: ignore # noqa: F401
@@ -0,0 +1,312 @@
+"""
+geometry module
+===============
+Package: `ressources`
+
+Module that sub-allocates the vertices and indices of every mesh from shared buffers.
+
+Classes
+-------
+- `GeometryPool`
+Globals
+-------
+- `GEOMETRY`: Pool shared by every mesh.
+"""
+
+
+# built-in imports
+import typing
+import bisect
+# pip imports
+import numpy as np
+import OpenGL.GL as GL  # type: ignore
+# local imports
+from . import glstate
+
+
+class GeometryPool:
+    """
+    GeometryPool class
+    ==================
+
+    Class that owns one vertex buffer, one index buffer and the VAO reading them (interleaved position, texcoord, normal),
+    and hands out ranges of them with a first-fit free-list. Freed ranges are merged with their free neighbours.
+
+    Meshes are drawn with `glDrawElementsBaseVertex` (indices are relative to the first vertex of the mesh),
+    so switching mesh doesn't need to switch VAO or buffers.
+
+    When a buffer is full it is replaced by one twice as big (data copied on the GPU), `generation` is then increased
+    so users of the buffer names can rebuild what depends on them. Must be used from the render thread.
+
+    Attributes:
+        vao (`typing.Any`): VAO reading the shared buffers, None before the first allocation.
+        vbo (`typing.Any`): Shared vertex buffer.
+        ibo (`typing.Any`): Shared index buffer.
+        vertex_capacity (`int`): Number of vertices the vertex buffer can hold.
+        index_capacity (`int`): Number of indices the index buffer can hold.
+        used_vertices (`int`): Number of vertices allocated.
+        used_indices (`int`): Number of indices allocated.
+        generation (`int`): Increased every time a buffer is replaced.
+    Methods
+    -------
+    - `allocate`
+    - `free`
+    - `clean`
+    """
+    VERTEX_BYTES: int = 8 * 4
+    INDEX_BYTES: int = 4
+
+    def __init__(
+            self: typing.Self,
+            vertex_capacity: int = 1 << 16,
+            index_capacity: int = 1 << 18,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            vertex_capacity (`int`): Initial number of vertices of the vertex buffer.
+            index_capacity (`int`): Initial number of indices of the index buffer.
+        """
+        self.vao: typing.Any = None
+        self.vbo: typing.Any = None
+        self.ibo: typing.Any = None
+        self.vertex_capacity: int = vertex_capacity
+        self.index_capacity: int = index_capacity
+        self.used_vertices: int = 0
+        self.used_indices: int = 0
+        self.generation: int = 0
+
+        self.__vertex_free: list[tuple[int, int]] = [(0, vertex_capacity)]
+        self.__index_free: list[tuple[int, int]] = [(0, index_capacity)]
+
+    @staticmethod
+    def __take(
+            free: list[tuple[int, int]],
+            size: int,
+            /
+            ) -> int | None:
+        """
+        Method that removes `size` elements from the first free range big enough.
+
+        Args:
+            free (`list[tuple[int,int]]`): Sorted free ranges (start, size).
+            size (`int`): Number of elements wanted.
+        Returns:
+            `int | None`: start of the range, None if no range is big enough.
+        """
+        for i, (start, length) in enumerate(free):
+            if length < size:
+                continue
+
+            if length == size:
+                free.pop(i)
+            else:
+                free[i] = (start + size, length - size)
+
+            return start
+
+        return None
+
+    @staticmethod
+    def __give(
+            free: list[tuple[int, int]],
+            start: int,
+            size: int,
+            /
+            ) -> None:
+        """
+        Method that puts a range back in the free-list, merging it with the free ranges touching it.
+
+        Args:
+            free (`list[tuple[int,int]]`): Sorted free ranges (start, size).
+            start (`int`): First element of the range.
+            size (`int`): Number of elements of the range.
+        """
+        if size <= 0:
+            return
+
+        i: int = bisect.bisect_left(free, (start, 0))
+
+        if i < len(free) and start + size == free[i][0]:
+            size += free.pop(i)[1]
+
+        if i > 0 and free[i - 1][0] + free[i - 1][1] == start:
+            start, previous = free[i - 1]
+            free[i - 1] = (start, previous + size)
+            return
+
+        free.insert(i, (start, size))
+
+    def __createBuffer(
+            self: typing.Self,
+            nbytes: int,
+            old: typing.Any = None,
+            old_nbytes: int = 0,
+            /
+            ) -> typing.Any:
+        """
+        Method that creates a buffer, copying the content of the old one on the GPU then deleting it.
+
+        Args:
+            nbytes (`int`): Size of the new buffer.
+            old (`typing.Any`): Buffer to copy, if any.
+            old_nbytes (`int`): Size of the old buffer.
+        Returns:
+            `typing.Any`: the new buffer.
+        """
+        buffer: typing.Any = GL.glGenBuffers(1)
+        glstate.STATE.bindBuffer(GL.GL_COPY_WRITE_BUFFER, buffer)
+        GL.glBufferData(GL.GL_COPY_WRITE_BUFFER, nbytes, None, GL.GL_STATIC_DRAW)
+
+        if old is not None:
+            glstate.STATE.bindBuffer(GL.GL_COPY_READ_BUFFER, old)
+            GL.glCopyBufferSubData(GL.GL_COPY_READ_BUFFER, GL.GL_COPY_WRITE_BUFFER, 0, 0, old_nbytes)
+            glstate.STATE.deleteBuffers(old)
+
+        return buffer
+
+    def __setVertexArray(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that (re)points the VAO at the current buffers.
+        """
+        if self.vao is None:
+            self.vao = GL.glGenVertexArrays(1)
+
+        glstate.STATE.bindVertexArray(self.vao)
+        glstate.STATE.bindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
+        glstate.STATE.bindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.ibo)
+
+        type_bytes: int = GL.ctypes.sizeof(GL.ctypes.c_float)
+        stride: int = GeometryPool.VERTEX_BYTES
+        GL.glVertexAttribPointer(0, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(0))
+        GL.glEnableVertexAttribArray(0)
+        GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(3 * type_bytes))
+        GL.glEnableVertexAttribArray(1)
+        GL.glVertexAttribPointer(2, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(5 * type_bytes))
+        GL.glEnableVertexAttribArray(2)
+
+    def __reserve(
+            self: typing.Self,
+            nb_vertices: int,
+            nb_indices: int,
+            /
+            ) -> tuple[int, int]:
+        """
+        Method that takes ranges for a mesh, growing the buffers until they fit.
+
+        Args:
+            nb_vertices (`int`): Number of vertices.
+            nb_indices (`int`): Number of indices.
+        Returns:
+            `tuple[int,int]`: first vertex and first index of the ranges.
+        """
+        if self.vao is None:
+            self.vbo = self.__createBuffer(self.vertex_capacity * GeometryPool.VERTEX_BYTES)
+            self.ibo = self.__createBuffer(self.index_capacity * GeometryPool.INDEX_BYTES)
+            self.__setVertexArray()
+
+        grown: bool = False
+
+        base_vertex: int | None = GeometryPool.__take(self.__vertex_free, nb_vertices)
+        while base_vertex is None:
+            old_capacity: int = self.vertex_capacity
+            self.vertex_capacity = max(old_capacity * 2, old_capacity + nb_vertices)
+            self.vbo = self.__createBuffer(self.vertex_capacity * GeometryPool.VERTEX_BYTES, self.vbo, old_capacity * GeometryPool.VERTEX_BYTES)
+            GeometryPool.__give(self.__vertex_free, old_capacity, self.vertex_capacity - old_capacity)
+            base_vertex = GeometryPool.__take(self.__vertex_free, nb_vertices)
+            grown = True
+
+        first_index: int | None = GeometryPool.__take(self.__index_free, nb_indices)
+        while first_index is None:
+            old_capacity = self.index_capacity
+            self.index_capacity = max(old_capacity * 2, old_capacity + nb_indices)
+            self.ibo = self.__createBuffer(self.index_capacity * GeometryPool.INDEX_BYTES, self.ibo, old_capacity * GeometryPool.INDEX_BYTES)
+            GeometryPool.__give(self.__index_free, old_capacity, self.index_capacity - old_capacity)
+            first_index = GeometryPool.__take(self.__index_free, nb_indices)
+            grown = True
+
+        if grown:
+            self.__setVertexArray()
+            self.generation += 1
+
+        return base_vertex, first_index
+
+    def allocate(
+            self: typing.Self,
+            vertices: np.ndarray,
+            indices: np.ndarray,
+            /
+            ) -> tuple[int, int]:
+        """
+        Method that copies a mesh in the shared buffers.
+
+        Args:
+            vertices (`np.ndarray`): flat `float32` vertices (8 floats per vertex).
+            indices (`np.ndarray`): `uint32` indices, relative to the first vertex of the mesh.
+        Returns:
+            `tuple[int,int]`: base vertex and first index to draw the mesh with.
+        """
+        nb_vertices: int = len(vertices) // 8
+        base_vertex, first_index = self.__reserve(nb_vertices, len(indices))
+
+        # GL_COPY_WRITE_BUFFER, binding GL_ELEMENT_ARRAY_BUFFER would change the bound VAO
+        if nb_vertices:
+            glstate.STATE.bindBuffer(GL.GL_COPY_WRITE_BUFFER, self.vbo)
+            GL.glBufferSubData(GL.GL_COPY_WRITE_BUFFER, base_vertex * GeometryPool.VERTEX_BYTES, vertices.nbytes, vertices)
+        if len(indices):
+            glstate.STATE.bindBuffer(GL.GL_COPY_WRITE_BUFFER, self.ibo)
+            GL.glBufferSubData(GL.GL_COPY_WRITE_BUFFER, first_index * GeometryPool.INDEX_BYTES, indices.nbytes, indices)
+
+        self.used_vertices += nb_vertices
+        self.used_indices += len(indices)
+
+        return base_vertex, first_index
+
+    def free(
+            self: typing.Self,
+            base_vertex: int,
+            nb_vertices: int,
+            first_index: int,
+            nb_indices: int,
+            /
+            ) -> None:
+        """
+        Method that gives back the ranges of a mesh.
+
+        Args:
+            base_vertex (`int`): First vertex given by `allocate`.
+            nb_vertices (`int`): Number of vertices.
+            first_index (`int`): First index given by `allocate`.
+            nb_indices (`int`): Number of indices.
+        """
+        GeometryPool.__give(self.__vertex_free, base_vertex, nb_vertices)
+        GeometryPool.__give(self.__index_free, first_index, nb_indices)
+
+        self.used_vertices -= nb_vertices
+        self.used_indices -= nb_indices
+
+    def clean(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that deletes the buffers and the VAO, every range is freed.
+        """
+        if self.vao is not None:
+            glstate.STATE.deleteVertexArray(self.vao)
+            glstate.STATE.deleteBuffers(self.vbo, self.ibo)
+            self.vao = self.vbo = self.ibo = None
+
+        self.__vertex_free = [(0, self.vertex_capacity)]
+        self.__index_free = [(0, self.index_capacity)]
+        self.used_vertices = 0
+        self.used_indices = 0
+        self.generation += 1
+
+
+GEOMETRY: GeometryPool = GeometryPool()
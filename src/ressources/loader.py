@@ -0,0 +1,309 @@
+"""
+loader module
+=============
+Package: `ressources`
+
+Module that loads ressources in background threads and uploads them to the GPU,
+either from the render thread or from an upload worker owning a shared OpenGL context.
+
+Classes
+-------
+- `Loader`
+Globals
+-------
+- `LOADER`: Loader shared by every ressource.
+"""
+
+
+# built-in imports
+import typing
+import collections.abc
+import concurrent.futures
+import queue
+import threading
+import time
+# pip imports
+import OpenGL.GL as GL  # type: ignore
+# local imports
+from . import profiler
+if typing.TYPE_CHECKING:
+    from . import Ressource
+
+
+class Loader:
+    """
+    Loader class
+    ============
+
+    Class that runs the CPU part of ressource loading (disk reads, parsing, decoding) in a thread pool
+    and queues the results so the render thread can upload them under a time budget.
+
+    When an upload worker is started, shared OpenGL objects are created by the worker in its own context
+    and the render thread only waits on a fence before finishing the ressource (e.g. creating a VAO).
+
+    Attributes:
+        enabled (`bool`): If False, ressources are loaded and uploaded synchronously when requested.
+        pending (`int`): Number of requested ressources not uploaded yet.
+        on_ready (`collections.abc.Callable[[], None] | None`): Function called from a loading thread when a ressource
+            is ready for `processUploads` (e.g. to wake up a render loop waiting for events).
+    Methods
+    -------
+    - `startUploadWorker`
+    - `request`
+    - `hasUploads`
+    - `processUploads`
+    - `wait`
+    - `shutdown`
+    """
+    def __init__(
+            self: typing.Self,
+            max_workers: int | None = None,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            max_workers (`int | None`): Number of loading threads, if None, let `concurrent.futures` choose.
+        """
+        self.enabled: bool = True
+        self.pending: int = 0
+        self.on_ready: collections.abc.Callable[[], None] | None = None
+
+        self.__max_workers: int | None = max_workers
+        self.__executor: concurrent.futures.ThreadPoolExecutor | None = None
+        self.__uploads: queue.SimpleQueue[tuple["Ressource", concurrent.futures.Future[typing.Any]]] = queue.SimpleQueue()
+
+        self.__worker: threading.Thread | None = None
+        self.__worker_uploads: queue.SimpleQueue[tuple["Ressource", concurrent.futures.Future[typing.Any]] | None] = queue.SimpleQueue()
+        self.__fences: queue.SimpleQueue[tuple["Ressource", typing.Any, typing.Any]] = queue.SimpleQueue()
+        self.__in_flight: list[tuple["Ressource", typing.Any, typing.Any]] = []
+
+    def startUploadWorker(
+            self: typing.Self,
+            window: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that starts a thread uploading ressources in the OpenGL context of `window`.
+
+        Args:
+            window (`typing.Any`): hidden `Window` whose context is shared with the render context.
+        """
+        if self.__worker is not None:
+            return
+
+        self.__worker = threading.Thread(target=self.__uploadWork, args=(window,), name="loader-gl", daemon=True)
+        self.__worker.start()
+
+    def __uploadWork(
+            self: typing.Self,
+            window: typing.Any,
+            /
+            ) -> None:
+        """
+        Method run by the upload worker: creates shared objects then puts a fence for the render thread.
+
+        Args:
+            window (`typing.Any`): hidden `Window` whose context is shared with the render context.
+        """
+        window.makeCurrent()
+
+        while True:
+            item = self.__worker_uploads.get()
+            if item is None:
+                break
+
+            ressource, future = item
+            data: typing.Any = None
+            fence: typing.Any = None
+
+            try:
+                data = future.result()
+                if ressource.isAlive():
+                    with profiler.PROFILER.zone(f"loader.upload.{ressource.__class__.__name__}"):
+                        ressource.uploadShared(data)
+                fence = GL.glFenceSync(GL.GL_SYNC_GPU_COMMANDS_COMPLETE, 0)
+                GL.glFlush()
+            except Exception as e:
+                print(f"Error loading {ressource.__class__.__name__} {ressource.name}: {e}")
+
+            self.__fences.put((ressource, data, fence))
+            if self.on_ready is not None:
+                self.on_ready()
+
+        window.doneCurrent()
+
+    def __loaded(
+            self: typing.Self,
+            ressource: "Ressource",
+            future: concurrent.futures.Future[typing.Any],
+            /
+            ) -> None:
+        """
+        Method called by the thread pool when the loading job of `ressource` is done.
+
+        Args:
+            ressource (`Ressource`): The ressource waiting for the data.
+            future (`concurrent.futures.Future[typing.Any]`): The finished loading job.
+        """
+        if self.__worker is not None:
+            self.__worker_uploads.put((ressource, future))
+            return
+
+        self.__uploads.put((ressource, future))
+        if self.on_ready is not None:
+            self.on_ready()
+
+    def request(
+            self: typing.Self,
+            ressource: "Ressource",
+            job: collections.abc.Callable[..., typing.Any],
+            /,
+            *args: typing.Any
+            ) -> None:
+        """
+        Method that starts loading a ressource, its `upload` method will be called with the result of `job`.
+
+        Args:
+            ressource (`Ressource`): The ressource waiting for the data.
+            job (`collections.abc.Callable[...,typing.Any]`): CPU only work to do (must not call OpenGL).
+            *args (`typing.Any`): Args given to `job`.
+        Raises:
+            `Exception`: anything raised by `job` or `upload`, only when the loader is disabled.
+        """
+        if not self.enabled:
+            ressource.upload(job(*args))
+            return
+
+        if self.__executor is None:
+            self.__executor = concurrent.futures.ThreadPoolExecutor(self.__max_workers, thread_name_prefix="loader")
+
+        self.pending += 1
+        job = profiler.PROFILER.profiled(f"loader.load.{ressource.__class__.__name__}")(job)
+        future: concurrent.futures.Future[typing.Any] = self.__executor.submit(job, *args)
+        future.add_done_callback(lambda done: self.__loaded(ressource, done))
+
+    def hasUploads(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        Method that tells if `processUploads` has something to do, without waiting for the ressources still loading.
+
+        Returns:
+            `bool`: True if a loaded ressource waits to be uploaded or finished.
+        """
+        return not self.__uploads.empty() or not self.__fences.empty() or len(self.__in_flight) > 0
+
+    @profiler.PROFILER.profiled("loader.uploads")
+    def processUploads(
+            self: typing.Self,
+            budget: float,
+            /
+            ) -> int:
+        """
+        Method that finishes ressources uploaded by the worker, then uploads loaded ressources until `budget` is spent.
+        Must be called from the render thread.
+
+        At least one ressource is uploaded per call if any is ready, so a big one can't be delayed forever.
+
+        Args:
+            budget (`float`): Time allowed for uploads in seconds.
+        Returns:
+            `int`: number of ressources processed.
+        """
+        start: float = time.perf_counter()
+        processed: int = self.__finishUploads()
+
+        while True:
+            try:
+                ressource, future = self.__uploads.get_nowait()
+            except queue.Empty:
+                break
+
+            self.pending -= 1
+            processed += 1
+
+            if ressource.isAlive():
+                try:
+                    with profiler.PROFILER.zone(f"loader.upload.{ressource.__class__.__name__}"):
+                        ressource.upload(future.result())
+                except Exception as e:
+                    print(f"Error loading {ressource.__class__.__name__} {ressource.name}: {e}")
+
+            if time.perf_counter() - start >= budget:
+                break
+
+        return processed
+
+    def __finishUploads(
+            self: typing.Self,
+            /
+            ) -> int:
+        """
+        Method that finishes ressources whose fence from the upload worker is signaled, never blocks.
+
+        Returns:
+            `int`: number of ressources processed.
+        """
+        while True:
+            try:
+                self.__in_flight.append(self.__fences.get_nowait())
+            except queue.Empty:
+                break
+
+        processed: int = 0
+        waiting: list[tuple["Ressource", typing.Any, typing.Any]] = []
+
+        for ressource, data, fence in self.__in_flight:
+            if fence is not None:
+                if GL.glClientWaitSync(fence, 0, 0) not in (GL.GL_ALREADY_SIGNALED, GL.GL_CONDITION_SATISFIED):
+                    waiting.append((ressource, data, fence))
+                    continue
+                GL.glDeleteSync(fence)
+
+                if ressource.isAlive():
+                    try:
+                        with profiler.PROFILER.zone(f"loader.finish.{ressource.__class__.__name__}"):
+                            ressource.uploadLocal(data)
+                    except Exception as e:
+                        print(f"Error loading {ressource.__class__.__name__} {ressource.name}: {e}")
+
+            self.pending -= 1
+            processed += 1
+
+        self.__in_flight = waiting
+
+        return processed
+
+    def wait(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that blocks until every requested ressource is uploaded, must be called from the render thread.
+        """
+        while self.pending > 0:
+            self.processUploads(float("inf"))
+            if self.pending > 0:
+                time.sleep(0.001)
+
+    def shutdown(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that cancels loadings not started yet and stops the threads.
+        """
+        if self.__executor is not None:
+            self.__executor.shutdown(wait=False, cancel_futures=True)
+            self.__executor = None
+
+        if self.__worker is not None:
+            self.__worker_uploads.put(None)
+            self.__worker.join()
+            self.__worker = None
+
+
+LOADER: Loader = Loader()
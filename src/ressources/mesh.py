@@ -7,7 +7,6 @@ Module to/that # TODO: set docstring
 
 Classes
 -------
-- `MeshParseData`
 - `Mesh`
 """
 
@@ -15,45 +14,14 @@ Classes
 # built-in imports
 import os
 import typing
-import dataclasses
+import struct
+import hashlib
+import mmap
+import tempfile
 # pip imports
-import pyglm.glm as glm
-import OpenGL.GL as GL  # type: ignore
+import numpy as np
 # local imports
-from . import utils, Ressource
-
-
-@dataclasses.dataclass
-class MeshParseData:
-    """
-    MeshParseData class
-    ===================
-
-    Class to/that # TODO: set docstring
-
-    Attributes:
-        # TODO: set attributes
-    """
-    positions: glm.array[GL.ctypes.c_float]
-    texcoords: glm.array[GL.ctypes.c_float]
-    normals: glm.array[GL.ctypes.c_float]
-    nb: int
-
-    def __post_init__(
-            self: typing.Self,
-            /
-            ) -> None:
-        """
-        Method to/that # TODO: set docstring
-
-        Raises:
-            # TODO: set exceptions
-        """
-        self.vertices: glm.array[GL.ctypes.c_float] = glm.array.zeros(self.nb * 24, GL.ctypes.c_float)
-        self.indices: glm.array[GL.ctypes.c_uint32] = glm.array.zeros(self.nb * 3, GL.ctypes.c_uint32)
-        self.index_map: dict[tuple[int, int, int], GL.ctypes.c_uint32] = {}
-        self.current_index: int = 0
-        self.parsed: int = 0
+from . import utils, Ressource, LOADER, GEOMETRY
 
 
 class Mesh(Ressource):
@@ -68,183 +36,316 @@ class Mesh(Ressource):
         # TODO: set attributes
     Methods
     -------
-    - `__parseForArray` (staticmethod)
-    - `__addToBuffers` (staticmethod)
-    - `__parseForBuffers` (staticmethod)
+    - `__parseFloats` (staticmethod)
+    - `__triangulate` (staticmethod)
     - `loadMesh` (staticmethod)
+    - `computeBounds` (staticmethod)
+    - `readCache` (staticmethod)
+    - `writeCache` (staticmethod)
+    - `loadCompiled` (staticmethod)
+    - `uploadShared`
+    - `uploadLocal`
+    - `clean`
     """
+    # magic, version, path hash, mtime_ns, size, content hash, nb floats, nb indices, bounds (aabb min, aabb max, sphere center, sphere radius)
+    __CACHE_HEADER: struct.Struct = struct.Struct("<8sI16sqq16sII10f4x")
+    __CACHE_MAGIC: bytes = b"PYGLMESH"
+    __CACHE_VERSION: int = 1
+
     @staticmethod
-    def __parseForArray(
-            src: str,
-            nb: int,
-            pos: int,
-            start: str,
+    def __parseFloats(
+            lines: list[bytes],
             size: int,
             /
-            ) -> glm.array[GL.ctypes.c_float]:
+            ) -> np.ndarray:
         """
-        Method to/that # TODO: set docstring
+        Method that parses every float of `lines` at once and keeps the first `size` floats of each line,
+        lines may have more elements than others (e.g. `vt u v w` among `vt u v`).
 
         Args:
-            src (`str`): Absolute path for mesh.
-            nb (`int`): Number of element to parse.
-            pos (`int`): Descriptor in the file.
-            start (`str`): Start of lines to parse.
-            size (`int`): Numbers of element to parse per line.
+            lines (`list[bytes]`): Lines to parse (without their keyword).
+            size (`int`): Numbers of element to keep per line.
         Returns:
-            `glm.array[GL.ctypes.c_float]`: # TODO: set return
+            `np.ndarray`: array of shape `(len(lines), size)` of `float32`.
         Raises:
-            # TODO: set exceptions
+            `ValueError`: if a line has less than `size` elements or an element isn't a float.
         """
-        res: glm.array[GL.ctypes.c_float] = glm.array.zeros(nb * 3, GL.ctypes.c_float)
+        if not lines:
+            return np.zeros((0, size), np.float32)
 
-        parsed: int = 0
-        min_len: int = len(start.strip()) + size * 2
+        text: bytes = b"\n".join(lines)
+        values: np.ndarray = np.array(text.split(), np.float32)
 
-        with open(src, "r") as file:
-            file.seek(pos)
+        # index of the first element of each line: count the elements starting before each line
+        chars: np.ndarray = np.frombuffer(text, np.uint8)
+        # same whitespace as `bytes.split`
+        blank: np.ndarray = np.isin(chars, np.frombuffer(b" \t\n\r\v\f", np.uint8))
+        starts: np.ndarray = ~blank
+        starts[1:] &= blank[:-1]
+        counted: np.ndarray = np.concatenate(([0], np.cumsum(starts)))
+        line_starts: np.ndarray = np.concatenate(([0], np.flatnonzero(chars == ord("\n")) + 1))
+        line_ends: np.ndarray = np.append(line_starts[1:] - 1, len(chars))
 
-            for line in file:
-                if parsed >= nb:
-                    break
-                if len(line) < min_len or not line.startswith(start):
-                    continue
+        firsts: np.ndarray = counted[line_starts]
+        if np.any(counted[line_ends] - firsts < size):
+            raise ValueError(f"Mesh attribute lines need at least {size} elements")
 
-                res[parsed * size:parsed * size + size] = glm.array(list(map(GL.ctypes.c_float, map(float, line[len(start):].split(maxsplit=size)[:size]))))
-
-                parsed += 1
-
-        return res
+        return values[firsts[:, None] + np.arange(size)]
 
     @staticmethod
-    def __addToBuffers(
-            data: MeshParseData,
-            vertices: tuple[str, str, str],
+    def __triangulate(
+            lines: list[bytes],
             /
-            ) -> None:
+            ) -> np.ndarray:
         """
-        Method to/that # TODO: set docstring
+        Method that parses every face at once and splits them in triangles of (position, texcoord, normal) indices.
+
+        Only the first four corners of a face are used, a quad `0 1 2 3` gives triangles `0 1 2` and `0 3 2`.
 
         Args:
-            data (`MeshParseData`): Data for mesh.
-            vertices (`tuple[str, str, str]`): Vertices of the face.
+            lines (`list[bytes]`): Face lines to parse (without their keyword).
+        Returns:
+            `np.ndarray`: array of shape `(nb_triangles * 3, 3)` of `int64`, indices start at 0.
         Raises:
-            # TODO: set exceptions
+            `ValueError`: if a corner is not of the form `v/vt/vn`.
         """
-        for i, part in enumerate(vertices):
-            pos_idx, tex_idx, norm_idx = [int(idx) - 1 for idx in part.split('/', 3)[:3]]
-            key = (pos_idx, tex_idx, norm_idx)
+        if not lines:
+            return np.zeros((0, 3), np.int64)
 
-            if key not in data.index_map:
-                data.index_map[key] = GL.ctypes.c_uint32(data.current_index)
-                data.vertices[data.current_index * 8:data.current_index * 8 + 8] = glm.array(
-                    list(map(GL.ctypes.c_float, [
-                        *data.positions[pos_idx * 3:pos_idx * 3 + 3],
-                        *data.texcoords[tex_idx * 2:tex_idx * 2 + 2],
-                        *data.normals[norm_idx * 3:norm_idx * 3 + 3],
-                    ]))
-                )
-                data.current_index += 1
+        corners: np.ndarray = np.array(b" ".join(lines).replace(b"/", b" ").split(), np.int64).reshape(-1, 3) - 1
+        sizes: np.ndarray = np.fromiter((len(line.split()) for line in lines), np.int64, len(lines))
+        starts: np.ndarray = np.cumsum(sizes) - sizes
 
-            data.indices[data.parsed * 3 + i] = data.index_map[key]
+        triangles: np.ndarray = (starts[:, None] + np.array([0, 1, 2, 0, 3, 2], np.int64)).reshape(-1, 2, 3)
+        keep: np.ndarray = np.stack((sizes >= 3, sizes >= 4), axis=1)
 
-        data.parsed += 1
+        return corners[triangles[keep].ravel()]
 
     @staticmethod
-    def __parseForBuffers(
+    def loadMesh(
             src: str,
-            pos: int,
-            data: MeshParseData,
             /
-            ) -> tuple[glm.array[GL.ctypes.c_float], glm.array[GL.ctypes.c_uint32]]:
+            ) -> tuple[np.ndarray, np.ndarray]:
         """
-        Method to/that # TODO: set docstring
+        Method that reads a Wavefront OBJ file in a single pass and builds its interleaved vertex buffer and index buffer.
+
+        Each vertex is 8 `float32`: position (3), texcoord (2), normal (3).
+        Vertices are ordered by their first use in faces.
 
         Args:
             src (`str`): Absolute path for mesh.
-            pos (`int`): Descriptor in the file.
-            data (`MeshParseData`): Data for mesh.
         Returns:
-            `tuple[glm.array[GL.ctypes.c_float],glm.array[GL.ctypes.c_uint32]]`: # TODO: set return
+            `tuple[np.ndarray,np.ndarray]`: flat `float32` vertices and flat `uint32` indices.
         Raises:
-            # TODO: set exceptions
+            `OSError`: if the file can't be read.
+            `ValueError`: if the file is malformed.
+        """
+        with open(src, "rb") as file:
+            lines: list[bytes] = file.read().splitlines()
+
+        v: list[bytes] = []
+        vt: list[bytes] = []
+        vn: list[bytes] = []
+        f: list[bytes] = []
+        by_keyword: dict[bytes, list[bytes]] = {b"v": v, b"vt": vt, b"vn": vn, b"f": f}
+
+        for line in lines:
+            keyword, _, rest = line.partition(b" ")
+            target: list[bytes] | None = by_keyword.get(keyword)
+            if target is not None:
+                # trailing comment (e.g. `v 0 0 0 # origin`)
+                if b"#" in rest:
+                    rest = rest.partition(b"#")[0]
+                target.append(rest)
+
+        positions: np.ndarray = Mesh.__parseFloats(v, 3)
+        texcoords: np.ndarray = Mesh.__parseFloats(vt, 2)
+        normals: np.ndarray = Mesh.__parseFloats(vn, 3)
+        keys: np.ndarray = Mesh.__triangulate(f)
+
+        if not len(keys):
+            return np.zeros(0, np.float32), np.zeros(0, np.uint32)
+
+        uniques, first, inverse = np.unique(keys, return_index=True, return_inverse=True, axis=0)
+
+        order: np.ndarray = np.argsort(first)
+        remap: np.ndarray = np.empty_like(order)
+        remap[order] = np.arange(len(order))
+        uniques = uniques[order]
+
+        vertices: np.ndarray = np.hstack((
+            positions[uniques[:, 0]],
+            texcoords[uniques[:, 1]],
+            normals[uniques[:, 2]]
+        )).astype(np.float32, copy=False).ravel()
+        indices: np.ndarray = remap[inverse.ravel()].astype(np.uint32)
+
+        return vertices, indices
+
+    @staticmethod
+    def computeBounds(
+            vertices: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that computes the bounding box and bounding sphere of an interleaved vertex buffer.
+
+        Args:
+            vertices (`np.ndarray`): flat `float32` vertices (8 floats per vertex).
+        Returns:
+            `np.ndarray`: 10 `float32`: aabb min (3), aabb max (3), sphere center (3), sphere radius (1).
+        """
+        if not len(vertices):
+            return np.zeros(10, np.float32)
+
+        positions: np.ndarray = vertices.reshape(-1, 8)[:, :3]
+        low: np.ndarray = positions.min(axis=0)
+        high: np.ndarray = positions.max(axis=0)
+        center: np.ndarray = (low + high) / 2
+        radius: float = float(np.sqrt(((positions - center) ** 2).sum(axis=1).max()))
+
+        return np.concatenate((low, high, center, (radius,))).astype(np.float32)
+
+    @staticmethod
+    def readCache(
+            src: str,
+            cache: str,
+            /
+            ) -> tuple[mmap.mmap, np.ndarray, np.ndarray, np.ndarray] | None:
         """
-        with open(src, 'r') as file:
-            file.seek(pos)
+        Method that memory-maps the compiled binary of a mesh if it is still valid for its source.
 
-            for line in file:
-                if data.parsed >= data.nb:
-                    break
-                if len(line) < 19 or line[0] != 'f' or line[1] != ' ':
-                    continue
+        The cache is valid if the source path, mtime and size are the same as when it was written,
+        or if the content of the source still has the same hash: then the binary is written again
+        with the new path, mtime and size, so the next launches don't hash the source again.
+
+        Args:
+            src (`str`): Absolute path for mesh source.
+            cache (`str`): Absolute path for the compiled binary.
+        Returns:
+            `tuple[mmap.mmap,np.ndarray,np.ndarray,np.ndarray] | None`: the mapping, vertices, indices and bounds, or None on a cache miss.
+        """
+        try:
+            stat: os.stat_result = os.stat(src)
+            with open(cache, "rb") as file:
+                mapping: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        header: struct.Struct = Mesh.__CACHE_HEADER
+        if len(mapping) < header.size:
+            mapping.close()
+            return None
+
+        magic, version, path_hash, mtime, size, content_hash, nb_floats, nb_indices, *bounds = header.unpack_from(mapping)
+        valid: bool = (
+            magic == Mesh.__CACHE_MAGIC
+            and version == Mesh.__CACHE_VERSION
+            and len(mapping) == header.size + nb_floats * 4 + nb_indices * 4
+        )
 
-                parts = line[2:].split()[:4]
+        moved: bool = valid and (path_hash, mtime, size) != (hashlib.blake2b(src.encode(), digest_size=16).digest(), stat.st_mtime_ns, stat.st_size)
+        if moved:
+            valid = content_hash == Mesh.hashSource(src)
 
-                if len(parts) < 3:
-                    continue
+        if not valid:
+            mapping.close()
+            return None
 
-                Mesh.__addToBuffers(data, (parts[0], parts[1], parts[2]))
+        vertices: np.ndarray = np.frombuffer(mapping, np.float32, nb_floats, header.size)
+        indices: np.ndarray = np.frombuffer(mapping, np.uint32, nb_indices, header.size + nb_floats * 4)
 
-                if len(parts) == 4:
-                    Mesh.__addToBuffers(data, (parts[0], parts[3], parts[2]))
+        if moved:
+            try:
+                Mesh.writeCache(src, cache, stat, content_hash, vertices, indices, np.array(bounds, np.float32))
+            except OSError as e:
+                print(f"Warning: could not update mesh cache '{cache}': {e}")
 
-        return data.vertices[0:data.current_index * 8], data.indices
+        return mapping, vertices, indices, np.array(bounds, np.float32)
 
     @staticmethod
-    def loadMesh(
+    def writeCache(
             src: str,
+            cache: str,
+            stat: os.stat_result,
+            content_hash: bytes,
+            vertices: np.ndarray,
+            indices: np.ndarray,
+            bounds: np.ndarray,
             /
-            ) -> tuple[glm.array[GL.ctypes.c_float], glm.array[GL.ctypes.c_uint32]]:
+            ) -> None:
         """
-        Method to/that # TODO: set docstring
+        Method that atomically writes the compiled binary of a mesh next to its source.
 
         Args:
-            src (`str`): Absolute path for mesh.
-        Returns:
-            `tuple[glm.array[GL.ctypes.c_float],glm.array[GL.ctypes.c_uint32]]`: # TODO: set return
+            src (`str`): Absolute path for mesh source.
+            cache (`str`): Absolute path for the compiled binary.
+            stat (`os.stat_result`): Stat of the source taken before it was parsed.
+            content_hash (`bytes`): Hash of the source taken before it was parsed.
+            vertices (`np.ndarray`): flat `float32` vertices.
+            indices (`np.ndarray`): flat `uint32` indices.
+            bounds (`np.ndarray`): 10 `float32` bounds from `computeBounds`.
         Raises:
-            # TODO: set exceptions
+            `OSError`: if the binary can't be written.
         """
-        nb_v = nb_vt = nb_vn = nb_f = 0
-        pos_v = pos_vt = pos_vn = pos_f = -1
-
-        min_len_v: int = 7
-        min_len_vt: int = 6
-        min_len_vn: int = 8
-
-        with open(src, 'r') as file:
-            while True:
-                pos = file.tell()
-                line = file.readline()
-
-                if not line:
-                    break
-
-                if len(line) >= min_len_v and line.startswith("v "):
-                    if not nb_v:
-                        pos_v = pos
-                    nb_v += 1
-                elif len(line) >= min_len_vt and line.startswith("vt "):
-                    if not nb_vt:
-                        pos_vt = pos
-                    nb_vt += 1
-                elif len(line) >= min_len_vn and line.startswith("vn "):
-                    if not nb_vn:
-                        pos_vn = pos
-                    nb_vn += 1
-                elif len(line) >= 19 and line.startswith("f "):
-                    if not nb_f:
-                        pos_f = pos
-                    nb_f += len(line[2:].split()[:4]) - 2
-
-        data: MeshParseData = MeshParseData(
-            positions=Mesh.__parseForArray(src, nb_v, pos_v, "v ", 3),
-            texcoords=Mesh.__parseForArray(src, nb_vt, pos_vt, "vt ", 2),
-            normals=Mesh.__parseForArray(src, nb_vn, pos_vn, "vn ", 3),
-            nb=nb_f
+        header: bytes = Mesh.__CACHE_HEADER.pack(
+            Mesh.__CACHE_MAGIC,
+            Mesh.__CACHE_VERSION,
+            hashlib.blake2b(src.encode(), digest_size=16).digest(),
+            stat.st_mtime_ns,
+            stat.st_size,
+            content_hash,
+            len(vertices),
+            len(indices),
+            *bounds.tolist()
         )
 
-        return Mesh.__parseForBuffers(src, pos_f, data)
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(cache), suffix=".tmp", dir=os.path.dirname(cache))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(header)
+                file.write(np.ascontiguousarray(vertices, np.float32).data)
+                file.write(np.ascontiguousarray(indices, np.uint32).data)
+            # temporary files are private (0600), caches are readable like any other file
+            os.chmod(tmp, utils.CACHE_MODE)
+            os.replace(tmp, cache)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def loadCompiled(
+            src: str,
+            /
+            ) -> tuple[mmap.mmap | None, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Method that loads a mesh from its compiled binary, or parses it and writes the binary on a cache miss.
+
+        Args:
+            src (`str`): Absolute path for mesh source.
+        Returns:
+            `tuple[mmap.mmap | None,np.ndarray,np.ndarray,np.ndarray]`: the mapping (None if parsed), vertices, indices and bounds.
+        Raises:
+            `OSError`: if the source can't be read.
+            `ValueError`: if the source is malformed.
+        """
+        cache: str = os.path.splitext(src)[0] + utils.EXTENSIONS.mesh_cache
+
+        cached = Mesh.readCache(src, cache)
+        if cached is not None:
+            return cached
+
+        stat: os.stat_result = os.stat(src)
+        content_hash: bytes = Mesh.hashSource(src)
+        vertices, indices = Mesh.loadMesh(src)
+        bounds: np.ndarray = Mesh.computeBounds(vertices)
+
+        try:
+            Mesh.writeCache(src, cache, stat, content_hash, vertices, indices, bounds)
+        except OSError as e:
+            print(f"Warning: could not write mesh cache '{cache}': {e}")
+
+        return None, vertices, indices, bounds
 
     def __init__(
             self: typing.Self,
@@ -259,32 +360,60 @@ class Mesh(Ressource):
         Raises:
             # TODO: set exceptions
         """
+        if self.initialized:
+            return
+
         super().__init__(mesh_name=mesh_name)
 
-        self.vertices, self.indices = self.__class__.loadMesh(os.path.join(utils.ABS_PATH.meshes, mesh_name + utils.EXTENSIONS.mesh))
+        self.mapping: mmap.mmap | None = None
+        self.vertices: np.ndarray = np.zeros(0, np.float32)
+        self.indices: np.ndarray = np.zeros(0, np.uint32)
+        self.bounds: np.ndarray = np.zeros(10, np.float32)
 
-        self.vao: typing.Any = GL.glGenVertexArrays(1)
-        self.vbo: typing.Any = GL.glGenBuffers(1)
-        self.ibo: typing.Any = GL.glGenBuffers(1)
+        self.vao: typing.Any = None
+        self.base_vertex: int = 0
+        self.first_index: int = 0
+        self.allocated: bool = False
 
-        GL.glBindVertexArray(self.vao)
+        LOADER.request(self, self.__class__.loadCompiled, os.path.join(utils.ABS_PATH.meshes, mesh_name + utils.EXTENSIONS.mesh))
 
-        GL.glBindBuffer(GL.GL_ARRAY_BUFFER, self.vbo)
-        GL.glBufferData(GL.GL_ARRAY_BUFFER, self.vertices.nbytes, self.vertices.ptr, GL.GL_STATIC_DRAW)
+    @typing.override
+    def uploadShared(
+            self: typing.Self,
+            data: tuple[mmap.mmap | None, np.ndarray, np.ndarray, np.ndarray],
+            /
+            ) -> None:
+        """
+        Method that keeps the loaded data, the GPU copy is done by `uploadLocal`.
 
-        GL.glBindBuffer(GL.GL_ELEMENT_ARRAY_BUFFER, self.ibo)
-        GL.glBufferData(GL.GL_ELEMENT_ARRAY_BUFFER, self.indices.nbytes, self.indices.ptr, GL.GL_STATIC_DRAW)
+        Args:
+            data (`tuple[mmap.mmap | None,np.ndarray,np.ndarray,np.ndarray]`): Result of `loadCompiled`.
+        Raises:
+            # TODO: set exceptions
+        """
+        self.mapping, self.vertices, self.indices, self.bounds = data
+
+    @typing.override
+    def uploadLocal(
+            self: typing.Self,
+            data: tuple[mmap.mmap | None, np.ndarray, np.ndarray, np.ndarray],
+            /
+            ) -> None:
+        """
+        Method that copies the mesh in the shared buffers of `GEOMETRY` and uses its VAO.
 
-        type_bytes: int = GL.ctypes.sizeof(GL.ctypes.c_float)
-        stride: int = 8 * type_bytes
-        GL.glVertexAttribPointer(0, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(0))
-        GL.glEnableVertexAttribArray(0)
-        GL.glVertexAttribPointer(1, 2, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(3 * type_bytes))
-        GL.glEnableVertexAttribArray(1)
-        GL.glVertexAttribPointer(2, 3, GL.GL_FLOAT, GL.GL_FALSE, stride, GL.ctypes.c_void_p(5 * type_bytes))
-        GL.glEnableVertexAttribArray(2)
+        Done on the render thread, growing the shared buffers re-specifies the shared VAO.
+
+        Args:
+            data (`tuple[mmap.mmap | None,np.ndarray,np.ndarray,np.ndarray]`): Result of `loadCompiled`.
+        Raises:
+            # TODO: set exceptions
+        """
+        self.base_vertex, self.first_index = GEOMETRY.allocate(self.vertices, self.indices)
+        self.allocated = True
+        self.vao = GEOMETRY.vao
 
-        GL.glBindVertexArray(0)
+        super().uploadLocal(data)
 
     def clean(
             self: typing.Self,
@@ -301,9 +430,16 @@ class Mesh(Ressource):
         if super().clean():
             return 1
 
-        GL.glDeleteVertexArrays(1, (self.vao,))
-        GL.glDeleteBuffers(2, (self.vbo, self.ibo))
-        del self.indices
-        del self.vertices
+        if self.allocated:
+            GEOMETRY.free(self.base_vertex, len(self.vertices) // 8, self.first_index, len(self.indices))
+            self.allocated = False
+        self.vao = None
+        self.ready = False
+
+        self.vertices = np.zeros(0, np.float32)
+        self.indices = np.zeros(0, np.uint32)
+        if self.mapping is not None:
+            self.mapping.close()
+            self.mapping = None
 
         return 0
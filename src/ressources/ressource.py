@@ -13,6 +13,7 @@ Classes
 
 # built-in imports
 import typing
+import hashlib
 # pip imports
 # local imports
 
@@ -25,22 +26,32 @@ class Ressource():
     Class to/that # TODO: set docstring
 
     Attributes:
-        # TODO: set attributes
+        name (`str`): Name of the ressource, used to share it between every user.
+        initialized (`bool`): If `__init__` already ran for this shared ressource.
+        ready (`bool`): If the ressource is uploaded to the GPU and can be used for rendering.
+        sort_id (`int`): Small id (1 to 4095, unique among alive ressources of a type in most scenes) used in render sort keys.
     Methods
     -------
     - `getName` (classmethod)
+    - `hashSource` (staticmethod)
+    - `isAlive`
+    - `upload`
+    - `uploadShared`
+    - `uploadLocal`
     - `clean`
     """
     @classmethod
     def getName(
             cls: type[typing.Self],
             /,
+            *args: typing.Any,
             **kwargs: typing.Any
             ) -> str:
         """
         Method to/that # TODO: set docstring
 
         Args:
+            *args (`typing.Any`): positional args to get name of ressource.
             **kwargs (`typing.Any`): args to get name of ressource.
         Returns:
             `str`: # TODO: set return
@@ -49,7 +60,7 @@ class Ressource():
         """
         name: str = ""
 
-        for _, value in sorted(kwargs.items()):
+        for value in (*args, *(value for _, value in sorted(kwargs.items()))):
             if not isinstance(value, str):
                 continue
             name += f"{value} / "
@@ -62,6 +73,24 @@ class Ressource():
 
         return name
 
+    @staticmethod
+    def hashSource(
+            src: str,
+            /
+            ) -> bytes:
+        """
+        Method that hashes the content of a source file.
+
+        Args:
+            src (`str`): Absolute path for the file.
+        Returns:
+            `bytes`: 16 bytes digest of the content.
+        Raises:
+            `OSError`: if the file can't be read.
+        """
+        with open(src, "rb") as file:
+            return hashlib.file_digest(file, lambda: hashlib.blake2b(digest_size=16)).digest()
+
     def __init_subclass__(
             cls: type[typing.Self],
             /
@@ -76,27 +105,34 @@ class Ressource():
 
         cls.__ressources: dict[str, typing.Self] = {}
         cls.__no_name_nb: int = 0
+        cls.__created_nb: int = 0
 
     def __new__(
             cls: type[typing.Self],
             /,
-            *_,
+            *args: typing.Any,
             **kwargs: typing.Any
             ) -> typing.Self:
         """
         Method to/that # TODO: set docstring
 
         Args:
+            *args (`typing.Any`): positional args to get name of ressource.
             **kwargs (`typing.Any`): args to get name of ressource.
         Returns:
             `typing.Self`: # TODO: set return
         Raises:
             # TODO: set exceptions
         """
-        name: str = cls.getName(**kwargs)
+        name: str = cls.getName(*args, **kwargs)
 
         if name not in cls.__ressources:
-            cls.__ressources[name] = super().__new__(cls)
+            ressource: typing.Self = super().__new__(cls)
+            ressource.name = name
+            ressource.initialized = False
+            ressource.sort_id = cls.__created_nb % 4095 + 1
+            cls.__created_nb += 1
+            cls.__ressources[name] = ressource
         else:
             cls.__ressources[name].__alived += 1
 
@@ -110,13 +146,17 @@ class Ressource():
         """
         Method to/that # TODO: set docstring
 
+        Subclasses must return early when `initialized` is already True,
+        because a shared ressource gets `__init__` called again for every new user.
+
         Args:
             **kwargs (`typing.Any`): args to get name of ressource.
         Raises:
             # TODO: set exceptions
         """
-        self.__name: str = Ressource.getName(**kwargs)
         self.__alived: int = 1
+        self.initialized: bool = True
+        self.ready: bool = False
 
     def __del__(
             self: typing.Self,
@@ -130,6 +170,69 @@ class Ressource():
         """
         self.clean()
 
+    def isAlive(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        Method that tells if the ressource is still used by someone.
+
+        Returns:
+            `bool`: False once every user cleaned it.
+        """
+        return self.__class__.__ressources.get(self.name) is self
+
+    def upload(
+            self: typing.Self,
+            data: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that sends loaded data to the GPU from the render thread.
+
+        Args:
+            data (`typing.Any`): Data returned by the loading job of the ressource.
+        Raises:
+            # TODO: set exceptions
+        """
+        self.uploadShared(data)
+        self.uploadLocal(data)
+
+    def uploadShared(
+            self: typing.Self,
+            data: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that creates the OpenGL objects shared between contexts (buffers, textures, programs).
+
+        It can run on the upload worker thread, so it must not touch objects owned by a single context (like VAOs).
+
+        Args:
+            data (`typing.Any`): Data returned by the loading job of the ressource.
+        Raises:
+            # TODO: set exceptions
+        """
+        return
+
+    def uploadLocal(
+            self: typing.Self,
+            data: typing.Any,
+            /
+            ) -> None:
+        """
+        Method that creates the OpenGL objects owned by the render context and marks the ressource ready.
+
+        Always runs on the render thread, after `uploadShared` is complete on the GPU.
+        Subclasses do their OpenGL work then call this method.
+
+        Args:
+            data (`typing.Any`): Data returned by the loading job of the ressource.
+        Raises:
+            # TODO: set exceptions
+        """
+        self.ready = True
+
     def clean(
             self: typing.Self,
             /
@@ -142,12 +245,12 @@ class Ressource():
         Raises:
             # TODO: set exceptions
         """
-        if self.__name in self.__class__.__ressources:
-            self.__class__.__ressources[self.__name].__alived -= 1
+        if self.__class__.__ressources.get(self.name) is self:
+            self.__alived -= 1
 
-            if self.__class__.__ressources[self.__name].__alived > 0:
+            if self.__alived > 0:
                 return 1
 
-            self.__class__.__ressources.pop(self.__name)
+            self.__class__.__ressources.pop(self.name)
 
         return 0
@@ -15,9 +15,10 @@ Classes
 import os
 import typing
 # pip imports
+import pyglm.glm as glm
 import OpenGL.GL as GL  # type: ignore
 # local imports
-from . import utils, Ressource
+from . import utils, glstate, profiler, Ressource, LOADER
 
 
 class Shader(Ressource):
@@ -29,14 +30,50 @@ class Shader(Ressource):
     Class to/that # TODO: set docstring
 
     Attributes:
-        # TODO: set attributes
+        program (`typing.Any`): OpenGL program, None until the shader is uploaded.
+        uniforms (`dict[str, tuple[int, int]]`): Location and OpenGL type of every active uniform, by name.
     Methods
     -------
+    - `loadSources` (staticmethod)
     - `compileShader` (staticmethod)
+    - `uploadShared`
+    - `introspectUniforms`
+    - `setInt`
+    - `setFloat`
+    - `setVec3`
+    - `setMat3`
+    - `setMat4`
+    - `clean`
     """
     @staticmethod
+    def loadSources(
+            vert_src: str,
+            /,
+            *frag_srcs: str
+            ) -> tuple[str, str]:
+        """
+        Method that reads the sources of a vertex and a fragment shader.
+
+        Args:
+            vert_src (`str`): Absolute path for vertex shader.
+            *frag_srcs (`str`): Absolute paths for fragment shader, the first one that exists is read.
+        Returns:
+            `tuple[str,str]`: text of vertex shader and text of fragment shader.
+        Raises:
+            `OSError`: if a file can't be read.
+        """
+        with open(vert_src, "r") as file:
+            vert_text: str = file.read()
+        frag_src: str = next((path for path in frag_srcs if os.path.exists(path)), frag_srcs[0])
+        with open(frag_src, "r") as file:
+            frag_text: str = file.read()
+
+        return vert_text, frag_text
+
+    @staticmethod
+    @profiler.PROFILER.profiled("shader.compile")
     def compileShader(
-            src: str,
+            text: str,
             type: typing.Any,
             /
             ) -> typing.Any:
@@ -44,15 +81,13 @@ class Shader(Ressource):
         Method to/that # TODO: set docstring
 
         Args:
-            src (`str`): Absolute path for shader.
+            text (`str`): Source code of shader.
             type (`typing.Any`): Type of shader to compile.
         Returns:
             `typing.Any`: # TODO: set return
         Raises:
             # TODO: set exceptions
         """
-        text: str = open(src, "r").read()
-
         s: typing.Any = GL.glCreateShader(type)
         GL.glShaderSource(s, text)
         GL.glCompileShader(s)
@@ -71,27 +106,213 @@ class Shader(Ressource):
         """
         Method to/that # TODO: set docstring
 
+        Instanced and indirect variants without their own fragment shader share the one of
+        the instanced variant, then the one of the base shader (a variant only changes how
+        per-shape data reaches the vertex shader).
+
         Args:
             shader_name (`str`): File name of the shader (without extension and relative to `shaders` folder).
         Raises:
             # TODO: set exceptions
         """
+        if self.initialized:
+            return
+
         super().__init__(shader_name=shader_name)
 
-        shader_path: str = os.path.join(utils.ABS_PATH.shaders, shader_name)
-        vert_shader = self.__class__.compileShader(shader_path + utils.EXTENSIONS.shader_vert, GL.GL_VERTEX_SHADER)
-        frag_shader = self.__class__.compileShader(shader_path + utils.EXTENSIONS.shader_frag, GL.GL_FRAGMENT_SHADER)
+        self.program: typing.Any = None
+        self.uniforms: dict[str, tuple[int, int]] = {}
+        self.__values: dict[int, typing.Any] = {}
+
+        frag_names: list[str] = [shader_name]
+        if shader_name.endswith(utils.INDIRECT_SUFFIX):
+            frag_names.append(shader_name.removesuffix(utils.INDIRECT_SUFFIX) + utils.INSTANCED_SUFFIX)
+        if frag_names[-1].endswith(utils.INSTANCED_SUFFIX):
+            frag_names.append(frag_names[-1].removesuffix(utils.INSTANCED_SUFFIX))
+
+        LOADER.request(
+            self,
+            self.__class__.loadSources,
+            os.path.join(utils.ABS_PATH.shaders, shader_name + utils.EXTENSIONS.shader_vert),
+            *(os.path.join(utils.ABS_PATH.shaders, name + utils.EXTENSIONS.shader_frag) for name in frag_names)
+        )
+
+    @typing.override
+    def uploadShared(
+            self: typing.Self,
+            data: tuple[str, str],
+            /
+            ) -> None:
+        """
+        Method that compiles and links the program of the shader.
+
+        Args:
+            data (`tuple[str,str]`): Result of `loadSources`.
+        Raises:
+            `Exception`: if compilation or linking failed.
+        """
+        vert_shader = self.__class__.compileShader(data[0], GL.GL_VERTEX_SHADER)
+        frag_shader = self.__class__.compileShader(data[1], GL.GL_FRAGMENT_SHADER)
 
         if not (vert_shader and frag_shader):
             raise Exception("Shader compilation failed.")
 
-        self.program: typing.Any = GL.glCreateProgram()
-        GL.glAttachShader(self.program, vert_shader)
-        GL.glAttachShader(self.program, frag_shader)
-        GL.glLinkProgram(self.program)
+        program: typing.Any = GL.glCreateProgram()
+        GL.glAttachShader(program, vert_shader)
+        GL.glAttachShader(program, frag_shader)
+        with profiler.PROFILER.zone("shader.link"):
+            GL.glLinkProgram(program)
+            linked: bool = bool(GL.glGetProgramiv(program, GL.GL_LINK_STATUS))
+        GL.glDeleteShader(vert_shader)
+        GL.glDeleteShader(frag_shader)
+
+        if not linked:
+            error: typing.Any = GL.glGetProgramInfoLog(program)
+            GL.glDeleteProgram(program)
+            raise Exception(error)
+
+        self.program = program
+        self.introspectUniforms()
+
+        camera_block: int = GL.glGetUniformBlockIndex(program, "Camera")
+        if camera_block != GL.GL_INVALID_INDEX:
+            GL.glUniformBlockBinding(program, camera_block, utils.CAMERA_UBO_BINDING)
+
+        super().uploadShared(data)
+
+    def introspectUniforms(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that reads the location and type of every active uniform of the linked program.
+        """
+        self.uniforms = {}
+        self.__values = {}
+
+        for i in range(GL.glGetProgramiv(self.program, GL.GL_ACTIVE_UNIFORMS)):
+            name, _, type = GL.glGetActiveUniform(self.program, i)
+            # PyOpenGL gives a NUL padded char array
+            if not isinstance(name, (str, bytes)):
+                name = name.tobytes()
+            if isinstance(name, bytes):
+                name = name.split(b"\0", 1)[0].decode()
+            name = name.removesuffix("[0]")
+
+            location: int = GL.glGetUniformLocation(self.program, name)
+            if location >= 0:
+                self.uniforms[name] = (location, int(type))
+
+    def __changed(
+            self: typing.Self,
+            name: str,
+            value: typing.Any,
+            /
+            ) -> int:
+        """
+        Method that finds the location of a uniform and remembers `value` if it isn't the last one uploaded.
+
+        Args:
+            name (`str`): Name of the uniform.
+            value (`typing.Any`): Value to upload (a copy is stored, so later in-place changes are seen).
+        Returns:
+            `int`: location to upload to, or -1 if the uniform isn't active or already has this value.
+        """
+        uniform: tuple[int, int] | None = self.uniforms.get(name)
+        if uniform is None:
+            return -1
+
+        location: int = uniform[0]
+        if self.__values.get(location) == value:
+            return -1
+
+        self.__values[location] = type(value)(value)
+        return location
+
+    def setInt(
+            self: typing.Self,
+            name: str,
+            value: int,
+            /
+            ) -> None:
+        """
+        Method that sets an `int`/`sampler` uniform of the program in use, skipped if unchanged.
+
+        Args:
+            name (`str`): Name of the uniform.
+            value (`int`): Value of the uniform.
+        """
+        location: int = self.__changed(name, value)
+        if location >= 0:
+            GL.glUniform1i(location, value)
+
+    def setFloat(
+            self: typing.Self,
+            name: str,
+            value: float,
+            /
+            ) -> None:
+        """
+        Method that sets a `float` uniform of the program in use, skipped if unchanged.
 
-        if not GL.glGetProgramiv(self.program, GL.GL_LINK_STATUS):
-            raise Exception(GL.glGetProgramInfoLog(self.program))
+        Args:
+            name (`str`): Name of the uniform.
+            value (`float`): Value of the uniform.
+        """
+        location: int = self.__changed(name, value)
+        if location >= 0:
+            GL.glUniform1f(location, value)
+
+    def setVec3(
+            self: typing.Self,
+            name: str,
+            value: glm.vec3,
+            /
+            ) -> None:
+        """
+        Method that sets a `vec3` uniform of the program in use, skipped if unchanged.
+
+        Args:
+            name (`str`): Name of the uniform.
+            value (`glm.vec3`): Value of the uniform.
+        """
+        location: int = self.__changed(name, value)
+        if location >= 0:
+            GL.glUniform3fv(location, 1, glm.value_ptr(value))
+
+    def setMat3(
+            self: typing.Self,
+            name: str,
+            value: glm.mat3x3,
+            /
+            ) -> None:
+        """
+        Method that sets a `mat3` uniform of the program in use, skipped if unchanged.
+
+        Args:
+            name (`str`): Name of the uniform.
+            value (`glm.mat3x3`): Value of the uniform.
+        """
+        location: int = self.__changed(name, value)
+        if location >= 0:
+            GL.glUniformMatrix3fv(location, 1, GL.GL_FALSE, glm.value_ptr(value))
+
+    def setMat4(
+            self: typing.Self,
+            name: str,
+            value: glm.mat4x4,
+            /
+            ) -> None:
+        """
+        Method that sets a `mat4` uniform of the program in use, skipped if unchanged.
+
+        Args:
+            name (`str`): Name of the uniform.
+            value (`glm.mat4x4`): Value of the uniform.
+        """
+        location: int = self.__changed(name, value)
+        if location >= 0:
+            GL.glUniformMatrix4fv(location, 1, GL.GL_FALSE, glm.value_ptr(value))
 
     @typing.override
     def clean(
@@ -109,8 +330,9 @@ class Shader(Ressource):
         if super().clean():
             return 1
 
-        GL.glUseProgram(0)
-        GL.glDeleteProgram(self.program)
-        self.program = None
+        if self.program is not None:
+            glstate.STATE.deleteProgram(self.program)
+            self.program = None
+        self.ready = False
 
         return 0
@@ -14,11 +14,17 @@ Classes
 # built-in imports
 import os
 import typing
+import struct
+import hashlib
+import mmap
+import tempfile
 # pip imports
+import numpy as np
 import OpenGL.GL as GL  # type: ignore
+import OpenGL.GL.EXT.texture_compression_s3tc as S3TC  # type: ignore
 import PIL.Image
 # local imports
-from . import utils, Ressource
+from . import utils, glstate, Ressource, LOADER, TextureCook
 
 
 class Texture(Ressource):
@@ -33,8 +39,48 @@ class Texture(Ressource):
         # TODO: set attributes
     Methods
     -------
+    - `getPlaceholder` (classmethod)
     - `loadTexture` (staticmethod)
+    - `readCache` (staticmethod)
+    - `writeCache` (staticmethod)
+    - `loadCompiled` (staticmethod)
+    - `uploadShared`
+    - `uploadLocal`
+    - `clean`
     """
+    __placeholder: typing.Any = None
+
+    # magic, version, path hash, mtime_ns, size, content hash, format, width, height, nb levels
+    __CACHE_HEADER: struct.Struct = struct.Struct("<8sI16sqq16sIIII")
+    # width, height, offset, size
+    __CACHE_LEVEL: struct.Struct = struct.Struct("<IIQQ")
+    __CACHE_MAGIC: bytes = b"PYGLTEX\0"
+    __CACHE_VERSION: int = 1
+    __GL_FORMATS: dict[int, typing.Any] = {
+        TextureCook.FORMAT_BC1: S3TC.GL_COMPRESSED_RGB_S3TC_DXT1_EXT,
+        TextureCook.FORMAT_BC3: S3TC.GL_COMPRESSED_RGBA_S3TC_DXT5_EXT,
+    }
+
+    @classmethod
+    def getPlaceholder(
+            cls: type[typing.Self],
+            /
+            ) -> typing.Any:
+        """
+        Method that gives the 1x1 white texture bound while a texture is still loading.
+
+        Returns:
+            `typing.Any`: id of the placeholder texture.
+        """
+        if Texture.__placeholder is None:
+            Texture.__placeholder = GL.glGenTextures(1)
+            glstate.STATE.bindTexture(GL.GL_TEXTURE_2D, Texture.__placeholder, 0)
+            GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA, 1, 1, 0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, b"\xff\xff\xff\xff")
+            GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST)
+            GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST)
+
+        return Texture.__placeholder
+
     @staticmethod
     def loadTexture(
             src: str,
@@ -53,6 +99,162 @@ class Texture(Ressource):
         image: PIL.Image.Image = PIL.Image.open(src)
         return image.width, image.height, image.convert("RGBA").tobytes()
 
+    @staticmethod
+    def readCache(
+            src: str,
+            cache: str,
+            compress: bool,
+            /
+            ) -> tuple[int, list[tuple[int, int, np.ndarray]]] | None:
+        """
+        Method that memory-maps the cooked container of a texture if it is still valid for its source.
+
+        The cache is valid if it was cooked with the same compression setting and if the source path, mtime and size
+        are the same as when it was written, or if the content of the source still has the same hash: then the container
+        is written again with the new path, mtime and size, so the next launches don't hash the source again.
+
+        Args:
+            src (`str`): Absolute path for texture source.
+            cache (`str`): Absolute path for the cooked container.
+            compress (`bool`): If block compression is allowed.
+        Returns:
+            `tuple[int,list[tuple[int,int,np.ndarray]]] | None`: the format and, for each level, its width, height and data (views on the mapping),
+            or None on a cache miss.
+        """
+        try:
+            stat: os.stat_result = os.stat(src)
+            with open(cache, "rb") as file:
+                mapping: mmap.mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        header: struct.Struct = Texture.__CACHE_HEADER
+        level_header: struct.Struct = Texture.__CACHE_LEVEL
+        if len(mapping) < header.size:
+            return None
+
+        magic, version, path_hash, mtime, size, content_hash, fmt, _, _, nb_levels = header.unpack_from(mapping)
+        valid: bool = (
+            magic == Texture.__CACHE_MAGIC
+            and version == Texture.__CACHE_VERSION
+            and (fmt != TextureCook.FORMAT_RGBA8) == compress
+            and len(mapping) >= header.size + nb_levels * level_header.size
+        )
+
+        moved: bool = valid and (path_hash, mtime, size) != (hashlib.blake2b(src.encode(), digest_size=16).digest(), stat.st_mtime_ns, stat.st_size)
+        if moved:
+            valid = content_hash == Texture.hashSource(src)
+
+        if not valid:
+            return None
+
+        levels: list[tuple[int, int, np.ndarray]] = []
+        for i in range(nb_levels):
+            width, height, offset, length = level_header.unpack_from(mapping, header.size + i * level_header.size)
+            if offset + length > len(mapping):
+                return None
+            levels.append((width, height, np.frombuffer(mapping, np.uint8, length, offset)))
+
+        if moved:
+            try:
+                Texture.writeCache(src, cache, stat, content_hash, fmt, levels)
+            except OSError as e:
+                print(f"Warning: could not update texture cache '{cache}': {e}")
+
+        return fmt, levels
+
+    @staticmethod
+    def writeCache(
+            src: str,
+            cache: str,
+            stat: os.stat_result,
+            content_hash: bytes,
+            fmt: int,
+            levels: list[tuple[int, int, bytes]],
+            /
+            ) -> None:
+        """
+        Method that atomically writes the cooked container of a texture next to its source.
+
+        Args:
+            src (`str`): Absolute path for texture source.
+            cache (`str`): Absolute path for the cooked container.
+            stat (`os.stat_result`): Stat of the source taken before it was decoded.
+            content_hash (`bytes`): Hash of the source taken before it was decoded.
+            fmt (`int`): Format of the levels, one of the `TextureCook.FORMAT_*` attributes.
+            levels (`list[tuple[int,int,bytes]]`): For each level, its width, height and data.
+        Raises:
+            `OSError`: if the container can't be written.
+        """
+        header: bytes = Texture.__CACHE_HEADER.pack(
+            Texture.__CACHE_MAGIC,
+            Texture.__CACHE_VERSION,
+            hashlib.blake2b(src.encode(), digest_size=16).digest(),
+            stat.st_mtime_ns,
+            stat.st_size,
+            content_hash,
+            fmt,
+            levels[0][0],
+            levels[0][1],
+            len(levels)
+        )
+
+        offset: int = len(header) + len(levels) * Texture.__CACHE_LEVEL.size
+        table: list[bytes] = []
+        for width, height, data in levels:
+            offset += -offset % 16
+            table.append(Texture.__CACHE_LEVEL.pack(width, height, offset, len(data)))
+            offset += len(data)
+
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(cache), suffix=".tmp", dir=os.path.dirname(cache))
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(header)
+                file.write(b"".join(table))
+                for _, _, data in levels:
+                    file.write(b"\0" * (-file.tell() % 16))
+                    file.write(data)
+            # temporary files are private (0600), caches are readable like any other file
+            os.chmod(tmp, utils.CACHE_MODE)
+            os.replace(tmp, cache)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    @staticmethod
+    def loadCompiled(
+            src: str,
+            compress: bool,
+            /
+            ) -> tuple[int, list[tuple[int, int, typing.Any]]]:
+        """
+        Method that loads a texture from its cooked container, or decodes and cooks it and writes the container on a cache miss.
+
+        Args:
+            src (`str`): Absolute path for texture source.
+            compress (`bool`): If block compression is allowed.
+        Returns:
+            `tuple[int,list[tuple[int,int,typing.Any]]]`: the format and, for each level, its width, height and data.
+        Raises:
+            `OSError`: if the source can't be read.
+        """
+        cache: str = os.path.splitext(src)[0] + utils.EXTENSIONS.texture_cache
+
+        cached = Texture.readCache(src, cache, compress)
+        if cached is not None:
+            return cached
+
+        stat: os.stat_result = os.stat(src)
+        content_hash: bytes = Texture.hashSource(src)
+        fmt, levels = TextureCook.cook(*Texture.loadTexture(src), compress)
+
+        try:
+            Texture.writeCache(src, cache, stat, content_hash, fmt, levels)
+        except OSError as e:
+            print(f"Warning: could not write texture cache '{cache}': {e}")
+
+        return fmt, levels
+
     def __init__(
             self: typing.Self,
             texture_name: str = "",
@@ -66,22 +268,72 @@ class Texture(Ressource):
         Raises:
             # TODO: set exceptions
         """
+        if self.initialized:
+            return
+
         super().__init__(texture_name=texture_name)
 
-        width, height, data = Texture.loadTexture(os.path.join(utils.ABS_PATH.textures, texture_name + utils.EXTENSIONS.texture))
+        self.id: typing.Any = Texture.getPlaceholder()
+        self.__uploaded_id: typing.Any = None
+
+        LOADER.request(self, Texture.loadCompiled, os.path.join(utils.ABS_PATH.textures, texture_name + utils.EXTENSIONS.texture), utils.TEXTURE_COMPRESSION)
+
+    @typing.override
+    def uploadShared(
+            self: typing.Self,
+            data: tuple[int, list[tuple[int, int, typing.Any]]],
+            /
+            ) -> None:
+        """
+        Method that creates the OpenGL texture and uploads every cooked mip level.
+
+        Args:
+            data (`tuple[int,list[tuple[int,int,typing.Any]]]`): Result of `loadCompiled`.
+        Raises:
+            # TODO: set exceptions
+        """
+        fmt, levels = data
+
+        texture_id: typing.Any = GL.glGenTextures(1)
 
-        self.id: typing.Any = GL.glGenTextures(1)
+        glstate.STATE.bindTexture(GL.GL_TEXTURE_2D, texture_id, 0)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
 
-        GL.glBindTexture(GL.GL_TEXTURE_2D, self.id)
+        for i, (width, height, pixels) in enumerate(levels):
+            if fmt == TextureCook.FORMAT_RGBA8:
+                GL.glTexImage2D(GL.GL_TEXTURE_2D, i, GL.GL_RGBA, width, height, 0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, pixels)
+            else:
+                GL.glCompressedTexImage2D(GL.GL_TEXTURE_2D, i, Texture.__GL_FORMATS[fmt], width, height, 0, pixels)
 
-        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, GL.GL_RGBA, width, height, 0, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, data)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 4)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_BASE_LEVEL, 0)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAX_LEVEL, len(levels) - 1)
         GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_REPEAT)
         GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_REPEAT)
         GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR_MIPMAP_LINEAR)
         GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
-        GL.glGenerateMipmap(GL.GL_TEXTURE_2D)
 
-        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        self.__uploaded_id = texture_id
+
+        super().uploadShared(data)
+
+    @typing.override
+    def uploadLocal(
+            self: typing.Self,
+            data: tuple[int, list[tuple[int, int, typing.Any]]],
+            /
+            ) -> None:
+        """
+        Method that replaces the placeholder by the uploaded texture.
+
+        Args:
+            data (`tuple[int,list[tuple[int,int,typing.Any]]]`): Result of `loadCompiled`.
+        Raises:
+            # TODO: set exceptions
+        """
+        self.id = self.__uploaded_id
+
+        super().uploadLocal(data)
 
     def clean(
             self: typing.Self,
@@ -98,6 +350,10 @@ class Texture(Ressource):
         if super().clean():
             return 1
 
-        GL.glDeleteTextures(1, (self.id,))
+        if self.__uploaded_id is not None:
+            glstate.STATE.deleteTexture(self.__uploaded_id)
+            self.__uploaded_id = None
+        self.id = Texture.getPlaceholder()
+        self.ready = False
 
         return 0
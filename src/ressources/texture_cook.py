@@ -0,0 +1,321 @@
+"""
+texture_cook module
+===================
+Package: `ressources`
+
+Module that cooks decoded images into GPU ready mip chains, optionally compressed in BC1/BC3 blocks.
+
+Classes
+-------
+- `TextureCook`
+"""
+
+
+# built-in imports
+import typing
+# pip imports
+import numpy as np
+# local imports
+
+
+class TextureCook:
+    """
+    TextureCook class
+    =================
+
+    Class that groups the CPU steps turning RGBA8 pixels into the levels uploaded by `Texture`.
+
+    Attributes:
+        FORMAT_RGBA8 (`int`): Uncompressed 4 bytes per pixel.
+        FORMAT_BC1 (`int`): BC1 (DXT1) blocks, 8 bytes per 4x4 block, opaque only.
+        FORMAT_BC3 (`int`): BC3 (DXT5) blocks, 16 bytes per 4x4 block.
+    Methods
+    -------
+    - `buildMipChain` (staticmethod)
+    - `chooseFormat` (staticmethod)
+    - `encodeBC1` (staticmethod)
+    - `encodeBC3` (staticmethod)
+    - `cook` (staticmethod)
+    """
+    FORMAT_RGBA8: int = 0
+    FORMAT_BC1: int = 1
+    FORMAT_BC3: int = 3
+
+    __BLOCKS_PER_CHUNK: int = 1 << 15
+
+    @staticmethod
+    def __toLinear(
+            srgb: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that converts sRGB encoded RGBA8 pixels to linear floats, alpha stays linear.
+
+        Args:
+            srgb (`np.ndarray`): `uint8` pixels of shape `(height, width, 4)`.
+        Returns:
+            `np.ndarray`: `float32` pixels of shape `(height, width, 4)` in `[0, 1]`.
+        """
+        values: np.ndarray = np.arange(256, dtype=np.float32) / 255
+        lut: np.ndarray = np.where(values <= 0.04045, values / 12.92, ((values + 0.055) / 1.055) ** 2.4).astype(np.float32)
+
+        linear: np.ndarray = np.empty(srgb.shape, np.float32)
+        linear[..., :3] = lut[srgb[..., :3]]
+        linear[..., 3] = values[srgb[..., 3]]
+
+        return linear
+
+    @staticmethod
+    def __toSrgb(
+            linear: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that converts linear float pixels back to sRGB encoded RGBA8, alpha stays linear.
+
+        Args:
+            linear (`np.ndarray`): `float32` pixels of shape `(height, width, 4)` in `[0, 1]`.
+        Returns:
+            `np.ndarray`: `uint8` pixels of shape `(height, width, 4)`.
+        """
+        srgb: np.ndarray = np.empty(linear.shape, np.float32)
+        rgb: np.ndarray = np.clip(linear[..., :3], 0, 1)
+        srgb[..., :3] = np.where(rgb <= 0.0031308, rgb * 12.92, 1.055 * rgb ** (1 / 2.4) - 0.055)
+        srgb[..., 3] = np.clip(linear[..., 3], 0, 1)
+
+        return np.rint(srgb * 255).astype(np.uint8)
+
+    @staticmethod
+    def buildMipChain(
+            pixels: np.ndarray,
+            /
+            ) -> list[np.ndarray]:
+        """
+        Method that computes every mip level down to 1x1 with a gamma-correct 2x2 box filter.
+
+        Args:
+            pixels (`np.ndarray`): `uint8` sRGB pixels of shape `(height, width, 4)`.
+        Returns:
+            `list[np.ndarray]`: `uint8` levels, the first one is `pixels`.
+        """
+        levels: list[np.ndarray] = [pixels]
+        linear: np.ndarray = TextureCook.__toLinear(pixels)
+
+        while linear.shape[0] > 1 or linear.shape[1] > 1:
+            for axis in (0, 1):
+                size: int = linear.shape[axis]
+                if size == 1:
+                    continue
+                linear = linear.take(np.arange(size // 2 * 2), axis)
+                linear = (linear.take(np.arange(0, linear.shape[axis], 2), axis) + linear.take(np.arange(1, linear.shape[axis], 2), axis)) * 0.5
+
+            levels.append(TextureCook.__toSrgb(linear))
+
+        return levels
+
+    @staticmethod
+    def chooseFormat(
+            pixels: np.ndarray,
+            compress: bool,
+            /
+            ) -> int:
+        """
+        Method that chooses the storage format of an image.
+
+        Args:
+            pixels (`np.ndarray`): `uint8` pixels of shape `(height, width, 4)`.
+            compress (`bool`): If block compression is allowed.
+        Returns:
+            `int`: one of the `FORMAT_*` attributes.
+        """
+        if not compress:
+            return TextureCook.FORMAT_RGBA8
+        if (pixels[..., 3] == 255).all():
+            return TextureCook.FORMAT_BC1
+        return TextureCook.FORMAT_BC3
+
+    @staticmethod
+    def __toBlocks(
+            pixels: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that splits an image in 4x4 blocks, edges are repeated when the size isn't a multiple of 4.
+
+        Args:
+            pixels (`np.ndarray`): pixels of shape `(height, width, channels)`.
+        Returns:
+            `np.ndarray`: blocks of shape `(nb_blocks, 16, channels)`, in row major order.
+        """
+        height, width, channels = pixels.shape
+        padded: np.ndarray = np.pad(pixels, ((0, -height % 4), (0, -width % 4), (0, 0)), mode="edge")
+        rows: int = padded.shape[0] // 4
+        columns: int = padded.shape[1] // 4
+
+        return padded.reshape(rows, 4, columns, 4, channels).swapaxes(1, 2).reshape(rows * columns, 16, channels)
+
+    @staticmethod
+    def __encodeColors(
+            blocks: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that encodes the color part of BC1/BC3 blocks, always in 4 colors mode.
+
+        Endpoints are taken on the principal axis of each block colors.
+
+        Args:
+            blocks (`np.ndarray`): `uint8` RGB blocks of shape `(nb_blocks, 16, 3)`.
+        Returns:
+            `np.ndarray`: `uint16` pairs of shape `(nb_blocks, 4)` (endpoint 0, endpoint 1, low and high index bits).
+        """
+        colors: np.ndarray = blocks.astype(np.float32)
+        mean: np.ndarray = colors.mean(axis=1, keepdims=True)
+        centered: np.ndarray = colors - mean
+
+        covariance: np.ndarray = np.einsum("nki,nkj->nij", centered, centered)
+        axis: np.ndarray = np.ones((len(blocks), 3), np.float32)
+        for _ in range(4):
+            axis = np.einsum("nij,nj->ni", covariance, axis)
+            axis /= np.maximum(np.abs(axis).max(axis=1, keepdims=True), 1e-6)
+
+        projection: np.ndarray = np.einsum("nki,ni->nk", centered, axis)
+        axis_norm: np.ndarray = np.maximum((axis * axis).sum(axis=1), 1e-6)
+        high: np.ndarray = mean[:, 0] + axis * (projection.max(axis=1) / axis_norm)[:, None]
+        low: np.ndarray = mean[:, 0] + axis * (projection.min(axis=1) / axis_norm)[:, None]
+
+        scale: np.ndarray = np.array([31, 63, 31], np.float32) / 255
+        quant_high: np.ndarray = np.rint(np.clip(high, 0, 255) * scale).astype(np.uint16)
+        quant_low: np.ndarray = np.rint(np.clip(low, 0, 255) * scale).astype(np.uint16)
+        color0: np.ndarray = (quant_high[:, 0] << 11) | (quant_high[:, 1] << 5) | quant_high[:, 2]
+        color1: np.ndarray = (quant_low[:, 0] << 11) | (quant_low[:, 1] << 5) | quant_low[:, 2]
+
+        swap: np.ndarray = color0 < color1
+        color0, color1 = np.where(swap, color1, color0), np.where(swap, color0, color1)
+
+        endpoints: np.ndarray = np.stack((color0, color1), axis=1).astype(np.uint32)
+        red: np.ndarray = endpoints >> 11
+        green: np.ndarray = (endpoints >> 5) & 63
+        blue: np.ndarray = endpoints & 31
+        expanded: np.ndarray = np.stack(((red << 3) | (red >> 2), (green << 2) | (green >> 4), (blue << 3) | (blue >> 2)), axis=2).astype(np.float32)
+
+        palette: np.ndarray = np.stack((
+            expanded[:, 0],
+            expanded[:, 1],
+            (2 * expanded[:, 0] + expanded[:, 1]) / 3,
+            (expanded[:, 0] + 2 * expanded[:, 1]) / 3
+        ), axis=1)
+        distances: np.ndarray = ((colors[:, :, None, :] - palette[:, None, :, :]) ** 2).sum(axis=3)
+        indices: np.ndarray = distances.argmin(axis=2).astype(np.uint32)
+        indices[color0 == color1] = 0
+
+        bits: np.ndarray = (indices << (2 * np.arange(16, dtype=np.uint32))).sum(axis=1, dtype=np.uint32)
+
+        return np.stack((color0, color1, (bits & 0xFFFF).astype(np.uint16), (bits >> 16).astype(np.uint16)), axis=1)
+
+    @staticmethod
+    def __encodeAlphas(
+            alphas: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that encodes the alpha part of BC3 blocks, always in 8 alphas mode.
+
+        Args:
+            alphas (`np.ndarray`): `uint8` alpha blocks of shape `(nb_blocks, 16)`.
+        Returns:
+            `np.ndarray`: `uint8` bytes of shape `(nb_blocks, 8)` (alpha 0, alpha 1, 6 bytes of index bits).
+        """
+        alpha0: np.ndarray = alphas.max(axis=1).astype(np.float32)
+        alpha1: np.ndarray = alphas.min(axis=1).astype(np.float32)
+
+        weights: np.ndarray = np.array([0, 7, 1, 2, 3, 4, 5, 6], np.float32) / 7
+        palette: np.ndarray = np.rint(alpha0[:, None] * (1 - weights) + alpha1[:, None] * weights)
+        indices: np.ndarray = np.abs(alphas[:, :, None].astype(np.float32) - palette[:, None, :]).argmin(axis=2).astype(np.uint64)
+        indices[alpha0 == alpha1] = 0
+
+        bits: np.ndarray = (indices << (3 * np.arange(16, dtype=np.uint64))).sum(axis=1, dtype=np.uint64)
+
+        encoded: np.ndarray = np.empty((len(alphas), 8), np.uint8)
+        encoded[:, 0] = alpha0.astype(np.uint8)
+        encoded[:, 1] = alpha1.astype(np.uint8)
+        encoded[:, 2:] = bits.astype("<u8").view(np.uint8).reshape(-1, 8)[:, :6]
+
+        return encoded
+
+    @staticmethod
+    def encodeBC1(
+            pixels: np.ndarray,
+            /
+            ) -> bytes:
+        """
+        Method that encodes an opaque image in BC1 (DXT1) blocks.
+
+        Args:
+            pixels (`np.ndarray`): `uint8` pixels of shape `(height, width, 4)`.
+        Returns:
+            `bytes`: 8 bytes per 4x4 block, in row major order.
+        """
+        blocks: np.ndarray = TextureCook.__toBlocks(pixels[..., :3])
+        chunks: list[bytes] = []
+
+        for start in range(0, len(blocks), TextureCook.__BLOCKS_PER_CHUNK):
+            chunk: np.ndarray = blocks[start:start + TextureCook.__BLOCKS_PER_CHUNK]
+            chunks.append(TextureCook.__encodeColors(chunk).astype("<u2").tobytes())
+
+        return b"".join(chunks)
+
+    @staticmethod
+    def encodeBC3(
+            pixels: np.ndarray,
+            /
+            ) -> bytes:
+        """
+        Method that encodes an image in BC3 (DXT5) blocks.
+
+        Args:
+            pixels (`np.ndarray`): `uint8` pixels of shape `(height, width, 4)`.
+        Returns:
+            `bytes`: 16 bytes per 4x4 block, in row major order.
+        """
+        blocks: np.ndarray = TextureCook.__toBlocks(pixels)
+        chunks: list[bytes] = []
+
+        for start in range(0, len(blocks), TextureCook.__BLOCKS_PER_CHUNK):
+            chunk: np.ndarray = blocks[start:start + TextureCook.__BLOCKS_PER_CHUNK]
+            encoded: np.ndarray = np.empty((len(chunk), 16), np.uint8)
+            encoded[:, :8] = TextureCook.__encodeAlphas(chunk[..., 3])
+            encoded[:, 8:] = TextureCook.__encodeColors(chunk[..., :3]).astype("<u2").view(np.uint8)
+            chunks.append(encoded.tobytes())
+
+        return b"".join(chunks)
+
+    @staticmethod
+    def cook(
+            width: int,
+            height: int,
+            pixels: bytes,
+            compress: bool,
+            /
+            ) -> tuple[int, list[tuple[int, int, bytes]]]:
+        """
+        Method that builds the mip chain of an image and encodes every level.
+
+        Args:
+            width (`int`): Width of the image.
+            height (`int`): Height of the image.
+            pixels (`bytes`): RGBA8 pixels of the image.
+            compress (`bool`): If block compression is allowed.
+        Returns:
+            `tuple[int,list[tuple[int,int,bytes]]]`: the format and, for each level, its width, height and data.
+        """
+        image: np.ndarray = np.frombuffer(pixels, np.uint8).reshape(height, width, 4)
+        fmt: int = TextureCook.chooseFormat(image, compress)
+
+        encode: typing.Callable[[np.ndarray], bytes] = {
+            TextureCook.FORMAT_RGBA8: lambda level: np.ascontiguousarray(level).tobytes(),
+            TextureCook.FORMAT_BC1: TextureCook.encodeBC1,
+            TextureCook.FORMAT_BC3: TextureCook.encodeBC3,
+        }[fmt]
+
+        return fmt, [(level.shape[1], level.shape[0], encode(level)) for level in TextureCook.buildMipChain(image)]
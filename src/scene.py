@@ -16,7 +16,7 @@ import typing
 # pip imports
 import pyglm.glm as glm
 # local imports
-from . import shapes
+from . import profiler, shapes
 
 
 class Scene(shapes.Node):
@@ -26,6 +26,9 @@ class Scene(shapes.Node):
     Parent class: `shapes.Node`
 
     Class to/that # TODO: set docstring
+
+    Attributes:
+        updated (`int`): Number of transforms recomputed by the last `updateModelMatrix`.
     """
     @typing.override
     def __init__(
@@ -40,18 +43,24 @@ class Scene(shapes.Node):
         """
         super().__init__()
         self._is_scene = True
+        self.updated: int = 0
 
     @typing.override
-    def moveChildren(
+    @profiler.PROFILER.profiled("scene.update")
+    def updateModelMatrix(
             self: typing.Self,
-            rot_quat: glm.quat | None = None,
-            scale: glm.vec3 | None = None,
+            forced: bool = False,
             /
             ) -> None:
         """
-        DO NOTHING
+        Method that recomputes the world matrices of the shapes marked since the last update and of their children only,
+        and counts them in `updated`.
+
+        Args:
+            forced (`bool`): If we are forced to recalculate the model matrices of the whole scene.
         """
-        return
+        super().updateModelMatrix(forced)
+        self.updated = shapes.TRANSFORMS.updated
 
     @typing.override
     def setShader(
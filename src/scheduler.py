@@ -0,0 +1,308 @@
+"""
+scheduler module
+================
+Package: `src`
+
+Module that paces the main loop at a target frame rate and measures how long frames take.
+
+Classes
+-------
+- `FrameStats`
+- `FrameScheduler`
+"""
+
+
+# built-in imports
+import typing
+import collections.abc
+import dataclasses
+import time
+# pip imports
+import numpy as np
+# local imports
+from . import utils, Window
+
+
+@dataclasses.dataclass
+class FrameStats:
+    """
+    FrameStats class
+    ================
+
+    Class that summarizes the timing of the last frames (times in milliseconds).
+
+    Attributes:
+        frames (`int`): Number of frames since the scheduler started.
+        late (`int`): Number of frames whose work took longer than the target period.
+        fps (`float`): Mean frame rate.
+        frame_time (`float`): Mean time between the starts of two frames.
+        jitter (`float`): Standard deviation of the time between the starts of two frames.
+        worst (`float`): Longest time between the starts of two frames.
+        work_time (`float`): Mean time spent working in a frame (without the wait of the scheduler).
+    Methods
+    -------
+    - `reset`
+    - `summary`
+    """
+    frames: int = 0
+    late: int = 0
+    fps: float = 0.0
+    frame_time: float = 0.0
+    jitter: float = 0.0
+    worst: float = 0.0
+    work_time: float = 0.0
+
+    def reset(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that sets every counter back to 0.
+        """
+        self.frames = 0
+        self.late = 0
+        self.fps = 0.0
+        self.frame_time = 0.0
+        self.jitter = 0.0
+        self.worst = 0.0
+        self.work_time = 0.0
+
+    def summary(
+            self: typing.Self,
+            /
+            ) -> str:
+        """
+        Method that gives the statistics on one line (e.g. for the title of the window).
+
+        Returns:
+            `str`: the statistics.
+        """
+        return (
+            f"{self.fps:.1f} FPS, {self.frame_time:.2f} ms (±{self.jitter:.2f}, worst {self.worst:.2f}), "
+            f"work {self.work_time:.2f} ms, {self.late} late"
+        )
+
+
+class FrameScheduler:
+    """
+    FrameScheduler class
+    ====================
+
+    Class that starts frames at a target rate: `endFrame` sleeps until shortly before the deadline of the next frame,
+    then spins on the clock for the rest, so frames start on time whatever the resolution of `time.sleep`.
+    The spinning margin grows with the oversleeping observed, so it adapts to the system: it is forgotten over time
+    and kept under a quarter of the period, so one long oversleep can't turn the waits into spinning.
+
+    With `compensate`, deadlines stay on a fixed grid: after a late frame the next waits are shorter to keep
+    the mean rate, and the grid restarts from now when a frame is late by more than a whole period (no burst of frames).
+    Without it, each frame waits a whole period from its own start.
+
+    Attributes:
+        window (`Window`): The window whose swap interval is set.
+        period (`float`): Target time between the starts of two frames in seconds, 0 to not wait.
+        swap_interval (`int`): Number of screen refreshes a swap waits for.
+        spin (`float`): Minimum time in seconds spent spinning instead of sleeping before a deadline.
+        compensate (`bool`): If late frames are caught up by the next ones.
+        delta_time (`float`): Time between the starts of the last two frames in seconds.
+        stats (`FrameStats`): Statistics over the last frames, refreshed every `stats_period`.
+        stats_period (`float`): Time between two refreshes of `stats` in seconds.
+        on_stats (`collections.abc.Callable[[FrameStats], None] | None`): Function called when `stats` is refreshed.
+    Methods
+    -------
+    - `setTarget`
+    - `setSwapInterval`
+    - `beginFrame`
+    - `endFrame`
+    - `resync`
+    """
+    # maximum oversleeping added to the spinning margin, as a fraction of the period
+    __MAX_SLACK: float = 0.25
+
+    def __init__(
+            self: typing.Self,
+            window: Window,
+            target_fps: float = utils.TARGET_FPS,
+            /,
+            *,
+            swap_interval: int = utils.SWAP_INTERVAL,
+            spin: float = utils.FRAME_SPIN,
+            compensate: bool = True,
+            history: int = 240,
+            stats_period: float = 0.5,
+            on_stats: collections.abc.Callable[[FrameStats], None] | None = None
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            window (`Window`): The window whose swap interval is set, its context must be current.
+            target_fps (`float`): Target frame rate, 0 to not limit it (e.g. when vsync paces the frames).
+            swap_interval (`int`): Number of screen refreshes a swap waits for, 0 to disable vsync.
+            spin (`float`): Minimum time in seconds spent spinning instead of sleeping before a deadline.
+            compensate (`bool`): If late frames are caught up by the next ones.
+            history (`int`): Number of frames the statistics are computed on.
+            stats_period (`float`): Time between two refreshes of `stats` in seconds.
+            on_stats (`collections.abc.Callable[[FrameStats], None] | None`): Function called when `stats` is refreshed.
+        """
+        self.window: Window = window
+        self.period: float = 0.0
+        self.swap_interval: int = swap_interval
+        self.spin: float = spin
+        self.compensate: bool = compensate
+        self.delta_time: float = 0.0
+        self.stats: FrameStats = FrameStats()
+        self.stats_period: float = stats_period
+        self.on_stats: collections.abc.Callable[[FrameStats], None] | None = on_stats
+
+        self.__frame_times: np.ndarray = np.zeros(max(1, history), np.float64)
+        self.__work_times: np.ndarray = np.zeros(max(1, history), np.float64)
+        self.__recorded: int = 0
+        self.__start: float | None = None
+        self.__resynced: bool = False
+        self.__deadline: float = 0.0
+        # oversleeping of `time.sleep` observed, added to the spinning margin
+        self.__slack: float = 0.0
+        self.__last_stats: float = time.perf_counter()
+
+        self.setTarget(target_fps)
+        self.setSwapInterval(swap_interval)
+
+    def setTarget(
+            self: typing.Self,
+            target_fps: float,
+            /
+            ) -> None:
+        """
+        Method that changes the target frame rate.
+
+        Args:
+            target_fps (`float`): Target frame rate, 0 to not limit it.
+        """
+        self.period = 1 / target_fps if target_fps > 0 else 0.0
+        self.__deadline = 0.0
+
+    def setSwapInterval(
+            self: typing.Self,
+            interval: int,
+            /
+            ) -> None:
+        """
+        Method that sets the number of screen refreshes a swap waits for, must be called with the context current.
+
+        Args:
+            interval (`int`): Number of refreshes, 0 to disable vsync, -1 for adaptive vsync where supported.
+        """
+        self.swap_interval = interval
+        self.window.setSwapInterval(interval)
+
+    def beginFrame(
+            self: typing.Self,
+            /
+            ) -> float:
+        """
+        Method that starts a frame, to call at the top of the loop.
+
+        Returns:
+            `float`: the time elapsed since the start of the last frame in seconds (0 for the first one).
+        """
+        now: float = time.perf_counter()
+
+        self.delta_time = 0.0 if self.__start is None else now - self.__start
+        if self.__start is not None and not self.__resynced:
+            self.__frame_times[self.__recorded % len(self.__frame_times)] = self.delta_time
+            self.__recorded += 1
+        self.__start = now
+        self.__resynced = False
+
+        return self.delta_time
+
+    def endFrame(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that ends the work of a frame and waits until the next one must start, to call before swapping buffers.
+        """
+        now: float = time.perf_counter()
+        start: float = now if self.__start is None else self.__start
+
+        self.__work_times[self.stats.frames % len(self.__work_times)] = now - start
+        self.stats.frames += 1
+        if 0 < self.period < now - start:
+            self.stats.late += 1
+
+        if self.period > 0:
+            if not self.compensate or self.__deadline == 0.0:
+                self.__deadline = start + self.period
+            else:
+                self.__deadline += self.period
+                if now - self.__deadline > self.period:
+                    self.__deadline = now
+
+            self.__waitUntil(self.__deadline)
+
+        if time.perf_counter() - self.__last_stats >= self.stats_period:
+            self.__refreshStats()
+
+    def resync(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that restarts the timing from now, after the loop paused (e.g. waiting for events),
+        so the pause isn't counted as a frame nor caught up.
+        """
+        self.__start = time.perf_counter()
+        self.__deadline = 0.0
+        self.__resynced = True
+
+    def __waitUntil(
+            self: typing.Self,
+            deadline: float,
+            /
+            ) -> None:
+        """
+        Method that sleeps until `spin` plus the oversleeping observed before `deadline`, then spins until it.
+        When more than `spin` remains, it always sleeps at least half of the time above `spin`.
+
+        Args:
+            deadline (`float`): Value of `time.perf_counter` to wait for.
+        """
+        remaining: float = deadline - time.perf_counter()
+        # keeps the worst oversleeping, slowly forgotten even when no sleep happens
+        limit: float = self.period * FrameScheduler.__MAX_SLACK
+        self.__slack = min(self.__slack * 0.95, limit)
+
+        if remaining > self.spin:
+            asked: float = max(remaining - self.spin - self.__slack, (remaining - self.spin) / 2)
+            before: float = time.perf_counter()
+            time.sleep(asked)
+            self.__slack = min(max(time.perf_counter() - before - asked, self.__slack), limit)
+
+        while time.perf_counter() < deadline:
+            pass
+
+    def __refreshStats(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that computes `stats` from the last frames and calls `on_stats`.
+        """
+        count: int = min(self.__recorded, len(self.__frame_times))
+        self.__last_stats = time.perf_counter()
+        if count == 0:
+            return
+
+        frame_times: np.ndarray = self.__frame_times[:count]
+        work_times: np.ndarray = self.__work_times[:min(self.stats.frames, len(self.__work_times))]
+        mean: float = float(frame_times.mean())
+
+        self.stats.fps = 1 / mean if mean > 0 else 0.0
+        self.stats.frame_time = mean * 1e3
+        self.stats.jitter = float(frame_times.std()) * 1e3
+        self.stats.worst = float(frame_times.max()) * 1e3
+        self.stats.work_time = float(work_times.mean()) * 1e3
+
+        if self.on_stats is not None:
+            self.on_stats(self.stats)
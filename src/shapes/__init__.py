@@ -12,14 +12,21 @@ Modules
 -------
 - `utils` (from parent package)
 - `ressources` (from parent package)
+- `glstate` (from parent package)
+- `profiler` (from parent package)
 Classes
 -------
+- `TransformStore`
 - `Shape`
 - `Node`
+Globals
+-------
+- `TRANSFORMS`: Transform store shared by every shape.
 """
 
 
-from .. import utils, ressources, Camera  # type: ignore # noqa: F401
+from .. import utils, glstate, profiler, ressources, Camera  # type: ignore # noqa: F401
+from .transforms import TransformStore, TRANSFORMS  # type: ignore # noqa: F401
 from .shape import Shape  # type: ignore # noqa: F401
 from .node import Node  # type: ignore # noqa: F401
 from . import basics  # type: ignore # noqa: F401
@@ -16,7 +16,7 @@ import typing
 # pip imports
 import pyglm.glm as glm
 # local imports
-from . import utils, Camera, Shape
+from . import Camera, Shape, TRANSFORMS
 
 
 class Node(Shape):
@@ -33,12 +33,11 @@ class Node(Shape):
     -------
     - `addElements`
     - `subElements`
-    - `moveChildren`
+    - `mergeBounds` (staticmethod)
+    - `invalidateBound`
+    - `getTreeBound`
     - `switchLight`
-    - `setCoord`
-    - `rotate`
-    - `scale`
-    - `updateModelMatrix`
+    - `collect`
     - `render`
     - `cleanRessources`
     """
@@ -71,6 +70,9 @@ class Node(Shape):
         self.__nb_no_name: int = 0
         self._is_scene: bool = False
 
+        self.tree_bound: glm.vec4 | None = None
+        self.tree_bound_dirty: bool = True
+
         super().__init__(
             parent,
             shader_name=shader_name,
@@ -79,6 +81,7 @@ class Node(Shape):
             texture_name=texture_name,
             has_light=has_light
         )
+        TRANSFORMS.is_node[self.transform] = True
 
     def addElements(
             self: typing.Self,
@@ -102,9 +105,9 @@ class Node(Shape):
             self.children[f"no_name_{self.__nb_no_name}"] = element
             element.parent_key = f"no_name_{self.__nb_no_name}"
             element.parent = self
+            TRANSFORMS.setParent(element.transform, self.transform)
             if not self._is_scene:
                 element.switchLight(self.has_light)
-            element.to_update = True
 
             self.__nb_no_name += 1
 
@@ -119,9 +122,11 @@ class Node(Shape):
             self.children[name] = element
             element.parent_key = name
             element.parent = self
+            TRANSFORMS.setParent(element.transform, self.transform)
             if not self._is_scene:
                 element.switchLight(self.has_light)
-            element.to_update = True
+
+        self.invalidateBound()
 
     def subElements(
             self: typing.Self,
@@ -144,163 +149,120 @@ class Node(Shape):
                     if value is arg:
                         self.children.pop(key)
                         break
+            TRANSFORMS.setParent(arg.transform, -1)
 
-    def moveChildren(
-            self: typing.Self,
-            rot_quat: glm.quat | None,
-            scale: glm.vec3 | None,
+        self.invalidateBound()
+
+    @staticmethod
+    def mergeBounds(
+            first: glm.vec4 | None,
+            second: glm.vec4 | None,
             /
-            ) -> None:
+            ) -> glm.vec4 | None:
         """
-        Method to/that # TODO: set docstring
+        Method that gives the smallest sphere enclosing two bounding spheres.
 
         Args:
-            rot_quat (`glm.quat | None`): Rotation (as quaternion) applied to this node.
-            scale (`glm.vec3 | None`): Scale applied to this node.
-        Raises:
-            # TODO: set exceptions
+            first (`glm.vec4 | None`): center (xyz) and radius (w) of the first sphere, None if empty.
+            second (`glm.vec4 | None`): center (xyz) and radius (w) of the second sphere, None if empty.
+        Returns:
+            `glm.vec4 | None`: the enclosing sphere, unknown (negative radius) if one of them is unknown.
         """
-        if rot_quat is None and scale is None:
-            return
+        if first is None:
+            return second
+        if second is None:
+            return first
+        if first.w < 0 or second.w < 0:
+            return glm.vec4(0, 0, 0, -1)
 
-        for child in self.children.values():
-            if rot_quat is not None:
-                child.setCoord(pos=glm.vec3(rot_quat * child.pos))
+        first_center: glm.vec3 = glm.vec3(first)
+        second_center: glm.vec3 = glm.vec3(second)
+        distance: float = glm.distance(first_center, second_center)
 
-            if scale is not None:
-                child.setCoord(pos=glm.vec3(child.pos * scale))
+        if distance + second.w <= first.w:
+            return first
+        if distance + first.w <= second.w:
+            return second
 
-            if isinstance(child, Node):
-                child.moveChildren(rot_quat, scale)
+        radius: float = (distance + first.w + second.w) / 2
+        center: glm.vec3 = first_center + (second_center - first_center) * ((radius - first.w) / distance)
+
+        return glm.vec4(center, radius)
 
     @typing.override
-    def switchLight(
+    def invalidateBound(
             self: typing.Self,
-            value: bool | None = None,
             /
             ) -> None:
         """
-        Method to/that # TODO: set docstring
+        Method that marks the aggregate bound of this node and its parents to be recomputed.
 
-        Args:
-            value (`bool | None`): Value to set light, if None, just switch it.
-        Raises:
-            # TODO: set exceptions
+        A dirty node always has dirty parents, so the propagation stops at the first node already dirty.
         """
-        super().switchLight(value)
+        if self.tree_bound_dirty:
+            return
 
-        for child in self.children.values():
-            child.switchLight(self.has_light)
+        self.tree_bound_dirty = True
+        super().invalidateBound()
 
     @typing.override
-    def setCoord(
+    def getTreeBound(
             self: typing.Self,
-            /,
-            *,
-            pos: glm.vec3 | None = None,
-            rot: glm.vec3 | None = None,
-            size: glm.vec3 | None = None
-            ) -> None:
+            /
+            ) -> glm.vec4 | None:
         """
-        Method to/that # TODO: set docstring
+        Method that gives the bounding sphere of this node and all its children, only dirty subtrees are recomputed.
 
-        Args:
-            pos (`glm.vec3 | None`): New position of the node.
-            rot (`glm.vec3 | None`): New rotation of the node.
-            size (`glm.vec3 | None`): New size of the node.
-        Raises:
-            # TODO: set exceptions
+        Returns:
+            `glm.vec4 | None`: center (xyz) and radius (w, negative if unknown), None if there is nothing to draw.
         """
-        old_rot = self.rot
-        old_size = self.size
+        if not self.tree_bound_dirty:
+            return self.tree_bound
 
-        super().setCoord(pos=pos, rot=rot, size=size)
+        bound: glm.vec4 | None = super().getTreeBound()
+        for child in self.children.values():
+            bound = Node.mergeBounds(bound, child.getTreeBound())
 
-        if rot is None and size is None:
-            return
+        self.tree_bound = bound
+        self.tree_bound_dirty = False
 
-        delta_rot = self.rot - old_rot
-        self.moveChildren(
-            (glm.angleAxis(delta_rot.x, utils.YAW_AXIS) * glm.angleAxis(delta_rot.y, utils.PITCH_AXIS) * glm.angleAxis(delta_rot.z, utils.ROLL_AXIS)) if rot is not None else None,
-            (self.size / old_size) if size is not None else None
-        )
+        return bound
 
     @typing.override
-    def rotate(
+    def switchLight(
             self: typing.Self,
-            delta: glm.vec3,
+            value: bool | None = None,
             /
             ) -> None:
         """
         Method to/that # TODO: set docstring
 
         Args:
-            delta (`glm.vec3`): The rotation to apply to node.
+            value (`bool | None`): Value to set light, if None, just switch it.
         Raises:
             # TODO: set exceptions
         """
-        super().rotate(delta)
+        super().switchLight(value)
 
-        self.moveChildren(glm.angleAxis(delta.x, utils.YAW_AXIS) * glm.angleAxis(delta.y, utils.PITCH_AXIS) * glm.angleAxis(delta.z, utils.ROLL_AXIS), None)
+        for child in self.children.values():
+            child.switchLight(self.has_light)
 
     @typing.override
-    def scale(
+    def collect(
             self: typing.Self,
-            value: glm.vec3,
+            elements: list[Shape],
             /
             ) -> None:
         """
-        Method to/that # TODO: set docstring
-
-        Args:
-            value (`glm.vec3`): The scale to apply to node.
-        Raises:
-            # TODO: set exceptions
-        """
-        super().scale(value)
-
-        self.moveChildren(None, value)
-
-    @typing.override
-    def updateModelMatrix(
-            self: typing.Self,
-            forced: bool = False,
-            /,
-            *,
-            parent_pos: glm.vec3 | None = None,
-            parent_rot: glm.vec3 | None = None,
-            parent_size: glm.vec3 | None = None
-            ) -> None:
-        """
-        Method to/that # TODO: set docstring
+        Method that appends this node and its children to `elements` if they can be drawn.
 
         Args:
-            forced (`bool`): If we are forced to recalculate model matrix.
-            parent_pos (`glm.vec3 | None`): Parent position to transform relative position to an absolute position.
-            parent_rot (`glm.vec3 | None`): Parent rotation to transform relative rotation to an absolute position.
-            parent_size (`glm.vec3 | None`): Parent size to transform relative size to an absolute position.
-        Raises:
-            # TODO: set exceptions
+            elements (`list[Shape]`): The shapes to draw.
         """
-        updated: bool = self.to_update or forced
-        super().updateModelMatrix(
-            forced,
-            parent_pos=parent_pos,
-            parent_rot=parent_rot,
-            parent_size=parent_size
-        )
-
-        for_child_pos: glm.vec3 = self.pos if parent_pos is None else (self.pos + parent_pos)
-        for_child_rot: glm.vec3 = self.rot if parent_rot is None else (self.rot + parent_rot)
-        for_child_size: glm.vec3 = self.size if parent_size is None else (self.size * parent_size)
+        super().collect(elements)
 
         for child in self.children.values():
-            child.updateModelMatrix(
-                updated,
-                parent_pos=for_child_pos,
-                parent_rot=for_child_rot,
-                parent_size=for_child_size
-            )
+            child.collect(elements)
 
     @typing.override
     def render(
@@ -334,7 +296,8 @@ class Node(Shape):
         Raises:
             # TODO: set exceptions
         """
-        for child in self.children.values():
+        # children remove themselves from `children` when cleaned
+        for child in list(self.children.values()):
             child.cleanRessources()
         self.children.clear()
 
@@ -17,7 +17,7 @@ import typing
 import pyglm.glm as glm
 import OpenGL.GL as GL  # type: ignore
 # local imports
-from . import utils, ressources, Camera
+from . import utils, glstate, ressources, Camera, TRANSFORMS
 if typing.TYPE_CHECKING:
     from . import Node
 
@@ -29,6 +29,9 @@ class Shape:
 
     Class to/that # TODO: set docstring
 
+    The transform of a shape lives in a row (`transform`) of `TRANSFORMS`: `pos`, `rot`, `size`, `model`, `normal`,
+    `bound`, `color`, `to_update` and `to_render` read and write that row.
+
     Attributes:
         # TODO: set attributes
     Methods
@@ -41,8 +44,14 @@ class Shape:
     - `move`
     - `rotate`
     - `scale`
+    - `invalidateTransform`
     - `updateModelMatrix`
+    - `updateBound`
+    - `invalidateBound`
+    - `getTreeBound`
+    - `collect`
     - `render`
+    - `draw`
     - `cleanRessources`
     """
     def __init__(
@@ -72,27 +81,152 @@ class Shape:
         self.parent: Node | None = parent
         self.parent_key: str = ""
 
-        self.pos: glm.vec3 = glm.vec3(0)
-        self.rot: glm.vec3 = glm.vec3(0)
-        self.size: glm.vec3 = glm.vec3(1)
+        self.transform: int = TRANSFORMS.allocate(self)
+        if parent is not None:
+            TRANSFORMS.setParent(self.transform, parent.transform)
 
         self.shader: ressources.Shader | None = None
         self.mesh: ressources.Mesh | None = None
-        self.color: glm.vec3 = color if color is not None else glm.vec3(1, 1, 1)
+        self.color = color if color is not None else glm.vec3(1, 1, 1)
         self.texture: ressources.Texture | None = None
         self.has_light: bool = False
 
-        self.model: glm.mat4x4 = glm.mat4x4()
-
-        self.to_update: bool = True
-        self.to_render: bool = True
-
         self.setShader(shader_name)
         self.setMesh(mesh_name)
         self.setTexture(texture_name)
         self.switchLight(has_light)
 
-        self.updateModelMatrix()
+    @property
+    def pos(
+            self: typing.Self,
+            /
+            ) -> glm.vec3:
+        """
+        Local position of the shape (a copy, set it back to change it).
+        """
+        return glm.vec3.from_bytes(TRANSFORMS.pos[self.transform].tobytes())
+
+    @pos.setter
+    def pos(
+            self: typing.Self,
+            value: glm.vec3,
+            /
+            ) -> None:
+        TRANSFORMS.pos[self.transform] = value.to_tuple()
+
+    @property
+    def rot(
+            self: typing.Self,
+            /
+            ) -> glm.vec3:
+        """
+        Local rotation of the shape in radians (yaw, pitch, roll).
+        """
+        return glm.vec3.from_bytes(TRANSFORMS.rot[self.transform].tobytes())
+
+    @rot.setter
+    def rot(
+            self: typing.Self,
+            value: glm.vec3,
+            /
+            ) -> None:
+        TRANSFORMS.rot[self.transform] = value.to_tuple()
+
+    @property
+    def size(
+            self: typing.Self,
+            /
+            ) -> glm.vec3:
+        """
+        Local size of the shape.
+        """
+        return glm.vec3.from_bytes(TRANSFORMS.size[self.transform].tobytes())
+
+    @size.setter
+    def size(
+            self: typing.Self,
+            value: glm.vec3,
+            /
+            ) -> None:
+        TRANSFORMS.size[self.transform] = value.to_tuple()
+
+    @property
+    def color(
+            self: typing.Self,
+            /
+            ) -> glm.vec3:
+        """
+        Color of the shape (a copy, set it back to change it).
+        """
+        return glm.vec3.from_bytes(TRANSFORMS.color[self.transform].tobytes())
+
+    @color.setter
+    def color(
+            self: typing.Self,
+            value: glm.vec3,
+            /
+            ) -> None:
+        TRANSFORMS.color[self.transform] = value.to_tuple()
+
+    @property
+    def model(
+            self: typing.Self,
+            /
+            ) -> glm.mat4x4:
+        """
+        World matrix of the shape, as of the last `updateModelMatrix`.
+        """
+        return glm.mat4x4.from_bytes(TRANSFORMS.world[self.transform].tobytes())
+
+    @property
+    def normal(
+            self: typing.Self,
+            /
+            ) -> glm.mat3x3:
+        """
+        Normal matrix of the world matrix.
+        """
+        return glm.mat3x3.from_bytes(TRANSFORMS.normal[self.transform].tobytes())
+
+    @property
+    def bound(
+            self: typing.Self,
+            /
+            ) -> glm.vec4:
+        """
+        Bounding sphere in world space: center (xyz) and radius (w, negative if unknown).
+        """
+        return glm.vec4.from_bytes(TRANSFORMS.bound[self.transform].tobytes())
+
+    @property
+    def to_update(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        If the local transform changed since the last `updateModelMatrix`.
+        """
+        return bool(TRANSFORMS.dirty[self.transform])
+
+    @property
+    def to_render(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        If the shape changed since it was last drawn.
+        """
+        return bool(TRANSFORMS.render[self.transform])
+
+    @to_render.setter
+    def to_render(
+            self: typing.Self,
+            value: bool,
+            /
+            ) -> None:
+        TRANSFORMS.render[self.transform] = value
+        if value:
+            TRANSFORMS.changed = True
 
     def setShader(
             self: typing.Self,
@@ -139,7 +273,8 @@ class Shape:
         try:
             if mesh_name:
                 self.mesh = ressources.Mesh(mesh_name)
-                self.to_update = True
+                TRANSFORMS.setMeshBound(self.transform, None)
+                self.invalidateTransform()
         except Exception as e:
             print(f"Error loading mesh {mesh_name}: {e}")
             print("Setting mesh to None.")
@@ -199,6 +334,7 @@ class Shape:
             # TODO: set exceptions
         """
         self.has_light = value if value is not None else not self.has_light
+        self.to_render = True
 
     def setCoord(
             self: typing.Self,
@@ -220,15 +356,15 @@ class Shape:
         """
         if pos is not None:
             self.pos = glm.clamp(pos, -utils.BORDER, utils.BORDER)
-            self.to_update = True
+            self.invalidateTransform()
 
         if rot is not None:
             self.rot = rot % utils.TWO_PI
-            self.to_update = True
+            self.invalidateTransform()
 
         if size is not None:
             self.size = glm.clamp(size, 0.000001, utils.BORDER)
-            self.to_update = True
+            self.invalidateTransform()
 
     def move(
             self: typing.Self,
@@ -245,7 +381,7 @@ class Shape:
         """
         self.pos += delta
         self.pos = glm.clamp(self.pos, -utils.BORDER, utils.BORDER)
-        self.to_update = True
+        self.invalidateTransform()
 
     def rotate(
             self: typing.Self,
@@ -262,7 +398,7 @@ class Shape:
         """
         self.rot += delta
         self.rot = self.rot % utils.TWO_PI
-        self.to_update = True
+        self.invalidateTransform()
 
     def scale(
             self: typing.Self,
@@ -279,42 +415,100 @@ class Shape:
         """
         self.size *= value
         self.size = glm.clamp(self.size, 0.000001, utils.BORDER)
-        self.to_update = True
+        self.invalidateTransform()
+
+    def invalidateTransform(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that marks the local transform of this shape as changed.
+
+        Its world matrix, and the ones of its children, are recomputed by the next `updateModelMatrix`.
+        """
+        TRANSFORMS.invalidate(self.transform)
 
     def updateModelMatrix(
             self: typing.Self,
             forced: bool = False,
-            /,
-            *,
-            parent_pos: glm.vec3 | None = None,
-            parent_rot: glm.vec3 | None = None,
-            parent_size: glm.vec3 | None = None
+            /
             ) -> None:
         """
-        Method to/that # TODO: set docstring
+        Method that recomputes the world matrices (parent world matrix × local matrix) of every moved shape
+        and of their children, in batch (see `TransformStore.update`).
 
         Args:
-            forced (`bool`): If we are forced to recalculate model matrix.
-            parent_pos (`glm.vec3 | None`): Parent position to transform relative position to an absolute position.
-            parent_rot (`glm.vec3 | None`): Parent rotation to transform relative rotation to an absolute position.
-            parent_size (`glm.vec3 | None`): Parent size to transform relative size to an absolute position.
-        Raises:
-            # TODO: set exceptions
+            forced (`bool`): If we are forced to recalculate the model matrix of this shape and its children.
         """
-        if not (self.to_update or forced):
-            return
+        if forced:
+            self.invalidateTransform()
 
-        self.model = glm.mat4x4()
+        TRANSFORMS.update()
+
+    def updateBound(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that transforms the bounding sphere of the mesh to world space with the model matrix.
 
-        self.model = glm.translate(self.model, self.pos if parent_pos is None else (self.pos + parent_pos))
+        The radius is set to -1 (never culled) while the mesh is not loaded.
+        """
+        self.invalidateBound()
 
-        rot: glm.vec3 = self.rot if parent_rot is None else (self.rot + parent_rot)
-        self.model *= glm.mat4_cast(glm.angleAxis(rot.x, utils.YAW_AXIS) * glm.angleAxis(rot.y, utils.PITCH_AXIS) * glm.angleAxis(rot.z, utils.ROLL_AXIS))  # type: ignore
+        if self.mesh is None or not self.mesh.ready:
+            TRANSFORMS.setMeshBound(self.transform, None)
+        else:
+            bounds: list[float] = self.mesh.bounds.tolist()
+            TRANSFORMS.setMeshBound(self.transform, (bounds[6], bounds[7], bounds[8], bounds[9]))
 
-        self.model = glm.scale(self.model, self.size if parent_size is None else (self.size * parent_size))
+        TRANSFORMS.updateBounds(self.transform)
 
-        self.to_update = False
-        self.to_render = True
+    def invalidateBound(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that tells the parents their aggregate bound must be recomputed.
+        """
+        if self.parent is not None:
+            self.parent.invalidateBound()
+
+    def getTreeBound(
+            self: typing.Self,
+            /
+            ) -> glm.vec4 | None:
+        """
+        Method that gives the bounding sphere of everything drawn by this shape.
+
+        Returns:
+            `glm.vec4 | None`: center (xyz) and radius (w, negative if unknown), None if there is nothing to draw.
+        """
+        if self.mesh is None:
+            return None
+
+        return self.bound
+
+    def collect(
+            self: typing.Self,
+            elements: list["Shape"],
+            /
+            ) -> None:
+        """
+        Method that appends this shape to `elements` if it can be drawn (shader and mesh uploaded).
+
+        Args:
+            elements (`list[Shape]`): The shapes to draw.
+        """
+        if self.shader is None or self.mesh is None:
+            return
+        if not (self.shader.ready and self.mesh.ready):
+            return
+
+        if self.bound.w < 0:
+            self.updateBound()
+
+        elements.append(self)
 
     def render(
             self: typing.Self,
@@ -333,32 +527,43 @@ class Shape:
         """
         if self.shader is None or self.mesh is None:
             return
+        if not (self.shader.ready and self.mesh.ready):
+            return
         if not (self.to_render or forced):
             return
 
-        GL.glUseProgram(self.shader.program)
+        glstate.STATE.useProgram(self.shader.program)
+        glstate.STATE.bindVertexArray(self.mesh.vao)
+
+        if self.texture is not None:
+            glstate.STATE.bindTexture(GL.GL_TEXTURE_2D, self.texture.id, 0)
+
+        self.draw()
+
+    def draw(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that sets the uniforms of this shape and issues its draw call.
 
-        GL.glUniformMatrix4fv(GL.glGetUniformLocation(self.shader.program, "model_mat4"), 1, GL.GL_FALSE, glm.value_ptr(self.model))
-        GL.glUniformMatrix4fv(GL.glGetUniformLocation(self.shader.program, "view_mat4"), 1, GL.GL_FALSE, glm.value_ptr(cam.view))
-        GL.glUniformMatrix4fv(GL.glGetUniformLocation(self.shader.program, "proj_mat4"), 1, GL.GL_FALSE, glm.value_ptr(cam.proj))
+        The shader program, the mesh VAO and the texture (on unit 0) must already be bound.
+        """
+        shader: ressources.Shader = typing.cast(ressources.Shader, self.shader)
+        mesh: ressources.Mesh = typing.cast(ressources.Mesh, self.mesh)
 
-        GL.glBindVertexArray(self.mesh.vao)
+        shader.setMat4("model_mat4", self.model)
 
         if self.texture is not None:
-            GL.glActiveTexture(GL.GL_TEXTURE0)  # Don't need to set it, every shapes are drawn after each other, maybe later if we want multiple textures for one shape
-            GL.glBindTexture(GL.GL_TEXTURE_2D, self.texture.id)
-            GL.glUniform1i(GL.glGetUniformLocation(self.shader.program, "texture_2D"), 0)
+            shader.setInt("texture_2D", 0)
         else:
-            GL.glUniform3fv(GL.glGetUniformLocation(self.shader.program, "color_vec3"), 1, glm.value_ptr(self.color))
+            shader.setVec3("color_vec3", self.color)
 
         if self.has_light:
-            GL.glUniform3fv(GL.glGetUniformLocation(self.shader.program, "cam_vec3"), 1, glm.value_ptr(cam.pos))
-            GL.glUniform3f(GL.glGetUniformLocation(self.shader.program, "light_vec3"), 1.0, 1.0, 1.0)
-
-        GL.glDrawElements(GL.GL_TRIANGLES, len(self.mesh.indices), GL.GL_UNSIGNED_INT, None)
+            shader.setMat3("normal_mat3", self.normal)
+            shader.setVec3("light_vec3", glm.vec3(1.0, 1.0, 1.0))
 
-        GL.glBindVertexArray(0)
-        GL.glUseProgram(0)
+        GL.glDrawElementsBaseVertex(GL.GL_TRIANGLES, len(mesh.indices), GL.GL_UNSIGNED_INT, GL.ctypes.c_void_p(mesh.first_index * 4), mesh.base_vertex)
 
         self.to_render = False
 
@@ -373,6 +578,7 @@ class Shape:
             # TODO: set exceptions
         """
         self.cleanRessources()
+        TRANSFORMS.free(self.transform)
 
     def cleanRessources(
             self: typing.Self,
@@ -386,10 +592,13 @@ class Shape:
         """
         if self.texture is not None:
             self.texture.clean()
+            self.texture = None
         if self.mesh is not None:
             self.mesh.clean()
+            self.mesh = None
         if self.shader is not None:
             self.shader.clean()
+            self.shader = None
 
         if self.parent is not None:
             self.parent.subElements(self)
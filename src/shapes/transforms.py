@@ -0,0 +1,876 @@
+"""
+transforms module
+=================
+Package: `shapes`
+
+Module that keeps the transforms of every shape in contiguous arrays, so world matrices are computed in batch.
+
+Classes
+-------
+- `TransformStore`
+Globals
+-------
+- `TRANSFORMS`: Store shared by every shape.
+"""
+
+
+# built-in imports
+import typing
+import weakref
+# pip imports
+import numpy as np
+import pyglm.glm as glm
+# local imports
+from . import utils, profiler
+if typing.TYPE_CHECKING:
+    from . import Shape
+
+
+class TransformStore:
+    """
+    TransformStore class
+    ====================
+
+    Class that keeps, for each shape (a row), its local position, rotation (yaw, pitch, roll) and size,
+    its parent row and its cached matrices in NumPy arrays.
+
+    `update` recomputes the local matrix of the dirty rows, then the world matrices (parent world matrix × local matrix)
+    of the dirty rows and their descendants, level by level from the roots so a parent is always computed before its children.
+    Rows made dirty one by one are also kept in a set with the children of each row, so a frame where few shapes moved costs
+    in proportion to them, not to the whole store. Rows made dirty in batch are only marked in `dirty`,
+    and found back with one `np.flatnonzero` by the next `update`.
+
+    Between `beginTick` and `endTick` (a fixed step of the simulation), the rows changed keep their previous transform:
+    until the next tick, `update` draws them at `alpha` between the previous and the current transform (see `interpolate`).
+    Rows changed outside ticks, and rows allocated during a tick, are not interpolated (new shapes appear in place).
+
+    Matrices are stored column-major like `glm` (`world[row]` is the `bytes` of the `glm.mat4x4`).
+    Must be used from the render thread.
+
+    Attributes:
+        capacity (`int`): Number of rows the arrays can hold.
+        used (`int`): Number of rows ever allocated (freed rows are reused first).
+        pos (`np.ndarray`): Local positions, `(capacity, 3)`.
+        rot (`np.ndarray`): Local rotations in radians (yaw, pitch, roll), `(capacity, 3)`.
+        size (`np.ndarray`): Local sizes, `(capacity, 3)`.
+        prev_pos (`np.ndarray`): Local positions before the last tick, `(capacity, 3)`.
+        prev_rot (`np.ndarray`): Local rotations before the last tick, `(capacity, 3)`.
+        prev_size (`np.ndarray`): Local sizes before the last tick, `(capacity, 3)`.
+        parent (`np.ndarray`): Parent row, -1 for a root, `(capacity,)`.
+        depth (`np.ndarray`): Number of ancestors, `(capacity,)`.
+        local (`np.ndarray`): Local matrices, `(capacity, 4, 4)`.
+        world (`np.ndarray`): World matrices, `(capacity, 4, 4)`.
+        normal (`np.ndarray`): Normal matrices of the world matrices, `(capacity, 3, 3)`.
+        mesh_bound (`np.ndarray`): Bounding sphere of the mesh in local space (negative radius if unknown), `(capacity, 4)`.
+        bound (`np.ndarray`): Bounding sphere in world space (negative radius if unknown), `(capacity, 4)`.
+        color (`np.ndarray`): Colors, `(capacity, 3)`, kept next to the matrices so draw data is gathered in batch.
+        dirty (`np.ndarray`): If the local transform changed since the last update, `(capacity,)`.
+        render (`np.ndarray`): If the shape must be drawn again, `(capacity,)`.
+        alive (`np.ndarray`): If the row is allocated, `(capacity,)`.
+        is_node (`np.ndarray`): If the row is a node, whose aggregate bound depends on its world matrix, `(capacity,)`.
+        lerp (`np.ndarray`): If the row changed during the last tick and is drawn interpolated, `(capacity,)`.
+        ticked (`np.ndarray`): If the row changed during the running or the last tick, `(capacity,)`.
+        updated (`int`): Number of world matrices recomputed by the last update.
+        structure (`int`): Counter increased when a row is allocated, freed or gets another parent.
+        changed (`bool`): If a row was allocated, freed, recomputed or marked to render since it was last set to False
+            (by the renderer once the frame is drawn).
+        ticking (`bool`): If a tick is running (between `beginTick` and `endTick`).
+        alpha (`float`): Position between the previous and the current transform of interpolated rows, from 0 to 1.
+        FEW (`int`): Number of rows up to which they are computed one by one.
+    Methods
+    -------
+    - `allocate`
+    - `free`
+    - `setParent`
+    - `setMeshBound`
+    - `invalidate`
+    - `move`
+    - `rotate`
+    - `scale`
+    - `beginTick`
+    - `endTick`
+    - `interpolate`
+    - `update`
+    - `updateBounds`
+    """
+    FEW: int = 16
+    __ARRAYS: tuple[str, ...] = (
+        "pos", "rot", "size", "prev_pos", "prev_rot", "prev_size", "parent", "depth", "local", "world", "normal",
+        "mesh_bound", "bound", "color", "dirty", "render", "alive", "is_node", "lerp", "ticked"
+    )
+
+    def __init__(
+            self: typing.Self,
+            capacity: int = 1 << 10,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            capacity (`int`): Initial number of rows.
+        """
+        self.capacity: int = 0
+        self.used: int = 0
+        self.updated: int = 0
+        self.structure: int = 0
+        self.changed: bool = False
+        self.ticking: bool = False
+        self.alpha: float = 1.0
+
+        self.pos: np.ndarray = np.empty((0, 3), np.float32)
+        self.rot: np.ndarray = np.empty((0, 3), np.float32)
+        self.size: np.ndarray = np.empty((0, 3), np.float32)
+        self.prev_pos: np.ndarray = np.empty((0, 3), np.float32)
+        self.prev_rot: np.ndarray = np.empty((0, 3), np.float32)
+        self.prev_size: np.ndarray = np.empty((0, 3), np.float32)
+        self.parent: np.ndarray = np.empty(0, np.int32)
+        self.depth: np.ndarray = np.empty(0, np.int32)
+        self.local: np.ndarray = np.empty((0, 4, 4), np.float32)
+        self.world: np.ndarray = np.empty((0, 4, 4), np.float32)
+        self.normal: np.ndarray = np.empty((0, 3, 3), np.float32)
+        self.mesh_bound: np.ndarray = np.empty((0, 4), np.float32)
+        self.bound: np.ndarray = np.empty((0, 4), np.float32)
+        self.color: np.ndarray = np.empty((0, 3), np.float32)
+        self.dirty: np.ndarray = np.empty(0, np.bool_)
+        self.render: np.ndarray = np.empty(0, np.bool_)
+        self.alive: np.ndarray = np.empty(0, np.bool_)
+        self.is_node: np.ndarray = np.empty(0, np.bool_)
+        self.lerp: np.ndarray = np.empty(0, np.bool_)
+        self.ticked: np.ndarray = np.empty(0, np.bool_)
+
+        self.__handles: list[weakref.ref | None] = []
+        self.__free: list[int] = []
+        self.__children: dict[int, set[int]] = {}
+        # rows made dirty one by one, and if rows were made dirty in batch (only marked in `dirty`)
+        self.__dirty: set[int] = set()
+        self.__scan: bool = False
+        # rows of `ticked`, None when it changed, and if previous transforms are kept up to date
+        self.__ticked: np.ndarray | None = np.empty(0, np.intp)
+        self.__tracking: bool = False
+        # rows allocated by the running tick
+        self.__born: list[int] = []
+        # rows of each depth, None when the hierarchy changed
+        self.__levels: list[np.ndarray] | None = None
+
+        self.__grow(capacity)
+
+    def __grow(
+            self: typing.Self,
+            capacity: int,
+            /
+            ) -> None:
+        """
+        Method that replaces every array by one of `capacity` rows, keeping the used rows.
+
+        Args:
+            capacity (`int`): New number of rows.
+        """
+        for name in TransformStore.__ARRAYS:
+            old: np.ndarray = getattr(self, name)
+            new: np.ndarray = np.zeros((capacity,) + old.shape[1:], old.dtype)
+            new[:self.used] = old[:self.used]
+            setattr(self, name, new)
+
+        self.__handles.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    def allocate(
+            self: typing.Self,
+            handle: "Shape",
+            /
+            ) -> int:
+        """
+        Method that gives a row to a shape, set to the identity transform and dirty.
+
+        Args:
+            handle (`Shape`): The shape owning the row (only kept as a weak reference).
+        Returns:
+            `int`: the row.
+        """
+        if self.__free:
+            row: int = self.__free.pop()
+        else:
+            if self.used == self.capacity:
+                self.__grow(self.capacity * 2)
+            row = self.used
+            self.used += 1
+
+        self.pos[row] = 0
+        self.rot[row] = 0
+        self.size[row] = 1
+        self.prev_pos[row] = 0
+        self.prev_rot[row] = 0
+        self.prev_size[row] = 1
+        self.parent[row] = -1
+        self.depth[row] = 0
+        self.local[row] = np.identity(4, np.float32)
+        self.world[row] = np.identity(4, np.float32)
+        self.normal[row] = np.identity(3, np.float32)
+        self.mesh_bound[row] = (0, 0, 0, -1)
+        self.bound[row] = (0, 0, 0, -1)
+        self.color[row] = 1
+        self.dirty[row] = True
+        self.render[row] = True
+        self.alive[row] = True
+        self.is_node[row] = False
+        self.lerp[row] = False
+        self.ticked[row] = False
+
+        self.__handles[row] = weakref.ref(handle)
+        self.__dirty.add(row)
+        if self.ticking:
+            self.__born.append(row)
+        self.__levels = None
+        self.structure += 1
+        self.changed = True
+
+        return row
+
+    def free(
+            self: typing.Self,
+            row: int,
+            /
+            ) -> None:
+        """
+        Method that gives back a row, its children become roots.
+
+        Args:
+            row (`int`): The row.
+        """
+        if not (0 <= row < self.used and self.alive[row]):
+            return
+
+        for child in list(self.__children.get(row, ())):
+            self.setParent(child, -1)
+        self.setParent(row, -1)
+
+        self.alive[row] = False
+        self.dirty[row] = False
+        self.render[row] = False
+        self.lerp[row] = False
+        self.__handles[row] = None
+        self.__dirty.discard(row)
+        if self.ticked[row]:
+            self.ticked[row] = False
+            self.__ticked = None
+
+        self.__free.append(row)
+        self.__levels = None
+        self.structure += 1
+        self.changed = True
+
+    def setParent(
+            self: typing.Self,
+            row: int,
+            parent: int,
+            /
+            ) -> None:
+        """
+        Method that attaches a row under another one (or makes it a root with -1) and marks it dirty.
+
+        Args:
+            row (`int`): The row.
+            parent (`int`): The parent row, -1 for none.
+        """
+        old: int = int(self.parent[row])
+        if old != parent:
+            if old >= 0:
+                self.__children[old].discard(row)
+                if not self.__children[old]:
+                    del self.__children[old]
+            if parent >= 0:
+                self.__children.setdefault(parent, set()).add(row)
+
+            self.parent[row] = parent
+            self.__setDepth(row, int(self.depth[parent]) + 1 if parent >= 0 else 0)
+            self.__levels = None
+            self.structure += 1
+
+        self.invalidate(row)
+
+    def __setDepth(
+            self: typing.Self,
+            row: int,
+            depth: int,
+            /
+            ) -> None:
+        """
+        Method that sets the depth of a row and of its descendants.
+
+        Args:
+            row (`int`): The row.
+            depth (`int`): Its new depth.
+        """
+        if self.depth[row] == depth:
+            return
+
+        stack: list[tuple[int, int]] = [(row, depth)]
+        while stack:
+            row, depth = stack.pop()
+            self.depth[row] = depth
+            stack.extend((child, depth + 1) for child in self.__children.get(row, ()))
+
+    def setMeshBound(
+            self: typing.Self,
+            row: int,
+            bound: tuple[float, float, float, float] | None,
+            /
+            ) -> None:
+        """
+        Method that sets the bounding sphere of the mesh drawn by a row, in local space.
+
+        Args:
+            row (`int`): The row.
+            bound (`tuple[float,float,float,float] | None`): center (xyz) and radius (w), None if unknown.
+        """
+        self.mesh_bound[row] = bound if bound is not None else (0, 0, 0, -1)
+
+    def invalidate(
+            self: typing.Self,
+            rows: np.ndarray | int,
+            /
+            ) -> None:
+        """
+        Method that marks rows whose local transform changed.
+
+        During a tick, the rows are interpolated until the next tick, else they jump to their new transform.
+
+        Args:
+            rows (`np.ndarray | int`): The rows.
+        """
+        self.__markDirty(rows)
+
+        if self.ticking:
+            self.ticked[rows] = True
+            self.__ticked = None
+        elif self.__tracking:
+            self.prev_pos[rows] = self.pos[rows]
+            self.prev_rot[rows] = self.rot[rows]
+            self.prev_size[rows] = self.size[rows]
+            self.lerp[rows] = False
+            if self.ticked[rows].any():
+                self.ticked[rows] = False
+                self.__ticked = None
+
+    def __markDirty(
+            self: typing.Self,
+            rows: np.ndarray | int,
+            /
+            ) -> None:
+        """
+        Method that marks rows dirty: a single row is also kept in the set of dirty rows, a batch only in `dirty`.
+
+        Args:
+            rows (`np.ndarray | int`): The rows.
+        """
+        self.dirty[rows] = True
+        if isinstance(rows, np.ndarray):
+            self.__scan = True
+        else:
+            self.__dirty.add(rows)
+
+    def __tickedRows(
+            self: typing.Self,
+            /
+            ) -> np.ndarray:
+        """
+        Method that gives the rows changed during the running or the last tick.
+
+        Returns:
+            `np.ndarray`: the rows of `ticked`.
+        """
+        if self.__ticked is None:
+            self.__ticked = np.flatnonzero(self.ticked[:self.used])
+
+        return self.__ticked
+
+    def move(
+            self: typing.Self,
+            rows: np.ndarray,
+            delta: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that moves many rows at once.
+
+        Args:
+            rows (`np.ndarray`): The rows.
+            delta (`np.ndarray`): The movement, `(3,)` or one per row `(len(rows), 3)`.
+        """
+        self.pos[rows] = np.clip(self.pos[rows] + delta, -utils.BORDER, utils.BORDER)
+        self.invalidate(rows)
+
+    def rotate(
+            self: typing.Self,
+            rows: np.ndarray,
+            delta: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that rotates many rows at once.
+
+        Args:
+            rows (`np.ndarray`): The rows.
+            delta (`np.ndarray`): The rotation (yaw, pitch, roll), `(3,)` or one per row `(len(rows), 3)`.
+        """
+        self.rot[rows] = np.mod(self.rot[rows] + delta, utils.TWO_PI)
+        self.invalidate(rows)
+
+    def scale(
+            self: typing.Self,
+            rows: np.ndarray,
+            value: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that scales many rows at once.
+
+        Args:
+            rows (`np.ndarray`): The rows.
+            value (`np.ndarray`): The scale, `(3,)` or one per row `(len(rows), 3)`.
+        """
+        self.size[rows] = np.clip(self.size[rows] * value, 0.000001, utils.BORDER)
+        self.invalidate(rows)
+
+    def beginTick(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that starts a tick: the rows changed by the last tick stop being interpolated
+        (their current transform becomes the previous one), and the rows changed until `endTick` keep their previous transform.
+        """
+        if not self.__tracking:
+            self.prev_pos[:self.used] = self.pos[:self.used]
+            self.prev_rot[:self.used] = self.rot[:self.used]
+            self.prev_size[:self.used] = self.size[:self.used]
+            self.__tracking = True
+
+        rows: np.ndarray = self.__tickedRows()
+        if len(rows):
+            self.ticked[rows] = False
+            self.__ticked = np.empty(0, np.intp)
+            self.prev_pos[rows] = self.pos[rows]
+            self.prev_rot[rows] = self.rot[rows]
+            self.prev_size[rows] = self.size[rows]
+            self.lerp[rows] = False
+            # drawn interpolated until now, computed again at their current transform
+            self.__markDirty(rows)
+
+        self.ticking = True
+
+    def endTick(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that ends a tick: the rows changed during it are drawn interpolated until the next tick,
+        except the rows allocated during it, drawn at their current transform.
+        """
+        self.ticking = False
+
+        if self.__born:
+            born: np.ndarray = np.array(self.__born, np.intp)
+            self.__born = []
+            born = born[self.alive[born]]
+            self.prev_pos[born] = self.pos[born]
+            self.prev_rot[born] = self.rot[born]
+            self.prev_size[born] = self.size[born]
+            if self.ticked[born].any():
+                self.ticked[born] = False
+                self.__ticked = None
+
+        self.lerp[self.__tickedRows()] = True
+
+    def interpolate(
+            self: typing.Self,
+            alpha: float,
+            /
+            ) -> None:
+        """
+        Method that sets where interpolated rows are drawn between their previous and current transform,
+        they are computed again by the next `update` if it moved.
+
+        Args:
+            alpha (`float`): Position between the previous (0) and the current (1) transform.
+        """
+        if alpha == self.alpha:
+            return
+
+        self.alpha = alpha
+        rows: np.ndarray = self.__tickedRows()
+        if len(rows):
+            self.__markDirty(rows)
+
+    def __inputs(
+            self: typing.Self,
+            rows: np.ndarray,
+            /
+            ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Method that gives the positions, rotations and sizes rows are drawn with, interpolated for the rows changed by the last tick.
+
+        Args:
+            rows (`np.ndarray`): The rows.
+        Returns:
+            `tuple[np.ndarray,np.ndarray,np.ndarray]`: positions, rotations and sizes, `(len(rows), 3)` each.
+        """
+        pos: np.ndarray = self.pos[rows]
+        rot: np.ndarray = self.rot[rows]
+        size: np.ndarray = self.size[rows]
+        if self.alpha >= 1 or not len(self.__tickedRows()):
+            return pos, rot, size
+
+        lerp: np.ndarray = self.lerp[rows]
+        if not lerp.any():
+            return pos, rot, size
+
+        moved: np.ndarray = rows[lerp]
+        pos[lerp] = self.prev_pos[moved] + (pos[lerp] - self.prev_pos[moved]) * self.alpha
+        size[lerp] = self.prev_size[moved] + (size[lerp] - self.prev_size[moved]) * self.alpha
+        # rotations are kept in [0, 2pi[: turn the shortest way
+        turn: np.ndarray = np.mod(rot[lerp] - self.prev_rot[moved] + np.pi, utils.TWO_PI) - np.pi
+        rot[lerp] = self.prev_rot[moved] + turn * self.alpha
+
+        return pos, rot, size
+
+    @staticmethod
+    def __axisQuaternions(
+            angles: np.ndarray,
+            axis: tuple[float, float, float],
+            /
+            ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Method that gives the quaternions of rotations around a unit axis (like `glm.angleAxis`).
+
+        Args:
+            angles (`np.ndarray`): The angles in radians, `(n,)`.
+            axis (`tuple[float,float,float]`): The axis.
+        Returns:
+            `tuple[np.ndarray,np.ndarray,np.ndarray,np.ndarray]`: w, x, y and z of the quaternions, `(n,)` each.
+        """
+        sin: np.ndarray = np.sin(angles * 0.5)
+
+        return np.cos(angles * 0.5), sin * axis[0], sin * axis[1], sin * axis[2]
+
+    @staticmethod
+    def __multiplyQuaternions(
+            first: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+            second: tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+            /
+            ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Method that gives the products `first * second` of quaternions.
+
+        Args:
+            first (`tuple[np.ndarray,np.ndarray,np.ndarray,np.ndarray]`): w, x, y and z of the left quaternions.
+            second (`tuple[np.ndarray,np.ndarray,np.ndarray,np.ndarray]`): w, x, y and z of the right quaternions.
+        Returns:
+            `tuple[np.ndarray,np.ndarray,np.ndarray,np.ndarray]`: w, x, y and z of the products.
+        """
+        w1, x1, y1, z1 = first
+        w2, x2, y2, z2 = second
+
+        return (
+            w1 * w2 - x1 * x2 - y1 * y2 - z1 * z2,
+            w1 * x2 + x1 * w2 + y1 * z2 - z1 * y2,
+            w1 * y2 - x1 * z2 + y1 * w2 + z1 * x2,
+            w1 * z2 + x1 * y2 - y1 * x2 + z1 * w2
+        )
+
+    def __computeLocal(
+            self: typing.Self,
+            rows: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that computes the local matrices (translation × rotation × scale) of rows.
+
+        Args:
+            rows (`np.ndarray`): The rows.
+        """
+        pos, rot, size = self.__inputs(rows)
+        w, x, y, z = TransformStore.__multiplyQuaternions(
+            TransformStore.__multiplyQuaternions(
+                TransformStore.__axisQuaternions(rot[:, 0], utils.YAW_AXIS.to_tuple()),
+                TransformStore.__axisQuaternions(rot[:, 1], utils.PITCH_AXIS.to_tuple())
+            ),
+            TransformStore.__axisQuaternions(rot[:, 2], utils.ROLL_AXIS.to_tuple())
+        )
+        size = size.T
+
+        # component-major (contiguous components) while computing, matrices are column-major: local[column, line]
+        local: np.ndarray = np.empty((4, 4, len(rows)), np.float32)
+        local[0, 0] = (1 - 2 * (y * y + z * z)) * size[0]
+        local[0, 1] = 2 * (x * y + w * z) * size[0]
+        local[0, 2] = 2 * (x * z - w * y) * size[0]
+        local[1, 0] = 2 * (x * y - w * z) * size[1]
+        local[1, 1] = (1 - 2 * (x * x + z * z)) * size[1]
+        local[1, 2] = 2 * (y * z + w * x) * size[1]
+        local[2, 0] = 2 * (x * z + w * y) * size[2]
+        local[2, 1] = 2 * (y * z - w * x) * size[2]
+        local[2, 2] = (1 - 2 * (x * x + y * y)) * size[2]
+        local[:3, 3] = 0
+        local[3, :3] = pos.T
+        local[3, 3] = 1
+        self.local[rows] = local.transpose(2, 0, 1)
+
+    @staticmethod
+    def __normalMatrices(
+            world: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that gives the normal matrices (transposed inverse of the upper 3x3) of world matrices, with cofactors.
+
+        Args:
+            world (`np.ndarray`): The world matrices (column-major), `(n, 4, 4)`.
+        Returns:
+            `np.ndarray`: the normal matrices (column-major), `(n, 3, 3)`.
+        """
+        # stored transposed: transpose(inverse(transpose(m))) is the cofactor matrix of m over its determinant
+        (a, b, c), (d, e, f), (g, h, i) = np.ascontiguousarray(world[:, :3, :3].transpose(1, 2, 0))
+
+        normal: np.ndarray = np.empty((3, 3, len(world)), np.float32)
+        normal[0, 0] = e * i - f * h
+        normal[0, 1] = f * g - d * i
+        normal[0, 2] = d * h - e * g
+        normal[1, 0] = c * h - b * i
+        normal[1, 1] = a * i - c * g
+        normal[1, 2] = b * g - a * h
+        normal[2, 0] = b * f - c * e
+        normal[2, 1] = c * d - a * f
+        normal[2, 2] = a * e - b * d
+        normal /= a * normal[0, 0] + b * normal[0, 1] + c * normal[0, 2]
+
+        return normal.transpose(2, 0, 1)
+
+    def __computeLevels(
+            self: typing.Self,
+            /
+            ) -> list[np.ndarray]:
+        """
+        Method that sorts the rows by depth in the hierarchy.
+
+        Returns:
+            `list[np.ndarray]`: the rows of depth 0 (roots), 1, 2..., sorted by parent.
+        """
+        rows: np.ndarray = np.flatnonzero(self.alive[:self.used])
+
+        return TransformStore.__splitLevels(rows[np.lexsort((self.parent[rows], self.depth[rows]))], self.depth)
+
+    @staticmethod
+    def __splitLevels(
+            rows: np.ndarray,
+            depth: np.ndarray,
+            /
+            ) -> list[np.ndarray]:
+        """
+        Method that cuts rows sorted by depth into one array per depth.
+
+        Args:
+            rows (`np.ndarray`): The rows, sorted by depth then parent.
+            depth (`np.ndarray`): The depth of every row.
+        Returns:
+            `list[np.ndarray]`: the rows of each depth present, from the lowest.
+        """
+        return np.split(rows, np.flatnonzero(np.diff(depth[rows])) + 1) if len(rows) else []
+
+    def __collectDescendants(
+            self: typing.Self,
+            rows: np.ndarray,
+            /
+            ) -> np.ndarray:
+        """
+        Method that gives rows and all their descendants, each once.
+
+        Args:
+            rows (`np.ndarray`): The rows.
+        Returns:
+            `np.ndarray`: the rows and their descendants, sorted by depth then parent.
+        """
+        found: set[int] = set(rows.tolist())
+        stack: list[int] = list(found)
+        while stack:
+            children: set[int] | None = self.__children.get(stack.pop())
+            if children:
+                new: set[int] = children - found
+                found |= new
+                stack.extend(new)
+
+        collected: np.ndarray = np.fromiter(found, np.intp, len(found))
+
+        return collected[np.lexsort((self.parent[collected], self.depth[collected]))]
+
+    def __computeLevel(
+            self: typing.Self,
+            rows: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that computes the world matrices of rows of the same depth, whose parents are up to date.
+
+        Rows sorted by parent: siblings are multiplied by their parent in one product when they are many.
+
+        Args:
+            rows (`np.ndarray`): The rows, sorted by parent.
+        """
+        if not len(rows):
+            return
+
+        parents: np.ndarray = self.parent[rows]
+        if parents[0] < 0:
+            # roots (depth 0)
+            self.world[rows] = self.local[rows]
+            return
+
+        starts: np.ndarray = np.flatnonzero(np.diff(parents, prepend=-2))
+
+        if len(starts) * 32 > len(rows):
+            self.world[rows] = self.local[rows] @ self.world[parents]
+            return
+
+        ends: list[int] = starts[1:].tolist() + [len(rows)]
+        for start, end in zip(starts.tolist(), ends):
+            siblings: np.ndarray = rows[start:end]
+            # column-major: each column of a child is a line vector multiplied by the parent matrix
+            self.world[siblings] = (self.local[siblings].reshape(-1, 4) @ self.world[parents[start]]).reshape(-1, 4, 4)
+
+    def __computeFew(
+            self: typing.Self,
+            rows: np.ndarray,
+            /
+            ) -> None:
+        """
+        Method that computes the matrices and bounds of a few rows one by one with `glm`,
+        cheaper than the vectorized path when NumPy call overhead dominates.
+
+        Args:
+            rows (`np.ndarray`): The rows, sorted by depth.
+        """
+        positions, rotations, sizes = self.__inputs(rows)
+
+        for i, row in enumerate(rows.tolist()):
+            local: glm.mat4x4
+            if self.dirty[row]:
+                rot: glm.vec3 = glm.vec3.from_bytes(rotations[i].tobytes())
+                local = glm.translate(glm.vec3.from_bytes(positions[i].tobytes()))
+                local *= glm.mat4_cast(glm.angleAxis(rot.x, utils.YAW_AXIS) * glm.angleAxis(rot.y, utils.PITCH_AXIS) * glm.angleAxis(rot.z, utils.ROLL_AXIS))  # type: ignore
+                local = glm.scale(local, glm.vec3.from_bytes(sizes[i].tobytes()))
+                self.local[row] = np.frombuffer(local.to_bytes(), np.float32).reshape(4, 4)
+            else:
+                local = glm.mat4x4.from_bytes(self.local[row].tobytes())
+
+            parent: int = int(self.parent[row])
+            world: glm.mat4x4 = local if parent < 0 else glm.mat4x4.from_bytes(self.world[parent].tobytes()) * local
+            self.world[row] = np.frombuffer(world.to_bytes(), np.float32).reshape(4, 4)
+            self.normal[row] = np.frombuffer(glm.transpose(glm.inverse(glm.mat3x3(world))).to_bytes(), np.float32).reshape(3, 3)
+
+            mesh_bound: glm.vec4 = glm.vec4.from_bytes(self.mesh_bound[row].tobytes())
+            if mesh_bound.w < 0:
+                self.bound[row] = (0, 0, 0, -1)
+                continue
+
+            center: glm.vec4 = world * glm.vec4(glm.vec3(mesh_bound), 1)
+            scale: float = max(glm.length(glm.vec3(world[0])), glm.length(glm.vec3(world[1])), glm.length(glm.vec3(world[2])))
+            self.bound[row] = (center.x, center.y, center.z, mesh_bound.w * scale)
+
+    @profiler.PROFILER.profiled("scene.transforms")
+    def update(
+            self: typing.Self,
+            /
+            ) -> np.ndarray:
+        """
+        Method that recomputes the matrices and bounds of the dirty rows and of their descendants,
+        marks them to render, and tells the nodes above them their aggregate bound changed.
+
+        Returns:
+            `np.ndarray`: the rows recomputed.
+        """
+        if not self.__dirty and not self.__scan:
+            self.updated = 0
+            return np.empty(0, np.intp)
+
+        dirty: np.ndarray
+        if self.__scan:
+            # the rows of the set are marked too
+            dirty = np.flatnonzero(self.dirty[:self.used])
+        else:
+            dirty = np.fromiter(self.__dirty, np.intp, len(self.__dirty))
+        self.__dirty.clear()
+        self.__scan = False
+        if not len(dirty):
+            self.updated = 0
+            return np.empty(0, np.intp)
+
+        updated: np.ndarray
+        levels: list[np.ndarray]
+        if len(dirty) * 8 > self.used:
+            # many dirty rows: one vectorized pass over every level to mark their descendants
+            if self.__levels is None:
+                self.__levels = self.__computeLevels()
+
+            marked: np.ndarray = self.dirty[:self.used].copy()
+            levels = []
+            for rows in self.__levels:
+                has_parent: np.ndarray = self.parent[rows] >= 0
+                marked[rows[has_parent]] |= marked[self.parent[rows[has_parent]]]
+                levels.append(rows[marked[rows]])
+
+            updated = np.concatenate(levels)
+        else:
+            # few dirty rows: only their subtrees
+            updated = self.__collectDescendants(dirty)
+            levels = TransformStore.__splitLevels(updated, self.depth)
+
+        if len(updated) <= TransformStore.FEW:
+            self.__computeFew(updated)
+        else:
+            self.__computeLocal(dirty)
+            for rows in levels:
+                self.__computeLevel(rows)
+
+            self.normal[updated] = TransformStore.__normalMatrices(self.world[updated])
+            self.updateBounds(updated)
+
+        self.dirty[dirty] = False
+        self.render[updated] = True
+        self.updated = len(updated)
+        self.changed = True
+
+        parents: np.ndarray = self.parent[updated]
+        nodes: np.ndarray = np.unique(np.concatenate((parents[parents >= 0], updated[self.is_node[updated]])))
+        for row in nodes.tolist():
+            handle: weakref.ref | None = self.__handles[row]
+            node: "Shape | None" = handle() if handle is not None else None
+            if node is not None:
+                node.invalidateBound()
+
+        return updated
+
+    def updateBounds(
+            self: typing.Self,
+            rows: np.ndarray | int,
+            /
+            ) -> None:
+        """
+        Method that transforms the mesh bounding spheres of rows to world space with their world matrix.
+
+        Args:
+            rows (`np.ndarray | int`): The rows.
+        """
+        rows = np.atleast_1d(rows)
+        mesh_bound: np.ndarray = self.mesh_bound[rows].T
+        # component-major: columns[column, line]
+        columns: np.ndarray = np.ascontiguousarray(self.world[rows, :, :3].transpose(1, 2, 0))
+
+        bound: np.ndarray = np.empty((4, len(rows)), np.float32)
+        bound[:3] = columns[0] * mesh_bound[0] + columns[1] * mesh_bound[1] + columns[2] * mesh_bound[2] + columns[3]
+        bound[3] = np.sqrt(np.maximum(np.maximum((columns[0] ** 2).sum(0), (columns[1] ** 2).sum(0)), (columns[2] ** 2).sum(0)))
+        bound[3] *= mesh_bound[3]
+        bound[:, mesh_bound[3] < 0] = ((0,), (0,), (0,), (-1,))
+        self.bound[rows] = bound.T
+
+
+TRANSFORMS: TransformStore = TransformStore()
@@ -26,6 +26,26 @@ Globals
 - `SCREEN_HEIGHT`: Height of the window to display.
 - `NEAR`: Distance from wich objects are considered near.
 - `FAR`: Distance from wich objects are considered far.
+- `UPLOAD_BUDGET`: Time in seconds allowed per frame to upload loaded ressources to the GPU.
+- `CACHE_MODE`: Permissions of the compiled meshes and cooked textures written next to the assets (`0o666` without the umask).
+- `IDLE_TIMEOUT`: Maximum time in seconds the loop sleeps waiting for an event when nothing changed (on demand rendering).
+- `TARGET_FPS`: Frame rate the scheduler paces the loop to, 0 to not limit it.
+- `SWAP_INTERVAL`: Number of screen refreshes a buffer swap waits for, 0 to disable vsync.
+- `FRAME_SPIN`: Minimum time in seconds spent spinning instead of sleeping before a frame deadline.
+- `TICK_RATE`: Number of fixed simulation steps per second, 0 to make one step of the frame time per frame.
+- `MAX_TICKS`: Maximum number of simulation steps made in a frame (the simulation slows down past it).
+- `CAMERA_UBO_BINDING`: Uniform buffer binding point of the `Camera` block of shaders.
+- `TEXTURE_COMPRESSION`: If textures are cooked in BC1/BC3 blocks (disabled when the GPU lacks S3TC).
+- `INSTANCING_THRESHOLD`: Minimum number of shapes sharing shader, mesh, texture and light to draw them instanced.
+- `INSTANCED_SUFFIX`: Suffix added to a shader name to get its instanced variant.
+- `CULLING_BATCH`: Number of shapes from which frustum tests are batched with NumPy.
+- `INDIRECT_SUFFIX`: Suffix added to a shader name to get its multi-draw indirect variant.
+- `INDIRECT_OBJECTS_BINDING`: Shader storage binding point of the `Objects` block of indirect shaders (set in the shaders).
+- `GL_STATE_DEBUG`: If the mirrored OpenGL state is checked against `glGet*` queries (slow).
+- `PROFILING`: If CPU zones are recorded by the profiler (set with the `PROFILE` environment variable).
+- `PROFILER_FRAMES`: Number of frames the profiler keeps.
+- `PROFILER_ZONES`: Maximum number of zones the profiler records in a frame.
+- `HEADLESS`: If the renderer draws in an offscreen framebuffer instead of a window (default when `PYOPENGL_PLATFORM` is `egl` or `osmesa`).
 - `BORDER`: Size of the map.
 - `BACK_COLOR`: Background color of the scene (sky color).
 - `PLAYER_SIZE`: Size of the player in the scene.
@@ -133,13 +153,19 @@ class Extensions:
     Attributes:
         shader_vert (`str`): extension for vertex shader.
         shader_frag (`str`): extension for fragment shader.
+        shader_comp (`str`): extension for compute shader.
         mesh (`str`): extension for mesh.
+        mesh_cache (`str`): extension for compiled mesh binary (written next to mesh).
         texture (`str`): extension for texture.
+        texture_cache (`str`): extension for cooked texture container (written next to texture).
     """
     shader_vert: str = ".vert.glsl"
     shader_frag: str = ".frag.glsl"
+    shader_comp: str = ".comp.glsl"
     mesh: str = ".obj"
+    mesh_cache: str = ".meshbin"
     texture: str = ".png"
+    texture_cache: str = ".texbin"
 
 
 class KeyDoubleDict:
@@ -255,6 +281,29 @@ SCREEN_WIDTH: int = 1280
 SCREEN_HEIGHT: int = 720
 NEAR: float = 0.1
 FAR: float = 50.0
+UPLOAD_BUDGET: float = 0.004
+# the umask can only be read by setting it, done once at import before any thread starts
+_UMASK: int = os.umask(0o022)
+os.umask(_UMASK)
+CACHE_MODE: int = 0o666 & ~_UMASK
+IDLE_TIMEOUT: float = 1.0
+TARGET_FPS: float = 60.0
+SWAP_INTERVAL: int = 0
+FRAME_SPIN: float = 0.002
+TICK_RATE: float = 60.0
+MAX_TICKS: int = 5
+TEXTURE_COMPRESSION: bool = True
+CAMERA_UBO_BINDING: int = 0
+INSTANCING_THRESHOLD: int = 2
+INSTANCED_SUFFIX: str = "_inst"
+CULLING_BATCH: int = 64
+INDIRECT_SUFFIX: str = "_mdi"
+INDIRECT_OBJECTS_BINDING: int = 1
+GL_STATE_DEBUG: bool = False
+PROFILING: bool = os.environ.get("PROFILE", "0") not in ("", "0")
+PROFILER_FRAMES: int = 240
+PROFILER_ZONES: int = 1 << 16
+HEADLESS: bool = os.environ.get("PYOPENGL_PLATFORM", "") in ("egl", "osmesa")
 
 BORDER: float = 250.0
 BACK_COLOR: tuple[float, ...] = (0.5, 0.7, 1.0, 1.0)
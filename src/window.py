@@ -0,0 +1,993 @@
+"""
+window module
+=============
+Package: `src`
+
+Module that abstracts where the renderer draws: a GLFW window, or an offscreen framebuffer of a headless context.
+
+Classes
+-------
+- `Window`
+- `GlfwWindow`
+- `HeadlessWindow`
+"""
+
+
+# built-in imports
+import os
+import typing
+import ctypes
+import threading
+import collections.abc
+# pip imports
+import numpy as np
+import glfw  # type: ignore
+import OpenGL.GL as GL  # type: ignore
+# local imports
+from . import glstate
+
+
+class Window:
+    """
+    Window class
+    ============
+
+    Class that owns the OpenGL context the renderer draws in. Loops only use `shouldClose`, `swapBuffers`,
+    `pollEvents`, `waitEvents` and the input methods, so they run the same with or without a display.
+
+    The base class has no context and no input: every key is released and the cursor stays in the middle.
+
+    Attributes:
+        width (`int`): Width of the framebuffer drawn into.
+        height (`int`): Height of the framebuffer drawn into.
+        framebuffer (`typing.Any`): Framebuffer drawn into, 0 for the default framebuffer of a window.
+    Methods
+    -------
+    - `extensionSupported` (staticmethod)
+    - `shouldClose`
+    - `setShouldClose`
+    - `swapBuffers`
+    - `setSwapInterval`
+    - `pollEvents`
+    - `waitEvents`
+    - `postEmptyEvent`
+    - `getKey`
+    - `getCursorPos`
+    - `captureCursor`
+    - `setCursorPosCallback`
+    - `setScrollCallback`
+    - `setRefreshCallback`
+    - `setTitle`
+    - `makeCurrent`
+    - `doneCurrent`
+    - `createUploadWindow`
+    - `readPixels`
+    - `terminate`
+    """
+    @staticmethod
+    def extensionSupported(
+            name: str,
+            /
+            ) -> bool:
+        """
+        Method that tells if the current context exposes an extension, without going through GLFW.
+
+        Args:
+            name (`str`): Name of the extension (e.g. `GL_ARB_indirect_parameters`).
+        Returns:
+            `bool`: True if the extension is listed by `glGetStringi`.
+        """
+        encoded: bytes = name.encode()
+
+        return any(GL.glGetStringi(GL.GL_EXTENSIONS, i) == encoded for i in range(int(GL.glGetIntegerv(GL.GL_NUM_EXTENSIONS))))
+
+    def __init__(
+            self: typing.Self,
+            width: int,
+            height: int,
+            /
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            width (`int`): Width of the framebuffer drawn into.
+            height (`int`): Height of the framebuffer drawn into.
+        """
+        self.width: int = width
+        self.height: int = height
+        self.framebuffer: typing.Any = 0
+
+        self.cursor_callback: collections.abc.Callable[[typing.Any, float, float], None] | None = None
+        self.scroll_callback: collections.abc.Callable[[typing.Any, float, float], None] | None = None
+        self.refresh_callback: collections.abc.Callable[[typing.Any], None] | None = None
+
+        self.__should_close: bool = False
+        self.__wake: threading.Event = threading.Event()
+        self.__pixels: np.ndarray | None = None
+
+    def shouldClose(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        Method that tells if the loop should stop.
+
+        Returns:
+            `bool`: True once `setShouldClose(True)` was called.
+        """
+        return self.__should_close
+
+    def setShouldClose(
+            self: typing.Self,
+            value: bool,
+            /
+            ) -> None:
+        """
+        Method that asks the loop to stop (or not).
+
+        Args:
+            value (`bool`): If the loop should stop.
+        """
+        self.__should_close = value
+
+    def swapBuffers(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that presents the frame drawn.
+        """
+        return
+
+    def setSwapInterval(
+            self: typing.Self,
+            interval: int,
+            /
+            ) -> None:
+        """
+        Method that sets the number of screen refreshes `swapBuffers` waits for (0 to disable vsync),
+        must be called with the context current.
+
+        Args:
+            interval (`int`): Number of refreshes, -1 for adaptive vsync where supported.
+        """
+        return
+
+    def pollEvents(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that processes pending input events, calling the callbacks.
+        """
+        return
+
+    def waitEvents(
+            self: typing.Self,
+            timeout: float,
+            /
+            ) -> None:
+        """
+        Method that sleeps until an event is posted or `timeout` is elapsed, then processes the events.
+
+        Args:
+            timeout (`float`): Maximum time to wait in seconds.
+        """
+        self.__wake.wait(timeout)
+        self.__wake.clear()
+        self.pollEvents()
+
+    def postEmptyEvent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that wakes up `waitEvents`, can be called from any thread.
+        """
+        self.__wake.set()
+
+    def getKey(
+            self: typing.Self,
+            key: int,
+            /
+            ) -> int:
+        """
+        Method that gives the state of a key.
+
+        Args:
+            key (`int`): GLFW key code.
+        Returns:
+            `int`: `glfw.PRESS` or `glfw.RELEASE`.
+        """
+        return glfw.RELEASE
+
+    def getCursorPos(
+            self: typing.Self,
+            /
+            ) -> tuple[float, float]:
+        """
+        Method that gives the position of the cursor.
+
+        Returns:
+            `tuple[float,float]`: position on x and y axis in the window.
+        """
+        return self.width / 2, self.height / 2
+
+    def captureCursor(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that hides the cursor and puts it in the middle of the window, for mouse look.
+        """
+        return
+
+    def setCursorPosCallback(
+            self: typing.Self,
+            callback: collections.abc.Callable[[typing.Any, float, float], None] | None,
+            /
+            ) -> None:
+        """
+        Method that sets the function called with (window, x, y) when the cursor moves.
+
+        Args:
+            callback (`collections.abc.Callable[[typing.Any,float,float],None] | None`): The function to call.
+        """
+        self.cursor_callback = callback
+
+    def setScrollCallback(
+            self: typing.Self,
+            callback: collections.abc.Callable[[typing.Any, float, float], None] | None,
+            /
+            ) -> None:
+        """
+        Method that sets the function called with (window, delta x, delta y) when the scroll wheel is used.
+
+        Args:
+            callback (`collections.abc.Callable[[typing.Any,float,float],None] | None`): The function to call.
+        """
+        self.scroll_callback = callback
+
+    def setRefreshCallback(
+            self: typing.Self,
+            callback: collections.abc.Callable[[typing.Any], None] | None,
+            /
+            ) -> None:
+        """
+        Method that sets the function called with (window) when the content of the window must be drawn again
+        (e.g. after being uncovered or resized).
+
+        Args:
+            callback (`collections.abc.Callable[[typing.Any],None] | None`): The function to call.
+        """
+        self.refresh_callback = callback
+
+    def setTitle(
+            self: typing.Self,
+            title: str,
+            /
+            ) -> None:
+        """
+        Method that sets the title of the window.
+
+        Args:
+            title (`str`): The title.
+        """
+        return
+
+    def makeCurrent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that makes the context of the window current on the calling thread.
+        """
+        return
+
+    def doneCurrent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that releases the context current on the calling thread.
+        """
+        return
+
+    def createUploadWindow(
+            self: typing.Self,
+            /
+            ) -> "Window | None":
+        """
+        Method that creates a hidden window whose context is shared with this one, for the upload worker.
+
+        Returns:
+            `Window | None`: the window, None if shared contexts aren't available.
+        """
+        return None
+
+    def readPixels(
+            self: typing.Self,
+            out: np.ndarray | None = None,
+            /
+            ) -> np.ndarray:
+        """
+        Method that reads the RGBA pixels of the framebuffer drawn into, straight into a NumPy array.
+
+        Rows are bottom to top (OpenGL order), `readPixels()[::-1]` is a view top to bottom.
+        Without `out` the same array is reused (and overwritten) by every call.
+        For a double-buffered window, call it before `swapBuffers`.
+
+        Args:
+            out (`np.ndarray | None`): C-contiguous `uint8` array of shape `(height, width, 4)` to read into.
+        Returns:
+            `np.ndarray`: `out`, or the reused array.
+        """
+        if out is None:
+            if self.__pixels is None or self.__pixels.shape != (self.height, self.width, 4):
+                self.__pixels = np.empty((self.height, self.width, 4), np.uint8)
+            out = self.__pixels
+
+        glstate.STATE.bindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        GL.glBindFramebuffer(GL.GL_READ_FRAMEBUFFER, self.framebuffer)
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        GL.glReadPixels(0, 0, self.width, self.height, GL.GL_RGBA, GL.GL_UNSIGNED_BYTE, out)
+
+        return out
+
+    def terminate(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that destroys the context, the window can't be used afterwards.
+        """
+        return
+
+
+class GlfwWindow(Window):
+    """
+    GlfwWindow class
+    ================
+    Parent class: `Window`
+
+    Class that draws in a GLFW window.
+
+    Attributes:
+        handle (`typing.Any`): The GLFW window.
+    Methods
+    -------
+    - `shouldClose`
+    - `setShouldClose`
+    - `swapBuffers`
+    - `setSwapInterval`
+    - `pollEvents`
+    - `waitEvents`
+    - `postEmptyEvent`
+    - `getKey`
+    - `getCursorPos`
+    - `captureCursor`
+    - `setCursorPosCallback`
+    - `setScrollCallback`
+    - `setRefreshCallback`
+    - `setTitle`
+    - `makeCurrent`
+    - `doneCurrent`
+    - `createUploadWindow`
+    - `terminate`
+    """
+    def __init__(
+            self: typing.Self,
+            width: int,
+            height: int,
+            title: str,
+            /,
+            *,
+            visible: bool = True,
+            share: "GlfwWindow | None" = None
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            width (`int`): Width of the window.
+            height (`int`): Height of the window.
+            title (`str`): Title of the window.
+            visible (`bool`): If the window is shown.
+            share (`GlfwWindow | None`): Window whose context is shared with the new one.
+        Raises:
+            `Exception`: if GLFW or the window can't be initialized.
+        """
+        super().__init__(width, height)
+
+        if not glfw.init():
+            raise Exception("Failed to initialize GLFW")
+
+        if not visible:
+            glfw.window_hint(glfw.VISIBLE, glfw.FALSE)
+        self.handle: typing.Any = glfw.create_window(width, height, title, None, None if share is None else share.handle)
+        glfw.default_window_hints()
+
+        if not self.handle:
+            if share is None:
+                glfw.terminate()
+            raise Exception("Failed to create GLFW window")
+
+    @typing.override
+    def shouldClose(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        Method that tells if the window was asked to close (close button or `setShouldClose`).
+
+        Returns:
+            `bool`: True if the loop should stop.
+        """
+        return bool(glfw.window_should_close(self.handle))
+
+    @typing.override
+    def setShouldClose(
+            self: typing.Self,
+            value: bool,
+            /
+            ) -> None:
+        """
+        Method that asks the loop to stop (or not).
+
+        Args:
+            value (`bool`): If the loop should stop.
+        """
+        glfw.set_window_should_close(self.handle, value)
+
+    @typing.override
+    def swapBuffers(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that presents the frame drawn in the back buffer.
+        """
+        glfw.swap_buffers(self.handle)
+
+    @typing.override
+    def setSwapInterval(
+            self: typing.Self,
+            interval: int,
+            /
+            ) -> None:
+        """
+        Method that sets the number of screen refreshes `swapBuffers` waits for (0 to disable vsync),
+        must be called with the context current.
+
+        Args:
+            interval (`int`): Number of refreshes, -1 for adaptive vsync where supported.
+        """
+        glfw.swap_interval(interval)
+
+    @typing.override
+    def pollEvents(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that processes pending GLFW events, calling the callbacks.
+        """
+        glfw.poll_events()
+
+    @typing.override
+    def waitEvents(
+            self: typing.Self,
+            timeout: float,
+            /
+            ) -> None:
+        """
+        Method that sleeps until a GLFW event is received or `timeout` is elapsed, then processes the events.
+
+        Args:
+            timeout (`float`): Maximum time to wait in seconds.
+        """
+        glfw.wait_events_timeout(timeout)
+
+    @typing.override
+    def postEmptyEvent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that wakes up `waitEvents`, can be called from any thread.
+        """
+        glfw.post_empty_event()
+
+    @typing.override
+    def getKey(
+            self: typing.Self,
+            key: int,
+            /
+            ) -> int:
+        """
+        Method that gives the state of a key.
+
+        Args:
+            key (`int`): GLFW key code.
+        Returns:
+            `int`: `glfw.PRESS` or `glfw.RELEASE`.
+        """
+        return glfw.get_key(self.handle, key)
+
+    @typing.override
+    def getCursorPos(
+            self: typing.Self,
+            /
+            ) -> tuple[float, float]:
+        """
+        Method that gives the position of the cursor.
+
+        Returns:
+            `tuple[float,float]`: position on x and y axis in the window.
+        """
+        return glfw.get_cursor_pos(self.handle)
+
+    @typing.override
+    def captureCursor(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that hides the cursor and puts it in the middle of the window, for mouse look.
+        """
+        glfw.set_input_mode(self.handle, glfw.CURSOR, glfw.CURSOR_DISABLED)
+        glfw.set_cursor_pos(self.handle, self.width / 2, self.height / 2)
+
+    @typing.override
+    def setCursorPosCallback(
+            self: typing.Self,
+            callback: collections.abc.Callable[[typing.Any, float, float], None] | None,
+            /
+            ) -> None:
+        """
+        Method that sets the function called with (window, x, y) when the cursor moves.
+
+        Args:
+            callback (`collections.abc.Callable[[typing.Any,float,float],None] | None`): The function to call.
+        """
+        super().setCursorPosCallback(callback)
+        glfw.set_cursor_pos_callback(self.handle, None if callback is None else lambda _, x, y: callback(self, x, y))
+
+    @typing.override
+    def setScrollCallback(
+            self: typing.Self,
+            callback: collections.abc.Callable[[typing.Any, float, float], None] | None,
+            /
+            ) -> None:
+        """
+        Method that sets the function called with (window, delta x, delta y) when the scroll wheel is used.
+
+        Args:
+            callback (`collections.abc.Callable[[typing.Any,float,float],None] | None`): The function to call.
+        """
+        super().setScrollCallback(callback)
+        glfw.set_scroll_callback(self.handle, None if callback is None else lambda _, x, y: callback(self, x, y))
+
+    @typing.override
+    def setRefreshCallback(
+            self: typing.Self,
+            callback: collections.abc.Callable[[typing.Any], None] | None,
+            /
+            ) -> None:
+        """
+        Method that sets the function called with (window) when the content of the window must be drawn again
+        (e.g. after being uncovered or resized).
+
+        Args:
+            callback (`collections.abc.Callable[[typing.Any],None] | None`): The function to call.
+        """
+        super().setRefreshCallback(callback)
+        glfw.set_window_refresh_callback(self.handle, None if callback is None else lambda _: callback(self))
+
+    @typing.override
+    def setTitle(
+            self: typing.Self,
+            title: str,
+            /
+            ) -> None:
+        """
+        Method that sets the title of the window.
+
+        Args:
+            title (`str`): The title.
+        """
+        glfw.set_window_title(self.handle, title)
+
+    @typing.override
+    def makeCurrent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that makes the context of the window current on the calling thread.
+        """
+        glfw.make_context_current(self.handle)
+
+    @typing.override
+    def doneCurrent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that releases the context current on the calling thread.
+        """
+        glfw.make_context_current(None)
+
+    @typing.override
+    def createUploadWindow(
+            self: typing.Self,
+            /
+            ) -> "GlfwWindow | None":
+        """
+        Method that creates a hidden 1x1 window whose context is shared with this one, for the upload worker.
+
+        Returns:
+            `GlfwWindow | None`: the window, None if it can't be created.
+        """
+        try:
+            return GlfwWindow(1, 1, "upload", visible=False, share=self)
+        except Exception:
+            return None
+
+    @typing.override
+    def terminate(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that destroys every GLFW window and terminates GLFW.
+        """
+        glfw.terminate()
+
+
+class HeadlessWindow(Window):
+    """
+    HeadlessWindow class
+    ====================
+    Parent class: `Window`
+
+    Class that draws in a framebuffer object of a context created without display,
+    through EGL or OSMesa (e.g. Mesa llvmpipe on machines without GPU).
+
+    The backend is the one PyOpenGL was loaded for, so `PYOPENGL_PLATFORM` must be `egl` or `osmesa`
+    before `OpenGL` is imported.
+
+    There are no input events: keys and cursor are set with `setKey`, `moveCursor` and `scroll`
+    (which wake up `waitEvents`), and `swapBuffers` only counts frames.
+
+    Attributes:
+        platform (`str`): `egl` or `osmesa`.
+        frames (`int`): Number of frames swapped.
+        max_frames (`int | None`): Number of frames after which `shouldClose` is True, None to never close.
+    Methods
+    -------
+    - `swapBuffers`
+    - `getKey`
+    - `getCursorPos`
+    - `setKey`
+    - `moveCursor`
+    - `scroll`
+    - `makeCurrent`
+    - `doneCurrent`
+    - `terminate`
+    """
+    PLATFORMS: tuple[str, ...] = ("egl", "osmesa")
+    __EGL_PLATFORM_SURFACELESS_MESA: int = 0x31DD
+
+    def __init__(
+            self: typing.Self,
+            width: int,
+            height: int,
+            /,
+            *,
+            max_frames: int | None = None
+            ) -> None:
+        """
+        Method to/that # TODO: set docstring
+
+        Args:
+            width (`int`): Width of the framebuffer.
+            height (`int`): Height of the framebuffer.
+            max_frames (`int | None`): Number of frames after which `shouldClose` is True, None to never close.
+        Raises:
+            `Exception`: if PyOpenGL isn't loaded for a headless platform, or the context or framebuffer can't be created.
+        """
+        super().__init__(width, height)
+
+        self.platform: str = os.environ.get("PYOPENGL_PLATFORM", "")
+        self.frames: int = 0
+        self.max_frames: int | None = max_frames
+
+        self.__keys: dict[int, int] = {}
+        self.__cursor: tuple[float, float] = (width / 2, height / 2)
+        self.__context: typing.Any = None
+        self.__display: typing.Any = None
+        self.__surface: typing.Any = None
+        self.__buffer: typing.Any = None
+
+        if self.platform == "egl":
+            self.__createEgl()
+        elif self.platform == "osmesa":
+            self.__createOsmesa()
+        else:
+            raise Exception(f"Headless rendering needs PYOPENGL_PLATFORM set to one of {HeadlessWindow.PLATFORMS} before OpenGL is imported")
+
+        self.__createFramebuffer()
+
+    def __createEgl(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that creates an OpenGL 3.3 core context with a 1x1 pbuffer surface (drawing goes to the framebuffer object).
+
+        Raises:
+            `Exception`: if the context can't be created.
+        """
+        from OpenGL import EGL  # type: ignore
+
+        # Mesa surfaceless display first (no X11 or Wayland needed), then the default display
+        displays: list[collections.abc.Callable[[], typing.Any]] = [
+            lambda: EGL.eglGetPlatformDisplay(HeadlessWindow.__EGL_PLATFORM_SURFACELESS_MESA, EGL.EGL_DEFAULT_DISPLAY, None),
+            lambda: EGL.eglGetDisplay(EGL.EGL_DEFAULT_DISPLAY)
+        ]
+        major, minor = EGL.EGLint(), EGL.EGLint()
+
+        for getDisplay in displays:
+            try:
+                self.__display = getDisplay()
+                if self.__display and EGL.eglInitialize(self.__display, ctypes.pointer(major), ctypes.pointer(minor)):
+                    break
+            except EGL.EGLError:
+                pass
+        else:
+            raise Exception("Failed to initialize EGL display")
+
+        config_attribs: list[int] = [
+            EGL.EGL_SURFACE_TYPE, EGL.EGL_PBUFFER_BIT,
+            EGL.EGL_RENDERABLE_TYPE, EGL.EGL_OPENGL_BIT,
+            EGL.EGL_RED_SIZE, 8,
+            EGL.EGL_GREEN_SIZE, 8,
+            EGL.EGL_BLUE_SIZE, 8,
+            EGL.EGL_ALPHA_SIZE, 8,
+            EGL.EGL_DEPTH_SIZE, 24,
+            EGL.EGL_NONE
+        ]
+        config: typing.Any = EGL.EGLConfig()
+        nb_configs: typing.Any = EGL.EGLint()
+        EGL.eglChooseConfig(self.__display, (EGL.EGLint * len(config_attribs))(*config_attribs), ctypes.pointer(config), 1, ctypes.pointer(nb_configs))
+        if nb_configs.value < 1:
+            raise Exception("No EGL config for desktop OpenGL")
+
+        surface_attribs: list[int] = [EGL.EGL_WIDTH, 1, EGL.EGL_HEIGHT, 1, EGL.EGL_NONE]
+        self.__surface = EGL.eglCreatePbufferSurface(self.__display, config, (EGL.EGLint * len(surface_attribs))(*surface_attribs))
+
+        EGL.eglBindAPI(EGL.EGL_OPENGL_API)
+        context_attribs: list[int] = [
+            EGL.EGL_CONTEXT_MAJOR_VERSION, 3,
+            EGL.EGL_CONTEXT_MINOR_VERSION, 3,
+            EGL.EGL_CONTEXT_OPENGL_PROFILE_MASK, EGL.EGL_CONTEXT_OPENGL_CORE_PROFILE_BIT,
+            EGL.EGL_NONE
+        ]
+        self.__context = EGL.eglCreateContext(self.__display, config, EGL.EGL_NO_CONTEXT, (EGL.EGLint * len(context_attribs))(*context_attribs))
+        if self.__context == EGL.EGL_NO_CONTEXT:
+            raise Exception("Failed to create EGL context")
+
+        self.makeCurrent()
+
+    def __createOsmesa(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that creates an OpenGL 3.3 core context rendering in a 1x1 buffer (drawing goes to the framebuffer object).
+
+        Raises:
+            `Exception`: if the context can't be created.
+        """
+        from OpenGL import osmesa, arrays  # type: ignore
+
+        attribs: list[int] = [
+            osmesa.OSMESA_FORMAT, osmesa.OSMESA_RGBA,
+            osmesa.OSMESA_DEPTH_BITS, 24,
+            osmesa.OSMESA_PROFILE, osmesa.OSMESA_CORE_PROFILE,
+            osmesa.OSMESA_CONTEXT_MAJOR_VERSION, 3,
+            osmesa.OSMESA_CONTEXT_MINOR_VERSION, 3,
+            0
+        ]
+        self.__context = osmesa.OSMesaCreateContextAttribs(attribs, None)
+        if not self.__context:
+            raise Exception("Failed to create OSMesa context")
+
+        self.__buffer = arrays.GLubyteArray.zeros((1, 1, 4))
+
+        self.makeCurrent()
+
+    def __createFramebuffer(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that creates the framebuffer object (RGBA8 color, 24 bits depth) and binds it for drawing.
+
+        Raises:
+            `Exception`: if the framebuffer is incomplete.
+        """
+        self.__color, self.__depth = GL.glGenRenderbuffers(2)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.__color)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_RGBA8, self.width, self.height)
+        GL.glBindRenderbuffer(GL.GL_RENDERBUFFER, self.__depth)
+        GL.glRenderbufferStorage(GL.GL_RENDERBUFFER, GL.GL_DEPTH24_STENCIL8, self.width, self.height)
+
+        self.framebuffer = GL.glGenFramebuffers(1)
+        GL.glBindFramebuffer(GL.GL_FRAMEBUFFER, self.framebuffer)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_COLOR_ATTACHMENT0, GL.GL_RENDERBUFFER, self.__color)
+        GL.glFramebufferRenderbuffer(GL.GL_FRAMEBUFFER, GL.GL_DEPTH_STENCIL_ATTACHMENT, GL.GL_RENDERBUFFER, self.__depth)
+
+        status: int = GL.glCheckFramebufferStatus(GL.GL_FRAMEBUFFER)
+        if status != GL.GL_FRAMEBUFFER_COMPLETE:
+            raise Exception(f"Offscreen framebuffer incomplete (status {status:#x})")
+
+        GL.glViewport(0, 0, self.width, self.height)
+
+    @typing.override
+    def shouldClose(
+            self: typing.Self,
+            /
+            ) -> bool:
+        """
+        Method that tells if the loop should stop.
+
+        Returns:
+            `bool`: True once `setShouldClose(True)` was called or `max_frames` frames were swapped.
+        """
+        return super().shouldClose() or (self.max_frames is not None and self.frames >= self.max_frames)
+
+    @typing.override
+    def swapBuffers(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that counts the frame, the image stays in the framebuffer object until the next frame.
+        """
+        self.frames += 1
+
+    @typing.override
+    def getKey(
+            self: typing.Self,
+            key: int,
+            /
+            ) -> int:
+        """
+        Method that gives the state of a key set by `setKey`.
+
+        Args:
+            key (`int`): GLFW key code.
+        Returns:
+            `int`: `glfw.PRESS` or `glfw.RELEASE`.
+        """
+        return self.__keys.get(key, glfw.RELEASE)
+
+    @typing.override
+    def getCursorPos(
+            self: typing.Self,
+            /
+            ) -> tuple[float, float]:
+        """
+        Method that gives the position of the cursor set by `moveCursor`.
+
+        Returns:
+            `tuple[float,float]`: position on x and y axis in the window.
+        """
+        return self.__cursor
+
+    def setKey(
+            self: typing.Self,
+            key: int,
+            action: int,
+            /
+            ) -> None:
+        """
+        Method that sets the state of a key, as if it was pressed or released.
+
+        Args:
+            key (`int`): GLFW key code.
+            action (`int`): `glfw.PRESS` or `glfw.RELEASE`.
+        """
+        self.__keys[key] = action
+        self.postEmptyEvent()
+
+    def moveCursor(
+            self: typing.Self,
+            x: float,
+            y: float,
+            /
+            ) -> None:
+        """
+        Method that moves the cursor, calling the cursor callback.
+
+        Args:
+            x (`float`): Position on x axis in the window.
+            y (`float`): Position on y axis in the window.
+        """
+        self.__cursor = (x, y)
+        if self.cursor_callback is not None:
+            self.cursor_callback(self, x, y)
+        self.postEmptyEvent()
+
+    def scroll(
+            self: typing.Self,
+            delta_x: float,
+            delta_y: float,
+            /
+            ) -> None:
+        """
+        Method that uses the scroll wheel, calling the scroll callback.
+
+        Args:
+            delta_x (`float`): The delta of the wheel on x axis.
+            delta_y (`float`): The delta of the wheel on y axis.
+        """
+        if self.scroll_callback is not None:
+            self.scroll_callback(self, delta_x, delta_y)
+        self.postEmptyEvent()
+
+    @typing.override
+    def makeCurrent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that makes the headless context current on the calling thread.
+        """
+        if self.platform == "egl":
+            from OpenGL import EGL  # type: ignore
+            EGL.eglMakeCurrent(self.__display, self.__surface, self.__surface, self.__context)
+        else:
+            from OpenGL import osmesa  # type: ignore
+            osmesa.OSMesaMakeCurrent(self.__context, self.__buffer, GL.GL_UNSIGNED_BYTE, 1, 1)
+
+    @typing.override
+    def doneCurrent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that releases the headless context on the calling thread (OSMesa contexts stay current).
+        """
+        if self.platform == "egl":
+            from OpenGL import EGL  # type: ignore
+            EGL.eglMakeCurrent(self.__display, EGL.EGL_NO_SURFACE, EGL.EGL_NO_SURFACE, EGL.EGL_NO_CONTEXT)
+
+    @typing.override
+    def terminate(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that deletes the framebuffer object and destroys the context.
+        """
+        if self.__context is None:
+            return
+
+        GL.glDeleteFramebuffers(1, [self.framebuffer])
+        GL.glDeleteRenderbuffers(2, [self.__color, self.__depth])
+        self.doneCurrent()
+
+        if self.platform == "egl":
+            from OpenGL import EGL  # type: ignore
+            EGL.eglDestroyContext(self.__display, self.__context)
+            EGL.eglDestroySurface(self.__display, self.__surface)
+            EGL.eglTerminate(self.__display)
+        else:
+            from OpenGL import osmesa  # type: ignore
+            osmesa.OSMesaDestroyContext(self.__context)
+
+        self.__context = None
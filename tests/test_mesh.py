@@ -0,0 +1,147 @@
+"""
+test_mesh module
+================
+
+Module that checks the OBJ parsing of `src.ressources.Mesh`.
+
+Classes
+-------
+- `TestLoadMesh`
+- `TestMeshCache`
+"""
+
+
+# built-in imports
+import os
+import sys
+import tempfile
+import typing
+import unittest
+import unittest.mock
+# pip imports
+import numpy as np
+# local imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import src  # noqa: E402
+
+
+class TestLoadMesh(unittest.TestCase):
+    """
+    TestLoadMesh class
+    ==================
+    Parent class: `unittest.TestCase`
+
+    Class that parses small OBJ files with `Mesh.loadMesh`.
+    """
+    def load(
+            self: typing.Self,
+            text: str,
+            /
+            ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Method that writes `text` in a temporary OBJ file and parses it.
+
+        Args:
+            text (`str`): Content of the file.
+        Returns:
+            `tuple[np.ndarray,np.ndarray]`: vertices and indices.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            path: str = os.path.join(folder, "mesh.obj")
+            with open(path, "w") as file:
+                file.write(text)
+
+            return src.ressources.Mesh.loadMesh(path)
+
+    def test_mixed_arity(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that checks lines with more components than used (`vt u v w`, `v x y z w`) are truncated.
+        """
+        vertices, indices = self.load(
+            "v 0 0 0\n"
+            "v 1 0 0 1\n"
+            "v 0 1 0\n"
+            "vt 0.25 0.5\n"
+            "vt 1 0 0.75\n"
+            "vt 0\t1\n"
+            "vn 0 0 1\n"
+            "f 1/1/1 2/2/1 3/3/1\n"
+        )
+
+        np.testing.assert_array_equal(indices, [0, 1, 2])
+        np.testing.assert_allclose(vertices.reshape(3, 8), [
+            [0, 0, 0, 0.25, 0.5, 0, 0, 1],
+            [1, 0, 0, 1, 0, 0, 0, 1],
+            [0, 1, 0, 0, 1, 0, 0, 1]
+        ])
+
+    def test_comments(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that checks trailing comments and every kind of whitespace are ignored.
+        """
+        vertices, indices = self.load(
+            "# triangle\n"
+            "v 0 0 0 # origin\n"
+            "v 1\v0\f0\n"
+            "v 0 1 0#top\n"
+            "vt 0 0 # corner\n"
+            "vn 0 0 1\n"
+            "f 1/1/1 2/1/1 3/1/1 # face\n"
+        )
+
+        np.testing.assert_array_equal(indices, [0, 1, 2])
+        np.testing.assert_allclose(vertices.reshape(3, 8)[:, :3], [[0, 0, 0], [1, 0, 0], [0, 1, 0]])
+
+    def test_missing_component(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that checks a line with less components than needed is refused.
+        """
+        with self.assertRaises(ValueError):
+            self.load("v 0 0 0\nv 1 0\nv 0 1 0\nvt 0 0\nvn 0 0 1\nf 1/1/1 2/1/1 3/1/1\n")
+
+
+class TestMeshCache(unittest.TestCase):
+    """
+    TestMeshCache class
+    ===================
+    Parent class: `unittest.TestCase`
+
+    Class that checks the compiled binaries written by `Mesh.loadCompiled`.
+    """
+    def test_rewrite_header(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that checks a binary still matching its touched source gets the new stat, so it isn't hashed again.
+        """
+        with tempfile.TemporaryDirectory() as folder:
+            path: str = os.path.join(folder, "mesh.obj")
+            with open(path, "w") as file:
+                file.write("v 0 0 0\nv 1 0 0\nv 0 1 0\nvt 0 0\nvn 0 0 1\nf 1/1/1 2/1/1 3/1/1\n")
+
+            mapping, vertices, _, _ = src.ressources.Mesh.loadCompiled(path)
+            self.assertIsNone(mapping)
+            os.utime(path, ns=(0, 10**18))
+
+            with unittest.mock.patch.object(src.ressources.Mesh, "hashSource", wraps=src.ressources.Mesh.hashSource) as hashed:
+                for expected in (1, 1):
+                    mapping, cached, _, _ = src.ressources.Mesh.loadCompiled(path)
+                    self.assertIsNotNone(mapping)
+                    np.testing.assert_array_equal(cached, vertices)
+                    self.assertEqual(hashed.call_count, expected)
+                    del cached
+                    mapping.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
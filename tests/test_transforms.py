@@ -0,0 +1,212 @@
+"""
+test_transforms module
+======================
+
+Module that checks both update paths of `src.shapes.transforms.TransformStore` give the same matrices.
+
+Classes
+-------
+- `Handle`
+- `TestUpdatePaths`
+"""
+
+
+# built-in imports
+import collections.abc
+import os
+import sys
+import typing
+import unittest
+import unittest.mock
+# pip imports
+import numpy as np
+# local imports
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from src.shapes.transforms import TransformStore  # noqa: E402
+
+
+class Handle:
+    """
+    Handle class
+    ============
+
+    Class that stands for the shape owning a row (the store only keeps a weak reference to it).
+    """
+    def invalidateBound(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method called by the store when the aggregate bound of the row changed.
+        """
+
+
+class TestUpdatePaths(unittest.TestCase):
+    """
+    TestUpdatePaths class
+    =====================
+    Parent class: `unittest.TestCase`
+
+    Class that makes the same edits in two stores, one always updated row by row with `glm` (the `FEW` path)
+    and one always updated level by level with NumPy, and compares their matrices and bounds.
+    """
+    def setUp(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that builds in both stores 3 roots with 3 children, 3 grandchildren and 2 great-grandchildren each,
+        and 100 more children under the first root (siblings many enough to be multiplied by their parent in one product).
+        """
+        self.random: np.random.Generator = np.random.default_rng(7)
+        self.handles: list[Handle] = []
+        self.stores: tuple[TransformStore, TransformStore] = (TransformStore(8), TransformStore(8))
+
+        parents: list[int] = [-1] * 3
+        level: list[int] = [0, 1, 2]
+        for count in (3, 3, 2):
+            children: list[int] = []
+            for parent in level:
+                children.extend(range(len(parents), len(parents) + count))
+                parents.extend([parent] * count)
+            level = children
+        parents.extend([0] * 100)
+        self.parents: list[int] = parents
+
+        for parent in parents:
+            self.allocate(parent)
+        rows: np.ndarray = np.arange(len(parents))
+        self.edit(lambda store, delta: store.move(rows, delta), self.random.uniform(-2, 2, (len(rows), 3)))
+        self.edit(lambda store, delta: store.rotate(rows, delta), self.random.uniform(0, 6, (len(rows), 3)))
+        self.edit(lambda store, value: store.scale(rows, value), self.random.uniform(0.8, 1.25, (len(rows), 3)))
+        self.check()
+
+    def allocate(
+            self: typing.Self,
+            parent: int,
+            /
+            ) -> int:
+        """
+        Method that gives a row with a random mesh bound under `parent` in both stores.
+
+        Args:
+            parent (`int`): The parent row, -1 for none.
+        Returns:
+            `int`: the row, the same in both stores.
+        """
+        handle: Handle = Handle()
+        self.handles.append(handle)
+        bound: tuple[float, ...] = tuple(self.random.uniform(0.1, 1, 4).tolist())
+
+        rows: list[int] = []
+        for store in self.stores:
+            rows.append(store.allocate(handle))
+            store.setParent(rows[-1], parent)
+            store.setMeshBound(rows[-1], bound)
+        self.assertEqual(rows[0], rows[1])
+
+        return rows[0]
+
+    def edit(
+            self: typing.Self,
+            function: collections.abc.Callable[..., None],
+            /,
+            *args: typing.Any
+            ) -> None:
+        """
+        Method that makes the same edit in both stores.
+
+        Args:
+            function (`collections.abc.Callable[...,None]`): The edit, called with a store and `args`.
+            *args (`typing.Any`): Args given to `function`.
+        """
+        for store in self.stores:
+            function(store, *args)
+
+    def check(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that updates the first store with the `FEW` path, the second one with the NumPy path, and compares them.
+        """
+        updated: list[np.ndarray] = []
+        for store, few in zip(self.stores, (1 << 20, 0)):
+            with unittest.mock.patch.object(TransformStore, "FEW", few):
+                updated.append(np.sort(store.update()))
+        np.testing.assert_array_equal(updated[0], updated[1])
+        self.assertGreater(len(updated[0]), 0)
+
+        few, levels = self.stores
+        alive: np.ndarray = np.flatnonzero(few.alive[:few.used])
+        np.testing.assert_array_equal(alive, np.flatnonzero(levels.alive[:levels.used]))
+        np.testing.assert_array_equal(few.parent[alive], levels.parent[alive])
+        np.testing.assert_array_equal(few.depth[alive], levels.depth[alive])
+        np.testing.assert_allclose(few.local[alive], levels.local[alive], rtol=1e-5, atol=1e-5)
+        np.testing.assert_allclose(few.world[alive], levels.world[alive], rtol=1e-4, atol=1e-4)
+        np.testing.assert_allclose(few.normal[alive], levels.normal[alive], rtol=1e-3, atol=1e-4)
+        np.testing.assert_allclose(few.bound[alive], levels.bound[alive], rtol=1e-4, atol=1e-4)
+
+    def test_batch_invalidate(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that checks rows of every level edited in batch, a few then most of them.
+        """
+        rows: np.ndarray = np.array([1, 5, 20, 60, 92])
+        self.edit(lambda store, delta: store.move(rows, delta), self.random.uniform(-1, 1, (len(rows), 3)))
+        self.check()
+
+        rows = self.random.permutation(len(self.parents))[:60]
+        position: np.ndarray = self.random.uniform(-3, 3, (len(rows), 3)).astype(np.float32)
+
+        def invalidate(
+                store: TransformStore,
+                /
+                ) -> None:
+            store.pos[rows] = position
+            store.invalidate(rows)
+
+        self.edit(invalidate)
+        self.check()
+
+    def test_set_parent(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that checks subtrees moved under another root, under a deeper row, and made roots.
+        """
+        # row 4 (child of root 1) goes under row 38 (grandchild of root 2), its subtree gets 2 levels deeper
+        self.edit(lambda store: store.setParent(4, 38))
+        self.check()
+
+        self.edit(lambda store: store.setParent(13, -1))
+        self.edit(lambda store: store.setParent(30, 0))
+        self.check()
+
+        self.edit(lambda store, delta: store.rotate(np.array([2, 38]), delta), np.float32((0.5, 0.25, 0)))
+        self.check()
+
+    def test_free(
+            self: typing.Self,
+            /
+            ) -> None:
+        """
+        Method that checks freed rows, whose children become roots, and rows allocated again in their place.
+        """
+        for row in (3, 20, 92):
+            self.edit(lambda store: store.free(row))
+        self.edit(lambda store, delta: store.move(np.array([0, 12, 39]), delta), np.float32((1, 0, -1)))
+        self.check()
+
+        row: int = self.allocate(5)
+        self.assertIn(row, (3, 20, 92))
+        self.edit(lambda store, delta: store.move(np.array([row]), delta), np.float32((0, 2, 0)))
+        self.edit(lambda store, delta: store.move(np.array([1]), delta), np.float32((0, 0, 1)))
+        self.check()
+
+
+if __name__ == "__main__":
+    unittest.main()